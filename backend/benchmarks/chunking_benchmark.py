@@ -0,0 +1,116 @@
+"""
+Compares the chunking strategies on the sample documents in `notebooks/test_doc`.
+
+For every document it converts the file with MarkItDown (as the ingestion pipeline does), splits it
+with the character based `recursive` strategy and the token-aware `markdown` strategy, and reports
+the texts embedded (one per chunk), the `batchEmbedContents` requests needed to send them, the
+tokens sent to the embedding model and the share of those tokens that are duplicated overlap.
+No Gemini calls are made, the requests follow from the chunk counts and `EMBED_BATCH_SIZE`.
+
+Small documents fit in one batch request with either strategy, the saving then shows in the texts
+embedded only. Documents without extractable text (e.g. `gre_ets_sample.pdf`, which is scanned)
+are listed as skipped and add nothing to the totals.
+
+Run from the `backend` directory:
+
+    python -m benchmarks.chunking_benchmark [files or directories ...]
+"""
+from typing import Dict, List
+
+import argparse
+import glob
+import math
+import os
+import sys
+import time
+
+from markitdown import MarkItDown
+
+from src.config.app_settings import EmbeddingParams, IngestionParams
+from src.orchestrator.ingestion.chunking import MARKDOWN, RECURSIVE, build_chunker
+
+DEFAULT_DOCS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "notebooks", "test_doc")
+
+
+def _documents(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*"))))
+        else:
+            files.append(path)
+    return [path for path in files if os.path.isfile(path)]
+
+
+def _convert(converter: MarkItDown, path: str) -> str:
+    result = converter.convert(path)
+    text = f"# {result.title}\n\n" if result.title else ""
+    return text + (result.text_content or "")
+
+
+def _compare(label: str, before: int, after: int) -> str:
+    if before == after:
+        return f"{label}: {after} with both strategies"
+    if not before:
+        return f"{label}: {after} instead of 0"
+    change = "fewer" if after < before else "more"
+    return f"{label}: {after} instead of {before} ({abs(before - after) / before:.0%} {change})"
+
+
+def run(paths: List[str]) -> Dict[str, Dict[str, int]]:
+    params = IngestionParams()
+    batch_size = EmbeddingParams().batch_size
+    chunkers = {strategy: build_chunker(params, strategy) for strategy in (RECURSIVE, MARKDOWN)}
+    converter = MarkItDown()
+    totals = {strategy: {"texts": 0, "embed_requests": 0, "tokens": 0, "duplicated": 0} for strategy in chunkers}
+    skipped = []
+
+    header = f"{'document':<32} {'strategy':<10} {'texts':>7} {'requests':>8} {'tokens':>8} {'mean':>6} {'fill':>6} {'dup':>6} {'ms':>7}"
+    print(header)
+    print("-" * len(header))
+    for path in _documents(paths):
+        text = _convert(converter, path)
+        name = os.path.basename(path)[:32]
+        if not text.strip():
+            print(f"{name:<32} no extractable text, skipped")
+            skipped.append(name)
+            continue
+        for strategy, chunker in chunkers.items():
+            stats = chunker.new_stats()
+            start = time.perf_counter()
+            chunks = sum(1 for _ in chunker.split(text, stats))
+            elapsed = (time.perf_counter() - start) * 1000
+            summary = stats.as_dict()
+            requests = math.ceil(chunks / batch_size)
+            totals[strategy]["texts"] += chunks
+            totals[strategy]["embed_requests"] += requests
+            totals[strategy]["tokens"] += summary["tokens"]
+            totals[strategy]["duplicated"] += max(0, summary["tokens"] - summary["source_tokens"])
+            print(
+                f"{name:<32} {strategy:<10} {chunks:>7} {requests:>8} {summary['tokens']:>8} "
+                f"{summary['mean_tokens']:>6} {summary['fill_ratio']:>6} {summary['duplicated_ratio']:>6} {elapsed:>7.1f}"
+            )
+
+    print("-" * len(header))
+    for strategy, total in totals.items():
+        print(f"{'total':<32} {strategy:<10} {total['texts']:>7} {total['embed_requests']:>8} {total['tokens']:>8}")
+
+    before, after = totals[RECURSIVE], totals[MARKDOWN]
+    print(f"\n{MARKDOWN} compared with {RECURSIVE}:")
+    for label, key in (("texts embedded", "texts"), (f"batch requests ({batch_size} texts each)", "embed_requests"), ("tokens embedded", "tokens")):
+        print(f"  {_compare(label, before[key], after[key])}")
+    if skipped:
+        print(f"Skipped, no extractable text: {', '.join(skipped)}")
+    return totals
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_DOCS], help="Documents or directories to chunk.")
+    args = parser.parse_args(argv)
+    run(args.paths)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
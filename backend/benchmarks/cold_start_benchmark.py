@@ -0,0 +1,85 @@
+"""
+Cold-start regression check: fails when importing the backend goes over a time budget.
+
+`import src.main` runs in a fresh interpreter a few times (it builds the app and the
+`BuddyOrchestrator`, but not the agents, clients or ChromaDB, which are loaded by the server's
+startup or on first use). The median import time and the median process time (interpreter start
+included) are compared with the budgets; when one is exceeded the slowest packages of the import
+are printed and the exit status is 1, so the script can gate CI.
+
+Run from the `backend` directory:
+
+    python -m benchmarks.cold_start_benchmark [--runs 5] [--budget 1.5] [--process-budget 2.5] [--module src.main]
+
+The budgets default to `COLD_START_BUDGET_SECONDS` and `COLD_START_PROCESS_BUDGET_SECONDS`.
+"""
+from typing import List, Tuple
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from src.startup_profile import BACKEND_DIR, by_package, import_times
+
+_PROBE = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+
+
+def measure(module: str) -> Tuple[float, float]:
+    """
+    Imports `module` in a fresh interpreter.
+
+    :return: The import time and the time of the whole process, in seconds.
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip()}")
+    return float(completed.stdout.strip().splitlines()[-1]), elapsed
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="src.main", help="Module to import, defaults to src.main.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=float(os.getenv("COLD_START_BUDGET_SECONDS", 1.5)),
+                        help="Maximum median import time in seconds.")
+    parser.add_argument("--process-budget", type=float, default=float(os.getenv("COLD_START_PROCESS_BUDGET_SECONDS", 2.5)),
+                        help="Maximum median process time in seconds, interpreter start included.")
+    args = parser.parse_args(argv)
+
+    # The first run also writes the bytecode caches, it is not counted
+    try:
+        measure(args.module)
+        samples = [measure(args.module) for _ in range(max(1, args.runs))]
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    imports = [sample[0] for sample in samples]
+    processes = [sample[1] for sample in samples]
+    print(f"{args.module}, {len(samples)} runs")
+    print(f"{'':<10} {'min s':>7} {'median s':>9} {'max s':>7} {'budget s':>9}")
+    print(f"{'import':<10} {min(imports):>7.3f} {statistics.median(imports):>9.3f} {max(imports):>7.3f} {args.budget:>9.3f}")
+    print(f"{'process':<10} {min(processes):>7.3f} {statistics.median(processes):>9.3f} {max(processes):>7.3f} {args.process_budget:>9.3f}")
+
+    over = statistics.median(imports) > args.budget or statistics.median(processes) > args.process_budget
+    if not over:
+        print("\nWithin budget.")
+        return 0
+
+    print("\nOver budget. Slowest packages of the import (self ms):")
+    for package, ms in by_package(import_times(args.module))[:15]:
+        print(f"  {package:<40} {ms:>9.1f}")
+    print("Run `python -m src.startup_profile` for the per-module breakdown.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,160 @@
+"""
+Measures memory, search latency and recall of the embedding storage modes.
+
+Every combination of vector length (3072, 1536, 768) and in-memory quantization (none, int8,
+binary) is searched the way `PartitionedVectorStore` searches small documents, and compared with
+exact search over the full 3072-value float vectors:
+
+- stored: bytes per vector persisted in ChromaDB (float32 at the mode's length)
+- memory: bytes per vector of the in-memory copy used for exact search
+- latency: mean time to score and rank the corpus for one query, re-scoring included (the
+  full-precision vectors are read from memory here, the store reads them from ChromaDB)
+- recall@k: share of the exact top-k found, without and with re-scoring
+
+By default the chunks of the documents in `notebooks/test_doc` and a few questions about them are
+embedded with gemini-embedding-001 (needs GEMINI_API_KEY, one full-length embedding per text; the
+shorter lengths are prefixes of it). Pass `--synthetic N` to run on N clustered random vectors
+instead, which is useful for latency at larger corpus sizes.
+
+Run from the `backend` directory:
+
+    python -m benchmarks.embedding_storage_benchmark [--synthetic 20000] [--top-k 5] [--queries questions.txt]
+"""
+from typing import List, Tuple
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.config.app_settings import IngestionParams, VectorStoreParams
+from src.orchestrator.ingestion.chunking import build_chunker
+from src.orchestrator.vectorstore.quantization import (
+    BINARY, DIMENSIONS, FULL_DIMENSIONS, INT8, NONE, QuantizedVectors, StorageMode, candidate_count, normalize, top_indices
+)
+
+DEFAULT_DOCS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "notebooks", "test_doc")
+QUESTIONS = [
+    "What spices go into the chicken marinade?",
+    "How long should the chicken marinate?",
+    "How much basmati rice does the biryani need?",
+    "How is the rice cooked and layered?",
+    "How many servings does the recipe make?",
+    "How many pages does the sample PDF have?",
+    "What is the sample PDF created for?",
+    "Is there Latin text in the document?",
+]
+
+
+def _real_corpus(paths: List[str], questions: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    from dotenv import load_dotenv
+    from markitdown import MarkItDown
+    from src.orchestrator.clients.gemini_client import GeminiClient
+
+    load_dotenv()
+    chunker = build_chunker(IngestionParams())
+    converter = MarkItDown()
+    chunks = []
+    for path in sorted(paths):
+        result = converter.convert(path)
+        chunks.extend(chunker.split(result.text_content or ""))
+    chunks = [chunk for chunk in chunks if chunk.strip()]
+    print(f"Embedding {len(chunks)} chunks and {len(questions)} questions with gemini-embedding-001")
+
+    client = GeminiClient(gemini_api_key=os.getenv("GEMINI_API_KEY"))
+    documents = client.embed_content(chunks)["embedding"]
+    queries = client.embed_content(questions, task_type="RETRIEVAL_QUERY")["embedding"]
+    return np.asarray(documents, dtype=np.float32), np.asarray(queries, dtype=np.float32)
+
+
+def _synthetic_corpus(count: int, query_count: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clustered vectors whose variance decays along the dimensions, like Matryoshka embeddings
+    where the leading values carry most of the signal.
+    """
+    rng = np.random.default_rng(seed)
+    decay = np.linspace(1.0, 0.1, FULL_DIMENSIONS, dtype=np.float32)
+    centers = rng.normal(size=(max(count // 50, 1), FULL_DIMENSIONS)).astype(np.float32) * decay
+    documents = centers[rng.integers(0, len(centers), count)] + rng.normal(size=(count, FULL_DIMENSIONS)).astype(np.float32) * decay * 0.8
+    queries = documents[rng.integers(0, count, query_count)] + rng.normal(size=(query_count, FULL_DIMENSIONS)).astype(np.float32) * decay * 0.8
+    return documents, queries
+
+
+def _search(mode: StorageMode, index: QuantizedVectors, full: np.ndarray, query: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Ranks the corpus for one query like `PartitionedVectorStore.query_many` does for a small document.
+    """
+    scores = index.scores(query[None, :])[:, 0]
+    candidates = top_indices(scores, candidate_count(mode, top_k, len(index)))
+    if index.exact or not mode.rescore_factor:
+        return candidates[:top_k]
+    exact = full[candidates] @ query
+    return candidates[top_indices(exact, top_k)]
+
+
+def run(documents: np.ndarray, queries: np.ndarray, top_k: int, rescore_factor: int, repeats: int = 5) -> None:
+    truth_vectors = normalize(documents)
+    truth_queries = normalize(queries)
+    truth = [set(top_indices(truth_vectors @ query, top_k).tolist()) for query in truth_queries]
+
+    header = f"{'mode':<14} {'stored B':>9} {'memory B':>9} {'ms/query':>9} {'recall@' + str(top_k):>10} {'rescored':>9}"
+    print(f"\n{len(documents)} vectors, {len(queries)} queries, rescore factor {rescore_factor}\n")
+    print(header)
+    print("-" * len(header))
+    for dimensions in reversed(DIMENSIONS):
+        for quantization in (NONE, INT8, BINARY):
+            mode = StorageMode(dimensions, quantization, rescore_factor)
+            plain = StorageMode(dimensions, quantization, 0)
+            full = mode.prepare(documents)
+            prepared = mode.prepare(queries)
+            index = QuantizedVectors(full, quantization)
+
+            start = time.perf_counter()
+            for _ in range(repeats):
+                rescored = [_search(mode, index, full, query, top_k) for query in prepared]
+            elapsed = (time.perf_counter() - start) * 1000 / (repeats * len(prepared))
+            unscored = [_search(plain, index, full, query, top_k) for query in prepared]
+
+            def recall(results: List[np.ndarray]) -> float:
+                return float(np.mean([len(truth[i] & set(result.tolist())) / len(truth[i]) for i, result in enumerate(results)]))
+
+            rescored_recall = f"{recall(rescored):.3f}" if quantization != NONE else "-"
+            print(
+                f"{str(mode):<14} {dimensions * 4:>9} {index.nbytes // len(index):>9} {elapsed:>9.3f} "
+                f"{recall(unscored):>10.3f} {rescored_recall:>9}"
+            )
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_DOCS], help="Documents or directories to embed.")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic vectors instead of real documents.")
+    parser.add_argument("--queries", help="File with one question per line, replaces the built-in questions.")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rescore-factor", type=int, default=VectorStoreParams().rescore_factor)
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        documents, queries = _synthetic_corpus(args.synthetic, 100)
+    else:
+        if not os.getenv("GEMINI_API_KEY") and not os.path.exists(".env"):
+            print("GEMINI_API_KEY is not set, pass --synthetic N to benchmark without the API.")
+            return 1
+        files = []
+        for path in args.paths:
+            files.extend(glob.glob(os.path.join(path, "*")) if os.path.isdir(path) else [path])
+        questions = QUESTIONS
+        if args.queries:
+            with open(args.queries, encoding="utf-8") as handle:
+                questions = [line.strip() for line in handle if line.strip()]
+        documents, queries = _real_corpus([path for path in files if os.path.isfile(path)], questions)
+
+    run(documents, queries, args.top_k, args.rescore_factor)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
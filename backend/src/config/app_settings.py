@@ -1,35 +1,418 @@
-class AskParams:
-    """
-    AskParams is a class that encapsulates parameters for asking questions to an AI model.
-    It includes parameters such as the number of responses, frequency and presence penalties,
-    """
-    def __init__(self):
-        """
-        Initializes the AskParams instance with default values.
-        This class is used to store parameters for asking questions to the AI model.
-        The parameters include:
-        - n: The number of responses to generate.
-        - frequency_penalty: The penalty for using frequent tokens.
-        - presence_penalty: The penalty for using new tokens.
-        - temperature: The temperature for sampling.
-        - top_p: The top probability for nucleus sampling.
-        - stop: The stopping criteria for the model.
-        - max_tokens: The maximum number of tokens to generate.
-        - logprobs: Whether to return log probabilities of the generated tokens.
-        """
-        self.n = 1
-        # self.frequency_penalty = 0.0
-        # self.presence_penalty = 0.0
-        self.temperature = 0.7
-        # self.top_p = 1.0
-        # self.stop = None
-        # self.max_tokens = 1024
-        # self.logprobs = False
-
-    def __str__(self) -> str:
-        """
-        Returns a string representation of the AskParams instance.
-        This method is useful for debugging and logging purposes.  
-        It returns the string representation of the instance's dictionary.
-        """
-        return str(self.__dict__)
\ No newline at end of file
+import os
+
+class AskParams:
+    """
+    AskParams is a class that encapsulates parameters for asking questions to an AI model.
+    It includes parameters such as the number of responses, frequency and presence penalties,
+    """
+    def __init__(self):
+        """
+        Initializes the AskParams instance with default values.
+        This class is used to store parameters for asking questions to the AI model.
+        The parameters include:
+        - n: The number of responses to generate.
+        - frequency_penalty: The penalty for using frequent tokens.
+        - presence_penalty: The penalty for using new tokens.
+        - temperature: The temperature for sampling.
+        - top_p: The top probability for nucleus sampling.
+        - stop: The stopping criteria for the model.
+        - max_tokens: The maximum number of tokens to generate.
+        - logprobs: Whether to return log probabilities of the generated tokens.
+        """
+        self.n = 1
+        # self.frequency_penalty = 0.0
+        # self.presence_penalty = 0.0
+        self.temperature = 0.7
+        # self.top_p = 1.0
+        # self.stop = None
+        # self.max_tokens = 1024
+        # self.logprobs = False
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the AskParams instance.
+        This method is useful for debugging and logging purposes.  
+        It returns the string representation of the instance's dictionary.
+        """
+        return str(self.__dict__)
+
+class EmbeddingParams:
+    """
+    EmbeddingParams is a class that encapsulates parameters for the embedding engine.
+    It controls how text chunks are grouped into batch requests and how many of them run at once.
+    """
+    def __init__(self):
+        """
+        Initializes the EmbeddingParams instance with default values.
+        Every value can be overridden with an environment variable.
+        The parameters include:
+        - batch_size: Number of chunks sent in one `batchEmbedContents` request (API maximum is 100).
+        - max_concurrency: Number of batch requests in flight at the same time.
+        - max_retries: Number of retries for a failed batch before giving up.
+        - backoff_seconds: Base delay for the exponential backoff between retries.
+        - timeout: Timeout in seconds for a single batch request.
+        """
+        self.batch_size = min(int(os.getenv("EMBED_BATCH_SIZE", 100)), 100)
+        self.max_concurrency = int(os.getenv("EMBED_MAX_CONCURRENCY", 4))
+        self.max_retries = int(os.getenv("EMBED_MAX_RETRIES", 3))
+        self.backoff_seconds = float(os.getenv("EMBED_BACKOFF_SECONDS", 1.0))
+        self.timeout = float(os.getenv("EMBED_TIMEOUT", 60))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the EmbeddingParams instance.
+        """
+        return str(self.__dict__)
+
+class EmbeddingCacheParams:
+    """
+    EmbeddingCacheParams is a class that encapsulates parameters for the on-disk embedding cache.
+    """
+    def __init__(self):
+        """
+        Initializes the EmbeddingCacheParams instance with default values.
+        The parameters include:
+        - enabled: Whether embeddings are looked up in the cache before calling the API.
+        - path: Location of the SQLite file that holds the cache.
+        - max_entries: Maximum number of cached vectors, least recently used ones are evicted first.
+        """
+        self.enabled = os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true"
+        self.path = os.getenv("EMBED_CACHE_PATH", "./embedding_cache.db")
+        self.max_entries = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", 200_000))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the EmbeddingCacheParams instance.
+        """
+        return str(self.__dict__)
+
+class IngestionParams:
+    """
+    IngestionParams is a class that encapsulates parameters for the document ingestion pipeline.
+    """
+    def __init__(self):
+        """
+        Initializes the IngestionParams instance with default values.
+        The parameters include:
+        - spool_dir: Directory where uploads are spooled to disk before conversion.
+        - read_size: Number of bytes read from the upload stream at a time.
+        - chunk_strategy: `markdown` splits on the markdown structure with a token budget,
+          `recursive` uses the character based splitter.
+        - chunk_tokens: Maximum estimated tokens of a chunk (markdown strategy).
+          gemini-embedding-001 reads up to 2048 tokens per text.
+        - min_chunk_tokens: A heading only starts a new chunk once the current one holds this many tokens.
+        - max_overlap_tokens: Maximum tokens repeated from the previous chunk when a paragraph is cut.
+        - heading_context: Prefix chunks that do not start at their heading with the heading path.
+        - chars_per_token: Characters per token used to estimate token counts.
+        - chunk_size: Maximum size of a text chunk in characters (recursive strategy).
+        - chunk_overlap: Overlap between two consecutive chunks in characters (recursive strategy).
+        - split_window: Number of characters handed to the text splitter at a time (recursive strategy).
+        - embed_window: Number of chunks embedded and stored together.
+        - upsert_batch_size: Maximum number of chunks written to ChromaDB in one call.
+        """
+        self.spool_dir = os.getenv("INGEST_SPOOL_DIR", "./uploads")
+        self.read_size = 1024 * 1024
+        self.chunk_strategy = os.getenv("CHUNK_STRATEGY", "markdown")
+        self.chunk_tokens = int(os.getenv("CHUNK_TOKENS", 512))
+        self.min_chunk_tokens = int(os.getenv("CHUNK_MIN_TOKENS", 128))
+        self.max_overlap_tokens = int(os.getenv("CHUNK_MAX_OVERLAP_TOKENS", 64))
+        self.heading_context = os.getenv("CHUNK_HEADING_CONTEXT", "true").lower() == "true"
+        self.chars_per_token = float(os.getenv("CHUNK_CHARS_PER_TOKEN", 4.0))
+        self.chunk_size = 1000
+        self.chunk_overlap = 200
+        self.split_window = int(os.getenv("INGEST_SPLIT_WINDOW", 100_000))
+        self.embed_window = int(os.getenv("INGEST_EMBED_WINDOW", 200))
+        self.upsert_batch_size = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", 100))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the IngestionParams instance.
+        """
+        return str(self.__dict__)
+
+class IngestionJobParams:
+    """
+    IngestionJobParams is a class that encapsulates parameters for the background ingestion jobs.
+    """
+    def __init__(self):
+        """
+        Initializes the IngestionJobParams instance with default values.
+        The parameters include:
+        - workers: Number of documents ingested at the same time.
+        - queue_size: Maximum number of jobs waiting for a worker, uploads are rejected beyond it.
+        - max_retained: Number of finished jobs kept for the status endpoint.
+        """
+        self.workers = int(os.getenv("INGEST_WORKERS", 2))
+        self.queue_size = int(os.getenv("INGEST_QUEUE_SIZE", 100))
+        self.max_retained = int(os.getenv("INGEST_MAX_RETAINED_JOBS", 1000))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the IngestionJobParams instance.
+        """
+        return str(self.__dict__)
+
+class ConversionParams:
+    """
+    ConversionParams is a class that encapsulates parameters for converting documents to text.
+    """
+    def __init__(self):
+        """
+        Initializes the ConversionParams instance with default values.
+        The parameters include:
+        - workers: Number of worker processes converting documents, each keeps a MarkItDown instance.
+          0 converts in a thread of the server process.
+        - timeout_seconds: Maximum time to convert one document, its worker processes are restarted beyond it.
+        - pdf_split_min_pages: PDFs with at least this many pages are split into page ranges converted in
+          parallel, 0 (the default) never splits. Split PDFs are read with pdfminer's plain text extraction
+          instead of MarkItDown: tables of form-style pages, MarkItDown's merging of numbered lines and the
+          title are lost, and the text (so its `text_hash`) differs from an unsplit conversion of the same file.
+        - pdf_pages_per_task: Number of pages of a split PDF converted by one task.
+        """
+        self.workers = int(os.getenv("CONVERT_WORKERS", min(4, os.cpu_count() or 1)))
+        self.timeout_seconds = float(os.getenv("CONVERT_TIMEOUT_SECONDS", 300))
+        self.pdf_split_min_pages = int(os.getenv("CONVERT_PDF_SPLIT_MIN_PAGES", 0))
+        self.pdf_pages_per_task = int(os.getenv("CONVERT_PDF_PAGES_PER_TASK", 20))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the ConversionParams instance.
+        """
+        return str(self.__dict__)
+
+class SessionParams:
+    """
+    SessionParams is a class that encapsulates parameters for the agent session store.
+    """
+    def __init__(self):
+        """
+        Initializes the SessionParams instance with default values.
+        The parameters include:
+        - db_url: SQLAlchemy URL of the durable session store.
+        - max_hot_sessions: Maximum number of sessions kept in memory, least recently used ones are evicted first.
+        - ttl_seconds: Idle time after which a session is evicted from memory.
+        - max_events: Number of most recent events kept per session in memory (and sent to the model).
+        """
+        self.db_url = os.getenv("SESSION_DB_URL", "sqlite:///./sessions.db")
+        self.max_hot_sessions = int(os.getenv("SESSION_MAX_HOT", 1000))
+        self.ttl_seconds = float(os.getenv("SESSION_TTL_SECONDS", 1800))
+        self.max_events = int(os.getenv("SESSION_MAX_EVENTS", 50))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the SessionParams instance.
+        """
+        return str(self.__dict__)
+
+class SemanticCacheParams:
+    """
+    SemanticCacheParams is a class that encapsulates parameters for the semantic answer cache.
+    """
+    def __init__(self):
+        """
+        Initializes the SemanticCacheParams instance with default values.
+        The parameters include:
+        - enabled: Whether answers are looked up in the cache before running the agents or the RAG chain.
+        - similarity_threshold: Minimum cosine similarity between two queries to reuse an answer.
+        - ttl_seconds: Time to live of a cached answer per route. `/buddy/talk` answers are kept per
+          workflow the router picked (`buddy_talk:<route>`): stock prices go stale within a minute,
+          weather within minutes, document answers (`chat_doc`) do not.
+        - max_entries: Maximum number of cached answers per route, the oldest ones are evicted first.
+        """
+        self.enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+        self.similarity_threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))
+        self.ttl_seconds = {
+            "buddy_talk:root": float(os.getenv("SEMANTIC_CACHE_TTL_BUDDY_TALK", 300)),
+            "buddy_talk:weather": float(os.getenv("SEMANTIC_CACHE_TTL_WEATHER", 600)),
+            "buddy_talk:stock": float(os.getenv("SEMANTIC_CACHE_TTL_STOCK", 60)),
+            "buddy_talk:portfolio": float(os.getenv("SEMANTIC_CACHE_TTL_STOCK", 60)),
+            "chat_doc": float(os.getenv("SEMANTIC_CACHE_TTL_CHAT_DOC", 86400)),
+        }
+        self.max_entries = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 5000))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the SemanticCacheParams instance.
+        """
+        return str(self.__dict__)
+
+class RouterParams:
+    """
+    RouterParams is a class that encapsulates parameters for the fast-path intent router.
+    """
+    def __init__(self):
+        """
+        Initializes the RouterParams instance with default values.
+        The parameters include:
+        - enabled: Whether queries are routed straight to a workflow when the intent is clear.
+        - similarity_threshold: Minimum cosine similarity to the closest example utterance.
+        - margin: Minimum lead of the best route's similarity over the runner-up.
+        """
+        self.enabled = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+        self.similarity_threshold = float(os.getenv("ROUTER_SIMILARITY_THRESHOLD", 0.80))
+        self.margin = float(os.getenv("ROUTER_MARGIN", 0.05))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the RouterParams instance.
+        """
+        return str(self.__dict__)
+
+class PricingParams:
+    """
+    PricingParams is a class that encapsulates the per-model price table used for cost accounting.
+    """
+    def __init__(self):
+        """
+        Initializes the PricingParams instance with default values.
+        The parameters include:
+        - prices: USD per 1M tokens, per model, for `input` (prompt) and `output` (completion) tokens.
+          Models are matched exactly first, then by the longest prefix (`gemini-2.0-flash-001` -> `gemini-2.0-flash`).
+        - chars_per_token: Used to estimate embedding tokens, `batchEmbedContents` does not report usage.
+        """
+        self.prices = {
+            "gemini-1.5-flash": {"input": 0.075, "output": 0.30},
+            "gemini-1.5-flash-8b": {"input": 0.0375, "output": 0.15},
+            "gemini-1.5-pro": {"input": 1.25, "output": 5.00},
+            "gemini-2.0-flash": {"input": 0.10, "output": 0.40},
+            "gemini-2.0-flash-lite": {"input": 0.075, "output": 0.30},
+            "gemini-embedding-001": {"input": 0.15, "output": 0.0},
+        }
+        self.chars_per_token = float(os.getenv("PRICING_CHARS_PER_TOKEN", 4))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the PricingParams instance.
+        """
+        return str(self.__dict__)
+
+class UsageParams:
+    """
+    UsageParams is a class that encapsulates parameters for token accounting and session budgets.
+    """
+    def __init__(self):
+        """
+        Initializes the UsageParams instance with default values.
+        The parameters include:
+        - session_token_budget: Tokens a session may use before the budget applies, 0 disables budgets.
+          Usage is counted in memory per server process and lost on restart, and requests without a
+          `session_id` are not budgeted, see `UsageLedger`.
+        - budget_action: `reject` answers over-budget requests with 429, `downgrade` answers them
+          with a single call to `downgrade_model` instead of the agent chain.
+        - downgrade_model: The cheaper model used for over-budget requests.
+        - max_tracked: Maximum number of sessions and documents whose usage is kept in memory.
+        """
+        self.session_token_budget = int(os.getenv("USAGE_SESSION_TOKEN_BUDGET", 0))
+        self.budget_action = os.getenv("USAGE_BUDGET_ACTION", "reject").lower()
+        self.downgrade_model = os.getenv("USAGE_DOWNGRADE_MODEL", "gemini-1.5-flash-8b")
+        self.max_tracked = int(os.getenv("USAGE_MAX_TRACKED", 10_000))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the UsageParams instance.
+        """
+        return str(self.__dict__)
+
+class VectorStoreParams:
+    """
+    VectorStoreParams is a class that encapsulates parameters for the partitioned document vector store.
+    """
+    def __init__(self):
+        """
+        Initializes the VectorStoreParams instance with default values.
+        The parameters include:
+        - path: Directory of the persistent ChromaDB client.
+        - shared_collection: Collection holding the chunks of small documents.
+        - brute_force_max_chunks: Documents with at most this many chunks stay in the shared collection
+          and are searched exactly in memory with NumPy; larger ones get a dedicated collection.
+        - max_cached_vectors: Maximum number of chunk vectors held in memory for exact search,
+          the least recently queried documents are dropped first.
+        - max_fanout_documents: Maximum number of documents a cross-document question may search.
+        - shared_dimensions: Length (768, 1536 or 3072) of the vectors in the shared collection,
+          shorter vectors are requested from the API with `output_dimensionality`.
+        - shared_quantization: Form of the in-memory copy of small documents: `none`, `int8` or `binary`.
+          Quantization trades search latency for memory. `int8` holds 4x less, but NumPy has no int8
+          matrix product, so each query converts the codes back to float32 and scoring takes about
+          2x (up to 3.5x on large blocks) as long as `none`. `binary` holds 32x less and scores in
+          about 1.3x the time. Re-scoring adds one ChromaDB read per query.
+        - dedicated_dimensions: Length of the vectors in the dedicated collections of large documents.
+        - rescore_factor: With quantization, `top_k * rescore_factor` candidates are re-scored at full precision (0 disables).
+        - snapshot_dir: Directory holding the snapshots of the ChromaDB files and the document registry.
+        - warm_documents: Number of hot documents whose indexes are loaded in the background at startup.
+
+        Dimensions and quantization apply to collections when they are created, existing collections keep theirs.
+        """
+        self.path = os.getenv("CHROMA_PATH", "./chroma_db")
+        self.shared_collection = os.getenv("CHROMA_SHARED_COLLECTION", "documents_collection")
+        self.brute_force_max_chunks = int(os.getenv("VECTOR_BRUTE_FORCE_MAX_CHUNKS", 2000))
+        self.max_cached_vectors = int(os.getenv("VECTOR_MAX_CACHED_VECTORS", 50_000))
+        self.max_fanout_documents = int(os.getenv("VECTOR_MAX_FANOUT_DOCUMENTS", 100))
+        self.shared_dimensions = int(os.getenv("VECTOR_SHARED_DIMENSIONS", 3072))
+        self.shared_quantization = os.getenv("VECTOR_SHARED_QUANTIZATION", "none")
+        self.dedicated_dimensions = int(os.getenv("VECTOR_DEDICATED_DIMENSIONS", 3072))
+        self.rescore_factor = int(os.getenv("VECTOR_RESCORE_FACTOR", 4))
+        self.snapshot_dir = os.getenv("VECTOR_SNAPSHOT_DIR", "./snapshots")
+        self.warm_documents = int(os.getenv("VECTOR_WARM_DOCUMENTS", 20))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the VectorStoreParams instance.
+        """
+        return str(self.__dict__)
+
+class DocumentRegistryParams:
+    """
+    DocumentRegistryParams is a class that encapsulates parameters for the document registry.
+    """
+    def __init__(self):
+        """
+        Initializes the DocumentRegistryParams instance with default values.
+        The parameters include:
+        - path: SQLite file holding one row per ingested document.
+        """
+        self.path = os.getenv("DOCUMENT_REGISTRY_PATH", "./documents.db")
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the DocumentRegistryParams instance.
+        """
+        return str(self.__dict__)
+
+class ChatBatchParams:
+    """
+    ChatBatchParams is a class that encapsulates parameters for batch question answering over a document.
+    """
+    def __init__(self):
+        """
+        Initializes the ChatBatchParams instance with default values.
+        The parameters include:
+        - max_questions: Maximum number of questions accepted in one batch.
+        - max_concurrency: Maximum number of answers generated at the same time.
+        """
+        self.max_questions = int(os.getenv("CHAT_BATCH_MAX_QUESTIONS", 100))
+        self.max_concurrency = int(os.getenv("CHAT_BATCH_MAX_CONCURRENCY", 8))
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the ChatBatchParams instance.
+        """
+        return str(self.__dict__)
+
+class AdminParams:
+    """
+    AdminParams is a class that encapsulates parameters for the admin endpoints.
+    """
+    def __init__(self):
+        """
+        Initializes the AdminParams instance with default values.
+        The parameters include:
+        - token: Secret expected in the `X-Admin-Token` header of admin requests.
+          The admin endpoints are disabled while it is not set.
+        """
+        self.token = os.getenv("ADMIN_TOKEN")
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the AdminParams instance, without the token.
+        """
+        return str({"token": "***" if self.token else None})
\ No newline at end of file
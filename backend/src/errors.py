@@ -1,3 +1,3 @@
-"""
-This file contains custom error classes for the application.
+"""
+This file contains custom error classes for the application.
 """
\ No newline at end of file
@@ -1,239 +1,474 @@
-from src.orchestrator.orchestrator import BuddyOrchestrator
-from src.validation.input_schema import InputQuery, ChatRequest
-from src.validation.output_schema import OutputQuery
-
-from fastapi import FastAPI, Request, Depends, UploadFile, File, Form, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from src.orchestrator.agents.agent import root_agent
-
-import os
-import shutil
-import requests
-import platform
-from io import BytesIO
-import gradio as gr
-from typing import List, Dict, Any
-from markitdown import MarkItDown
-from contextlib import asynccontextmanager
-from src.config.logging import logger
-
-buddy_orchestrator = BuddyOrchestrator()
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Lifespan context manager for the FastAPI application.
-    Initializes the BuddyOrchestrator and cleans up resources on shutdown.
-    """
-    try:
-        # Initialize session service and runner
-        APP_NAME="test_agent_app"
-        USER_ID="user1"
-        SESSION_ID="1234"
-
-        app.state.agent = root_agent
-        app.state.session_service = InMemorySessionService()
-        app.state.runner = Runner(
-            agent=app.state.agent, 
-            app_name=APP_NAME, 
-            session_service= app.state.session_service,
-            )
-        session = await app.state.session_service.create_session(
-            app_name=APP_NAME,
-            user_id=USER_ID,
-            session_id=SESSION_ID,
-        )
-
-        # Ensure the ChromaDB directory exists
-        chroma_db_path = "chroma_db"
-        if not os.path.exists(chroma_db_path):
-            os.makedirs(chroma_db_path)
-        else:
-            logger.info(f"ChromaDB directory '{chroma_db_path}' already exists.")
-        
-        yield
-    finally:
-        # Cleanup resources if needed
-        # For example, clear the ChromaDB directory on shutdown
-        for filename in os.listdir(chroma_db_path):
-            file_path = os.path.join(chroma_db_path, filename)
-            if os.path.isfile(file_path) or os.path.islink(file_path):
-                os.unlink(file_path)
-            elif os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-
-app = FastAPI(                                                      # http://127.0.0.1:8000/docs#
-    title="Hey Buddy",
-    version="0.1.0",
-    description="A simple AI assistant for your daily tasks.",
-    contact={
-        "name": "Hey Buddy Team",
-        "email": ""
-        },
-    lifespan=lifespan,
-    )
-
-origins = ["*"]
-app.debug = platform.system() == "Windows"
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-def get_runner(request: Request) -> Runner:
-    return request.app.state.runner
-
-def get_session_service(request: Request)-> InMemorySessionService:
-    return request.app.state.session_service
-
-@app.get("/buddy/status", summary="Root endpoint to check if the API is running.")
-async def get_buddy_status():
-    """
-    Endpoint to check the status of the BuddyOrchestrator.
-    Returns a simple message indicating the service is running.
-    """
-    message = "Buddy is running."
-    return JSONResponse(content=message, status_code=200)
-
-@app.post("/buddy/talk", response_model=OutputQuery, summary="Process a query and return an answer.")
-async def buddy_talk_handler(query_data: InputQuery,
-                             runner: Runner = Depends(get_runner),
-                             session_service: InMemorySessionService = Depends(get_session_service)
-                             ) -> OutputQuery:
-    """
-    Endpoint to process a query and return an answer.
-    """
-    # Add trackers, logs, Use HTTP requests, or any other logic here
-    # To talk to gemini client
-    # response = buddy_orchestrator.buddy_talk(query_data)
-
-    # To talk to the agent
-    response = await buddy_orchestrator.run_agent_interaction(query_data, runner, session_service)
-
-    return response
-
-@app.post("/upload-doc/") #, response_model=DocumentInfo, summary="Upload and process a single PDF file.")
-async def upload_doc(file: UploadFile = File(...)):
-    """
-    This endpoint handles the uploading and processing of a single PDF file.
-    - Extracts text from the PDF.
-    - Splits text into chunks.
-    - Generates embeddings for the chunks.
-    - Creates and stores a FAISS vector index for the document.
-    - Returns the processed document's info with its unique ID.
-    """
-    
-    if not file:
-        raise HTTPException(status_code=400, detail="No file was uploaded.")
-
-    response = await buddy_orchestrator.document_ingestion(file)
-
-    return response
-
-@app.post("/chat-doc/")
-async def chat_doc(request: ChatRequest) -> Dict[str, Any]:
-    """
-    Query a previously uploaded document.
-    """
-    if not request.document_id.strip():
-        raise HTTPException(status_code=400, detail="document_id is required.")
-    if not request.query.strip():
-        raise HTTPException(status_code=400, detail="query is required.")
-
-    # Check document existence in ChromaDB
-    doc_check = buddy_orchestrator.collection.get(
-        where={"document_id": request.document_id},
-        limit=1
-    )
-    if not doc_check["ids"]:
-        raise HTTPException(status_code=404, detail=f"Document '{request.document_id}' not found.")
-
-    # Embed query
-    query_embedding = buddy_orchestrator.client["gemini-embedding-001"].embed_content(
-        [request.query]
-    )["embedding"][0]
-
-    # Retrieve relevant chunks
-    results = buddy_orchestrator.collection.query(
-        query_embeddings=[query_embedding],
-        n_results=request.top_k,
-        where={"document_id": request.document_id}
-    )
-    if not results or results.get("documents") is None or not results["documents"]:
-        raise HTTPException(status_code=404, detail="No relevant document chunks found for the given query.")
-    retrieved_docs = results["documents"][0]
-
-    if not results or results.get("metadatas") is None or not results["metadatas"]:
-        raise HTTPException(status_code=404, detail="No relevant metadatas found for the given query.")
-    retrieved_meta = results["metadatas"][0]
-
-    # Build context
-    context_text = "\n\n".join(retrieved_docs)
-
-    # Generate answer with Gemini
-    prompt = (
-        f"You are a helpful assistant. Use the provided document excerpts to answer the question.\n\n"
-        f"Document Context:\n{context_text}\n\n"
-        f"Question: {request.query}\n\n"
-        f"Answer:"
-    )
-    answer = buddy_orchestrator.client["gemini-1.5-flash"].ask(prompt).answer
-
-    return {
-        "query": request.query,
-        "answer": answer,
-        "sources": [
-            {"chunk": doc, "metadata": meta}
-            for doc, meta in zip(retrieved_docs, retrieved_meta)
-        ]
-    }
-
-# -----------------------------
-# Gradio ChatBot Logic
-# -----------------------------
-
-# def chatbot_gradio(user_input, chat_history):
-
-#     # Call FastAPI endpoint
-#     try:
-#         response = requests.post(
-#             "http://localhost:8000/buddy/talk",
-#             json={"query": user_input, "chat_history": chat_history}
-#         )
-#         response.raise_for_status()
-#         result = response.json()
-#         answer = result["answer"]
-#         return answer
-#     except Exception as e:
-#         error_msg = f"Error: {str(e)}"
-#         return error_msg
-
-# # -----------------------------
-# # Gradio Interface
-# # -----------------------------
-
-# demo = gr.ChatInterface(
-#     fn=chatbot_gradio,
-#     type="messages",
-#     chatbot=gr.Chatbot(height=525),
-#     textbox=gr.Textbox(placeholder="Ask me any question", container=False, scale=7),
-#     title="Buddy ChatBot",
-#     description="Talk to Buddy! Powered by FastAPI.",
-#     theme="ocean",
-#     examples=["Hello", "Am I cool?", "Are tomatoes vegetables?"],
-# )
-
-# # -----------------------------
-# # Mount Gradio into FastAPI
-# # -----------------------------
-
-# app = gr.mount_gradio_app(app, demo, path="/buddy/talk/ui") # http://localhost:8000/buddy/talk/ui/
-
+from src.orchestrator.orchestrator import BuddyOrchestrator, APP_NAME
+from src.orchestrator.sessions.session_store import TieredSessionService
+from src.orchestrator.metrics.prometheus import registry, http_request_duration, CONTENT_TYPE
+from src.orchestrator.usage.accounting import usage_ledger
+from src.config.app_settings import AdminParams
+from src.validation.input_schema import InputQuery, ChatRequest, ChatBatchRequest, ChatDocumentsRequest
+from src.validation.output_schema import OutputQuery, IngestionJobStatus, DocumentRecord
+
+from fastapi import FastAPI, Request, Response, Depends, UploadFile, File, Form, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+
+from google.adk.runners import Runner
+
+import os
+import hmac
+import json
+import time
+import platform
+from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from src.config.logging import logger
+
+buddy_orchestrator = BuddyOrchestrator()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lifespan context manager for the FastAPI application.
+    Initializes the BuddyOrchestrator and cleans up resources on shutdown.
+    """
+    try:
+        # The agent modules build their tools and sub-agents at import, they are loaded when the
+        # server starts rather than whenever `src.main` is imported (tests, scripts, profiling)
+        started = time.perf_counter()
+        from src.orchestrator.agents.agent import root_agent
+        from src.orchestrator.agents.sub_agents.city_weather.agent import daily_weather_report_workflow
+        from src.orchestrator.agents.sub_agents.indian_stock.agent import daily_stock_report_workflow
+        from src.orchestrator.agents.sub_agents.stock_portfolio.agent import portfolio_report_workflow
+        agents_loaded = time.perf_counter()
+
+        # Initialize session service and runner
+        # Sessions are created per user on first use and persisted, with a bounded in-memory hot tier
+        app.state.agent = root_agent
+        app.state.session_service = TieredSessionService()
+        app.state.runner = Runner(
+            agent=app.state.agent, 
+            app_name=APP_NAME, 
+            session_service= app.state.session_service,
+            )
+        # Workflow runners the intent router dispatches to directly, sharing the same sessions
+        app.state.routed_runners = {
+            route: Runner(agent=workflow, app_name=APP_NAME, session_service=app.state.session_service)
+            for route, workflow in {
+                "weather": daily_weather_report_workflow,
+                "stock": daily_stock_report_workflow,
+                "portfolio": portfolio_report_workflow,
+            }.items()
+        }
+
+        # The ChromaDB directory and the document registry persist across restarts,
+        # wiping them is an explicit admin action (DELETE /admin/vector-store or `python -m src.manage wipe`)
+        logger.info(f"Vector store at '{buddy_orchestrator.vector_params.path}' holds {len(buddy_orchestrator.document_registry)} documents.")
+
+        # Start the background ingestion workers and warm the hot documents
+        await buddy_orchestrator.start()
+        logger.info(
+            f"Startup took {time.perf_counter() - started:.2f}s (agents {agents_loaded - started:.2f}s), "
+            f"see `python -m src.startup_profile` for a per-module breakdown"
+        )
+
+        yield
+    finally:
+        # Cleanup resources if needed
+        await buddy_orchestrator.aclose()
+
+app = FastAPI(                                                      # http://127.0.0.1:8000/docs#
+    title="Hey Buddy",
+    version="0.1.0",
+    description="A simple AI assistant for your daily tasks.",
+    contact={
+        "name": "Hey Buddy Team",
+        "email": ""
+        },
+    lifespan=lifespan,
+    )
+
+origins = ["*"]
+app.debug = platform.system() == "Windows"
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """
+    Observes the latency of every request in `http_request_duration_seconds`.
+    Requests are labelled by route template (`/jobs/{job_id}`), not by raw path, to keep the
+    number of series bounded. For streaming responses this is the time until the stream starts.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        http_request_duration.observe(time.perf_counter() - start, method=request.method, path=path, status=str(status))
+
+admin_params = AdminParams()
+
+def require_admin(request: Request) -> None:
+    """
+    Dependency of the admin endpoints: the `X-Admin-Token` header must match `ADMIN_TOKEN`.
+    The admin endpoints are disabled while `ADMIN_TOKEN` is not set.
+    """
+    if not admin_params.token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled, set ADMIN_TOKEN to enable them.")
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), admin_params.token):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+def get_runner(request: Request) -> Runner:
+    return request.app.state.runner
+
+def get_routed_runners(request: Request) -> Dict[str, Runner]:
+    return request.app.state.routed_runners
+
+def get_session_service(request: Request)-> TieredSessionService:
+    return request.app.state.session_service
+
+def wants_cache_bypass(request: Request) -> bool:
+    """
+    True if the client asked to skip the semantic cache with `X-Cache-Bypass` or `Cache-Control: no-cache`.
+    """
+    bypass = request.headers.get("X-Cache-Bypass", "").lower() in ("1", "true", "yes")
+    return bypass or "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+@app.get("/buddy/status", summary="Root endpoint to check if the API is running.")
+async def get_buddy_status():
+    """
+    Endpoint to check the status of the BuddyOrchestrator.
+    Returns a simple message indicating the service is running.
+    """
+    message = "Buddy is running."
+    return JSONResponse(content=message, status_code=200)
+
+@app.get("/embedding-cache/stats", summary="Hit/miss counters of the embedding cache.")
+async def get_embedding_cache_stats():
+    """
+    Endpoint to inspect the persistent embedding cache.
+    Returns the hit/miss counters and the number of cached vectors.
+    """
+    if buddy_orchestrator.embedding_cache is None:
+        return JSONResponse(content={"enabled": False}, status_code=200)
+    return JSONResponse(content={"enabled": True, **buddy_orchestrator.embedding_cache.stats()}, status_code=200)
+
+@app.get("/sessions/stats", summary="Number of agent sessions held in memory.")
+async def get_session_stats(session_service: TieredSessionService = Depends(get_session_service)):
+    """
+    Endpoint to inspect the in-memory tier of the session store.
+    """
+    return JSONResponse(content=session_service.stats(), status_code=200)
+
+@app.get("/vector-store/stats", summary="Partitions and exact-search cache of the vector store.")
+async def get_vector_store_stats():
+    """
+    Endpoint to inspect the partitioned vector store.
+    Returns the number of dedicated collections and the in-memory exact-search cache usage.
+    """
+    return JSONResponse(content=buddy_orchestrator.vector_store.stats(), status_code=200)
+
+@app.post("/admin/vector-store/snapshots", dependencies=[Depends(require_admin)], summary="Snapshot the vector store and the document registry.")
+async def create_vector_store_snapshot(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Copies the ChromaDB files and the document registry into `VECTOR_SNAPSHOT_DIR/<name>`.
+    Refused with 409 while ingestion jobs are running. Restoring is an offline command:
+    `python -m src.manage restore <name>` with the server stopped.
+    """
+    return await buddy_orchestrator.snapshot_documents(name)
+
+@app.get("/admin/vector-store/snapshots", dependencies=[Depends(require_admin)], summary="List the vector store snapshots.")
+async def list_vector_store_snapshots() -> List[Dict[str, Any]]:
+    """
+    Returns the manifests of the snapshots, newest first.
+    """
+    return buddy_orchestrator.snapshots.list()
+
+@app.delete("/admin/vector-store", dependencies=[Depends(require_admin)], summary="Delete every ingested document.")
+async def wipe_vector_store() -> Dict[str, Any]:
+    """
+    Deletes all collections, the document registry and the cached document answers.
+    Refused with 409 while ingestion jobs are running.
+    """
+    return await buddy_orchestrator.wipe_documents()
+
+@app.get("/semantic-cache/stats", summary="Hit rate of the semantic answer cache.")
+async def get_semantic_cache_stats():
+    """
+    Endpoint to inspect the semantic answer cache.
+    Returns hit/miss/bypass counters, hit rate and size per route.
+    """
+    if buddy_orchestrator.semantic_cache is None:
+        return JSONResponse(content={"enabled": False}, status_code=200)
+    return JSONResponse(content={"enabled": True, **buddy_orchestrator.semantic_cache.stats()}, status_code=200)
+
+@app.get("/metrics", response_class=PlainTextResponse, summary="Latency histograms in the Prometheus text format.")
+async def get_metrics():
+    """
+    Endpoint scraped by Prometheus.
+    Exports endpoint latency, per-agent and per-tool durations, Gemini latency per model,
+    embedding batch sizes, ChromaDB call latency and ingestion stage durations.
+    """
+    return PlainTextResponse(content=registry.expose(), media_type=CONTENT_TYPE)
+
+@app.get("/usage/stats", summary="Tokens and cost per endpoint.")
+async def get_usage_stats():
+    """
+    Endpoint to inspect the token and cost accounting.
+    Returns the totals per endpoint and the session budget settings.
+    """
+    return JSONResponse(content=usage_ledger.stats(), status_code=200)
+
+@app.get("/usage/sessions/{session_id}", summary="Tokens and cost of a session.")
+async def get_session_usage(session_id: str):
+    """
+    Returns the tokens and cost charged to an agent session.
+    """
+    usage = usage_ledger.session_usage(session_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail=f"No usage recorded for session '{session_id}'.")
+    return JSONResponse(content=usage, status_code=200)
+
+@app.get("/usage/documents/{document_id}", summary="Tokens and cost of a document.")
+async def get_document_usage(document_id: str):
+    """
+    Returns the tokens and cost charged to a document, its ingestion and the questions asked about it.
+    """
+    usage = usage_ledger.document_usage(document_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail=f"No usage recorded for document '{document_id}'.")
+    return JSONResponse(content=usage, status_code=200)
+
+@app.post("/buddy/talk", response_model=OutputQuery, summary="Process a query and return an answer.")
+async def buddy_talk_handler(query_data: InputQuery,
+                             http_request: Request,
+                             http_response: Response,
+                             runner: Runner = Depends(get_runner),
+                             routed_runners: Dict[str, Runner] = Depends(get_routed_runners),
+                             session_service: TieredSessionService = Depends(get_session_service)
+                             ) -> OutputQuery:
+    """
+    Endpoint to process a query and return an answer.
+    Send `X-Cache-Bypass: true` (or `Cache-Control: no-cache`) to skip the semantic cache.
+    """
+    # Add trackers, logs, Use HTTP requests, or any other logic here
+    # To talk to gemini client
+    # response = buddy_orchestrator.buddy_talk(query_data)
+
+    # To talk to the agent
+    response = await buddy_orchestrator.run_agent_interaction(
+        query_data, runner, session_service, use_cache=not wants_cache_bypass(http_request),
+        routed_runners=routed_runners
+    )
+    http_response.headers["X-Cache"] = "HIT" if response.cached else "MISS"
+
+    return response
+
+@app.post("/buddy/talk/stream", summary="Process a query and stream the intermediate steps as Server-Sent Events.")
+async def buddy_talk_stream_handler(query_data: InputQuery,
+                                    runner: Runner = Depends(get_runner),
+                                    routed_runners: Dict[str, Runner] = Depends(get_routed_runners),
+                                    session_service: TieredSessionService = Depends(get_session_service)
+                                    ) -> StreamingResponse:
+    """
+    Streaming variant of `/buddy/talk`.
+    Sends tool calls, sub-agent outputs, token deltas and the final answer as SSE events
+    (`event: <type>` / `data: <json>`) while the agent chain is still running.
+    """
+    # Checked before the stream starts, so an over-budget session still gets a plain 429
+    downgraded = buddy_orchestrator.check_budget(query_data.session_id)
+
+    async def event_stream():
+        async for item in buddy_orchestrator.stream_agent_interaction(query_data, runner, session_service, routed_runners, downgraded):
+            yield f"event: {item['type']}\ndata: {json.dumps(item, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/upload-doc/", response_model=IngestionJobStatus, status_code=202, summary="Upload a single document for background processing.")
+async def upload_doc(file: UploadFile = File(...), user_id: str = Form("anonymous")) -> IngestionJobStatus:
+    """
+    This endpoint handles the uploading of a single document and queues it for processing.
+    - Spools the upload to disk and returns at once with the job and document IDs.
+    - A background worker then extracts the text, splits it into chunks,
+      generates embeddings and stores them in ChromaDB.
+    - Progress is available on `/jobs/{job_id}`.
+    - The optional `user_id` form field records the owner, used by `/chat-docs/` to search all of a user's documents.
+    """
+    
+    if not file:
+        raise HTTPException(status_code=400, detail="No file was uploaded.")
+
+    response = await buddy_orchestrator.document_ingestion(file, user_id)
+
+    return response
+
+@app.get("/jobs/{job_id}", response_model=IngestionJobStatus, summary="Get the progress of an ingestion job.")
+async def get_job(job_id: str) -> IngestionJobStatus:
+    """
+    Returns the stage, chunks embedded/total and timings of an ingestion job.
+    """
+    return buddy_orchestrator.get_ingestion_job(job_id)
+
+@app.get("/documents", response_model=List[DocumentRecord], summary="List the ingested documents.")
+async def list_documents(offset: int = 0, limit: int = 100, user_id: Optional[str] = None) -> List[DocumentRecord]:
+    """
+    Returns the ingested documents with their filename, hashes, chunk count, embedding model
+    and ingest time, most recent first. Pass `user_id` to list only one user's documents.
+    """
+    if offset < 0 or not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 1000.")
+    return buddy_orchestrator.document_registry.list(offset=offset, limit=limit, user_id=user_id)
+
+@app.get("/documents/{document_id}", response_model=DocumentRecord, summary="Get an ingested document.")
+async def get_document(document_id: str) -> DocumentRecord:
+    """
+    Returns the registry entry of a document.
+    """
+    record = buddy_orchestrator.document_registry.get(document_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Document '{document_id}' not found.")
+    return record
+
+@app.post("/chat-doc/")
+async def chat_doc(request: ChatRequest, http_request: Request, http_response: Response) -> Dict[str, Any]:
+    """
+    Query a previously uploaded document.
+    Send `X-Cache-Bypass: true` (or `Cache-Control: no-cache`) to skip the semantic cache.
+    """
+    if not request.document_id.strip():
+        raise HTTPException(status_code=400, detail="document_id is required.")
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="query is required.")
+
+    # Check document existence in the registry, an in-memory lookup
+    if request.document_id not in buddy_orchestrator.document_registry:
+        raise HTTPException(status_code=404, detail=f"Document '{request.document_id}' not found.")
+
+    response = await buddy_orchestrator.chat_with_document(
+        query=request.query,
+        document_id=request.document_id,
+        top_k=request.top_k,
+        use_cache=not wants_cache_bypass(http_request),
+        session_id=request.session_id,
+    )
+    http_response.headers["X-Cache"] = "HIT" if response["cached"] else "MISS"
+    return response
+
+@app.post("/chat-doc/batch")
+async def chat_doc_batch(request: ChatBatchRequest, http_request: Request) -> Dict[str, Any]:
+    """
+    Ask many questions about a previously uploaded document in one request.
+    The questions are embedded in one batch and searched in one multi-query search, and
+    the answers are generated concurrently. Results come back in the order of `queries`;
+    a question that fails carries its own `error` instead of failing the whole batch.
+    Send `X-Cache-Bypass: true` (or `Cache-Control: no-cache`) to skip the semantic cache.
+    """
+    if not request.document_id.strip():
+        raise HTTPException(status_code=400, detail="document_id is required.")
+    max_questions = buddy_orchestrator.chat_batch_params.max_questions
+    if not 1 <= len(request.queries) <= max_questions:
+        raise HTTPException(status_code=400, detail=f"queries must hold between 1 and {max_questions} questions.")
+
+    # One existence check for the whole batch
+    if request.document_id not in buddy_orchestrator.document_registry:
+        raise HTTPException(status_code=404, detail=f"Document '{request.document_id}' not found.")
+
+    return await buddy_orchestrator.chat_with_document_batch(
+        queries=request.queries,
+        document_id=request.document_id,
+        top_k=request.top_k,
+        use_cache=not wants_cache_bypass(http_request),
+        session_id=request.session_id,
+    )
+
+@app.post("/chat-docs/")
+async def chat_docs(request: ChatDocumentsRequest, http_request: Request) -> Dict[str, Any]:
+    """
+    Ask one question across several uploaded documents, or across all documents of a user.
+    The documents are searched concurrently and only the best `top_k` chunks over all of them
+    are used for a single answer. Every source carries its citation number, document and score.
+    Send `X-Cache-Bypass: true` (or `Cache-Control: no-cache`) to skip the semantic cache.
+    """
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="query is required.")
+
+    registry = buddy_orchestrator.document_registry
+    if request.document_ids:
+        document_ids = list(dict.fromkeys(request.document_ids))
+        missing = [document_id for document_id in document_ids if document_id not in registry]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Documents not found: {', '.join(missing)}.")
+    elif request.user_id:
+        document_ids = [record.document_id for record in registry.list(limit=len(registry), user_id=request.user_id)]
+        if not document_ids:
+            raise HTTPException(status_code=404, detail=f"User '{request.user_id}' has no documents.")
+    else:
+        raise HTTPException(status_code=400, detail="Either document_ids or user_id is required.")
+
+    max_documents = buddy_orchestrator.vector_store.params.max_fanout_documents
+    if len(document_ids) > max_documents:
+        raise HTTPException(status_code=400, detail=f"A question can search at most {max_documents} documents.")
+
+    return await buddy_orchestrator.chat_with_documents(
+        query=request.query,
+        document_ids=document_ids,
+        top_k=request.top_k,
+        use_cache=not wants_cache_bypass(http_request),
+        session_id=request.session_id,
+    )
+
+# -----------------------------
+# Gradio ChatBot Logic
+# -----------------------------
+# Not imported while the UI is disabled, gradio alone takes seconds to import.
+# To enable it, uncomment the code below and add `import requests` and `import gradio as gr`.
+
+# def chatbot_gradio(user_input, chat_history):
+
+#     # Call FastAPI endpoint
+#     try:
+#         response = requests.post(
+#             "http://localhost:8000/buddy/talk",
+#             json={"query": user_input, "chat_history": chat_history}
+#         )
+#         response.raise_for_status()
+#         result = response.json()
+#         answer = result["answer"]
+#         return answer
+#     except Exception as e:
+#         error_msg = f"Error: {str(e)}"
+#         return error_msg
+
+# # -----------------------------
+# # Gradio Interface
+# # -----------------------------
+
+# demo = gr.ChatInterface(
+#     fn=chatbot_gradio,
+#     type="messages",
+#     chatbot=gr.Chatbot(height=525),
+#     textbox=gr.Textbox(placeholder="Ask me any question", container=False, scale=7),
+#     title="Buddy ChatBot",
+#     description="Talk to Buddy! Powered by FastAPI.",
+#     theme="ocean",
+#     examples=["Hello", "Am I cool?", "Are tomatoes vegetables?"],
+# )
+
+# # -----------------------------
+# # Mount Gradio into FastAPI
+# # -----------------------------
+
+# app = gr.mount_gradio_app(app, demo, path="/buddy/talk/ui") # http://localhost:8000/buddy/talk/ui/
+
 # bye
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Offline maintenance commands for the document index. Run from the `backend` directory:
+
+    python -m src.manage snapshot [--name NAME]   # copy the vector store and the document registry
+    python -m src.manage snapshots                # list the snapshots
+    python -m src.manage restore NAME             # replace the vector store with a snapshot
+    python -m src.manage wipe --yes               # delete every ingested document
+
+`restore` and `wipe` replace files under the ChromaDB client, stop the server first.
+While the server runs, use the admin endpoints (`/admin/vector-store...`) instead.
+"""
+from src.config.app_settings import DocumentRegistryParams, VectorStoreParams
+from src.orchestrator.vectorstore.snapshots import VectorStoreSnapshots
+from src.orchestrator.documents.registry import DocumentRegistry
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+from src.config.logging import logger
+
+
+def wipe(vector_params: VectorStoreParams, registry_params: DocumentRegistryParams) -> None:
+    """
+    Deletes the ChromaDB files and the rows of the document registry, the registry must not outlive the chunks.
+    """
+    if os.path.isdir(vector_params.path):
+        for filename in os.listdir(vector_params.path):
+            file_path = os.path.join(vector_params.path, filename)
+            if os.path.isfile(file_path) or os.path.islink(file_path):
+                os.unlink(file_path)
+            elif os.path.isdir(file_path):
+                shutil.rmtree(file_path)
+    DocumentRegistry(registry_params).clear()
+    logger.info(f"Wiped the vector store at '{vector_params.path}' and the document registry")
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.manage", description="Maintenance commands for the document index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot = commands.add_parser("snapshot", help="Snapshot the vector store and the document registry.")
+    snapshot.add_argument("--name", help="Name of the snapshot, defaults to the current UTC time.")
+    commands.add_parser("snapshots", help="List the snapshots, newest first.")
+    restore = commands.add_parser("restore", help="Replace the vector store and the registry with a snapshot.")
+    restore.add_argument("name")
+    wipe_command = commands.add_parser("wipe", help="Delete every ingested document.")
+    wipe_command.add_argument("--yes", action="store_true", help="Confirm the deletion.")
+    args = parser.parse_args(argv)
+
+    vector_params = VectorStoreParams()
+    registry_params = DocumentRegistryParams()
+    snapshots = VectorStoreSnapshots(vector_params, registry_params)
+    try:
+        if args.command == "snapshot":
+            print(json.dumps(snapshots.create(args.name), indent=2))
+        elif args.command == "snapshots":
+            print(json.dumps(snapshots.list(), indent=2))
+        elif args.command == "restore":
+            print(json.dumps(snapshots.restore(args.name), indent=2))
+        elif args.command == "wipe":
+            if not args.yes:
+                print("Refusing to delete every document without --yes.")
+                return 2
+            wipe(vector_params, registry_params)
+    except (ValueError, FileExistsError, FileNotFoundError) as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,84 @@
+import asyncio
+import re
+from typing import Any, AsyncGenerator, Callable, Dict
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai.types import Content, Part
+
+from src.orchestrator.metrics.prometheus import tool_duration
+from src.config.logging import logger
+
+# Same `{key}` placeholder syntax as LlmAgent instructions
+PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def _emit(agent: BaseAgent, ctx: InvocationContext, text: str, output_key: str) -> Event:
+    """
+    Builds the event of a code-only step: its text as content and as a state write to `output_key`.
+    """
+    return Event(
+        invocation_id=ctx.invocation_id,
+        author=agent.name,
+        branch=ctx.branch,
+        content=Content(role="model", parts=[Part(text=text)]),
+        actions=EventActions(state_delta={output_key: text}),
+    )
+
+
+class ToolStepAgent(BaseAgent):
+    """
+    A code-only workflow step that calls one tool and writes its result straight into state.
+    It replaces an LlmAgent whose only job is to call a tool and repeat its output, which costs
+    two model round trips (the tool call and the echo) and re-tokenizes the whole report.
+
+    The tool follows the tools' convention of returning {"status": ..., "report"/"error_message": ...}.
+    Its arguments come from state (`state_args`, parameter -> state key) and/or constants (`static_args`).
+    """
+    tool: Callable[..., Dict[str, Any]]
+    output_key: str
+    state_args: Dict[str, str] = {}
+    static_args: Dict[str, Any] = {}
+    result_field: str = "report"
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        args = {param: str(ctx.session.state.get(key, "")).strip() for param, key in self.state_args.items()}
+        args.update(self.static_args)
+
+        try:
+            # Tools are blocking (HTTP, yfinance), keep them off the event loop. The call emits no
+            # function call/response events, so AgentRunTracker cannot time it: it is timed here.
+            with tool_duration.time(tool=self.tool.__name__, agent=self.name):
+                result = await asyncio.to_thread(self.tool, **args)
+        except Exception as e:
+            result = {"status": "error", "error_message": str(e)}
+
+        if result.get("status") == "success":
+            text = str(result.get(self.result_field, ""))
+        else:
+            text = f"Error: {result.get('error_message', 'unknown error')}"
+            logger.info(f"{self.name}: {self.tool.__name__}({args}) failed: {text}")
+
+        yield _emit(self, ctx, text, self.output_key)
+
+
+class TemplateWriterAgent(BaseAgent):
+    """
+    A code-only workflow step that renders a fixed template from state.
+    Placeholders use the `{key}` syntax of LlmAgent instructions. Missing or empty values
+    are replaced by `defaults[key]`, or by an empty string.
+    """
+    template: str
+    output_key: str
+    defaults: Dict[str, str] = {}
+
+    def render(self, state: Dict[str, Any]) -> str:
+        def substitute(match: re.Match) -> str:
+            key = match.group(1)
+            value = str(state.get(key, "") or "").strip()
+            return value or self.defaults.get(key, "")
+        return PLACEHOLDER.sub(substitute, self.template).strip()
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        yield _emit(self, ctx, self.render(ctx.session.state), self.output_key)
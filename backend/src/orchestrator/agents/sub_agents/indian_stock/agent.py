@@ -1,70 +1,93 @@
-from google.adk.agents import LlmAgent
-from google.adk.tools import google_search
-from google.adk.agents import SequentialAgent
-from src.orchestrator.agents.tools.stock_info_tool import get_stock_analysis
-# from agents.tools.stock_info_tool import get_stock_analysis
-
-# --- 1. Define Specialist Agents ---
-
-# The agent responsible for getting raw stock data
-stock_agent = LlmAgent(
-    model="gemini-2.0-flash-001",
-    name="StockBot",
-    description="Gets the latest stock information and analysis for a specific company or index.",
-    instruction="""
-    You are an AI assistant specializing in Indian stock market updates.
-    Your sole purpose is to use the `get_stock_analysis` tool to get the latest stock information for a company or index.
-    The final output should ONLY be the raw report from the tool.
-    """,
-    tools=[get_stock_analysis],
-    output_key="stock_data" # Saves the result to state['stock_data']
-)
-
-# Step 2: Get investment/lifestyle tips based on the stock data.
-stock_advisor_agent = LlmAgent(
-    model="gemini-2.0-flash-001",
-    name="StockAdvisorAgent",
-    description="Recommends investment or financial tips based on stock data.",
-    instruction="""
-    You are an expert Financial Advisor.
-    Your task is to find investment tips and financial advice based on the provided stock report.
-
-    **Today's Stock Data:**
-    {stock_data}
-
-    Based on the stock data above, use your `Google Search` tool to find relevant investment advice, risk warnings, and market news.
-    Output a bulleted list of your findings.
-    """,
-    tools=[google_search],
-    output_key="advisor_tips" # Saves the result to state['advisor_tips']
-)
-
-# Step 3: Write the final report using all collected data.
-writer_agent = LlmAgent(
-    model="gemini-2.0-flash-001",
-    name="WriterBot",
-    description="Writes a final, human-readable stock market report.",
-    instruction="""
-    You are a skilled Financial Content Writer.
-    Your goal is to synthesize all the provided information into a single, comprehensive, and easy-to-read report.
-
-    **Raw Stock Data:**
-    {stock_data}
-
-    **Advisor Suggestions:**
-    {advisor_tips}
-
-    Combine this information into a final report with clear headings for "Today's Stock Market Summary" and "Advisor Suggestions".
-    """,
-    tools=[],
-    output_key="final_stock_report" 
-)
-
-# --- 2. Create the SequentialAgent using the `sub_agents` list ---
-
-daily_stock_report_workflow = SequentialAgent(
-    name="DailyStockReportWorkflow",
-    description="A workflow that gets stock data, finds advisor tips, and writes a full report.",
-    sub_agents=[stock_agent, stock_advisor_agent, writer_agent],
-)
-
+from google.adk.agents import LlmAgent
+from google.adk.tools import google_search
+from google.adk.agents import SequentialAgent
+from src.orchestrator.agents.tools.stock_info_tool import get_stock_analysis, get_multiple_stock_analysis
+from src.orchestrator.agents.deterministic import ToolStepAgent, TemplateWriterAgent
+# from agents.tools.stock_info_tool import get_stock_analysis
+
+# --- 1. Define Specialist Agents ---
+
+# The agent responsible for finding which company or index the user asks about
+ticker_finder_agent = LlmAgent(
+    model="gemini-2.0-flash-001",
+    name="TickerFinderAgent",
+    description="Finds the NSE ticker symbol based on user input.",
+    instruction="""
+    You are an AI assistant specializing in the Indian stock market.
+    Your task is to return the NSE ticker symbol of the company or index the user asks about
+    (e.g. Reliance Industries -> RELIANCE, Tata Consultancy Services -> TCS).
+    If the user asks about several companies, return all their symbols separated by commas.
+    The final output should ONLY be the ticker symbol(s).
+    """,
+    output_key="ticker" # Saves the result to state['ticker']
+)
+
+def analyse_tickers(tickers: str) -> dict:
+    """
+    Runs `get_stock_analysis` for one ticker, or `get_multiple_stock_analysis` in one batch for a comma separated list.
+    """
+    symbols = [symbol.strip().strip("`") for symbol in tickers.split(",") if symbol.strip().strip("`")]
+    if len(symbols) <= 1:
+        return get_stock_analysis(symbols[0] if symbols else tickers)
+
+    result = get_multiple_stock_analysis(symbols)
+    if result["status"] != "success":
+        return result
+    reports = list(result["reports"].values())
+    if result["not_found"]:
+        reports.append(f"No data found for: {', '.join(result['not_found'])}")
+    return {"status": "success", "report": "\n\n".join(reports)}
+
+# The step responsible for getting raw stock data.
+# It only calls the tool and stores its report, so it runs as code instead of an LLM round trip.
+stock_agent = ToolStepAgent(
+    name="StockBot",
+    description="Gets the latest stock information and analysis for a specific company or index.",
+    tool=analyse_tickers,
+    state_args={"tickers": "ticker"},
+    output_key="stock_data" # Saves the result to state['stock_data']
+)
+
+# Step 2: Get investment/lifestyle tips based on the stock data.
+stock_advisor_agent = LlmAgent(
+    model="gemini-2.0-flash-001",
+    name="StockAdvisorAgent",
+    description="Recommends investment or financial tips based on stock data.",
+    instruction="""
+    You are an expert Financial Advisor.
+    Your task is to find investment tips and financial advice based on the provided stock report.
+
+    **Today's Stock Data:**
+    {stock_data}
+
+    Based on the stock data above, use your `Google Search` tool to find relevant investment advice, risk warnings, and market news.
+    Output a bulleted list of your findings.
+    """,
+    tools=[google_search],
+    output_key="advisor_tips" # Saves the result to state['advisor_tips']
+)
+
+# Step 3: Write the final report using all collected data.
+# The report is a fixed template over the state, rendered without a model call.
+writer_agent = TemplateWriterAgent(
+    name="WriterBot",
+    description="Writes a final, human-readable stock market report.",
+    template="""
+# Today's Stock Market Summary
+{stock_data}
+
+# Advisor Suggestions
+{advisor_tips}
+""",
+    defaults={"advisor_tips": "No suggestions available."},
+    output_key="final_stock_report"
+)
+
+# --- 2. Create the SequentialAgent using the `sub_agents` list ---
+
+daily_stock_report_workflow = SequentialAgent(
+    name="DailyStockReportWorkflow",
+    description="A workflow that gets stock data, finds advisor tips, and writes a full report.",
+    sub_agents=[ticker_finder_agent, stock_agent, stock_advisor_agent, writer_agent],
+)
+
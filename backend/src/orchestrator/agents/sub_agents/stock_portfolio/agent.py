@@ -0,0 +1,169 @@
+import asyncio
+import re
+from typing import AsyncGenerator, List
+
+from google.adk.agents import BaseAgent, LlmAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.tools import google_search
+from google.genai.types import Content, Part
+
+from src.orchestrator.agents.tools.stock_info_tool import get_stock_analysis
+from src.orchestrator.agents.tools.stock_data import get_quotes
+from src.orchestrator.agents.deterministic import ToolStepAgent
+from src.config.logging import logger
+
+MAX_PORTFOLIO_TICKERS = 10
+
+# Step 1: Find the tickers the user is asking about.
+ticker_planner_agent = LlmAgent(
+    model="gemini-2.0-flash-001",
+    name="TickerPlannerAgent",
+    description="Extracts the Indian stock ticker symbols from the user's request.",
+    instruction="""
+    You are an AI assistant specializing in the Indian stock market.
+    Your task is to list the NSE ticker symbols of every company or index the user asks about.
+    Convert company names to their NSE symbols (e.g. Reliance Industries -> RELIANCE, HDFC Bank -> HDFCBANK).
+    The final output should ONLY be the symbols separated by commas, e.g. `RELIANCE,TCS,INFY`.
+    """,
+    output_key="tickers" # Saves the result to state['tickers']
+)
+
+
+def _parse_tickers(raw: str) -> List[str]:
+    """
+    Turns the planner output into a list of unique upper-case symbols.
+    """
+    symbols = [symbol.strip().strip("`").upper() for symbol in re.split(r"[,\s]+", raw or "")]
+    return list(dict.fromkeys(symbol for symbol in symbols if symbol))[:MAX_PORTFOLIO_TICKERS]
+
+
+def _state_key(symbol: str) -> str:
+    """
+    Returns a state key / agent name fragment that is a valid identifier for any symbol (e.g. M&M).
+    """
+    return re.sub(r"\W", "_", symbol)
+
+
+def _build_ticker_pipeline(symbol: str) -> SequentialAgent:
+    """
+    Builds the data -> advice pipeline of one ticker. Its results go to
+    state['stock_data_<SYMBOL>'] and state['advisor_tips_<SYMBOL>'].
+    """
+    key = _state_key(symbol)
+    # Code-only step, the report goes straight from the tool into state
+    stock_agent = ToolStepAgent(
+        name=f"StockBot_{key}",
+        description=f"Gets the latest stock information for {symbol}.",
+        tool=get_stock_analysis,
+        static_args={"ticker": symbol},
+        output_key=f"stock_data_{key}"
+    )
+    advisor_agent = LlmAgent(
+        model="gemini-2.0-flash-001",
+        name=f"StockAdvisorAgent_{key}",
+        description=f"Recommends investment or financial tips for {symbol}.",
+        instruction=f"""
+        You are an expert Financial Advisor.
+        Your task is to find investment tips and financial advice based on the provided stock report.
+
+        **Today's Stock Data:**
+        {{stock_data_{key}}}
+
+        Based on the stock data above, use your `Google Search` tool to find relevant investment advice, risk warnings, and market news.
+        Output a short bulleted list of your findings.
+        """,
+        tools=[google_search],
+        output_key=f"advisor_tips_{key}"
+    )
+    return SequentialAgent(
+        name=f"StockPipeline_{key}",
+        description=f"Gets stock data and advice for {symbol}.",
+        sub_agents=[stock_agent, advisor_agent],
+    )
+
+
+class PortfolioFanOutAgent(BaseAgent):
+    """
+    Runs one data -> advice pipeline per ticker concurrently and merges their results
+    into state['portfolio_data'] for a single writer pass.
+    The ticker list is only known at run time, so the per-ticker pipelines are built per
+    invocation and run under a `ParallelAgent`.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        symbols = _parse_tickers(ctx.session.state.get("tickers", ""))
+        if not symbols:
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=Content(role="model", parts=[Part(text="No stock tickers found in the request.")]),
+                actions=EventActions(state_delta={"portfolio_data": "No stock tickers found in the request."}),
+            )
+            return
+
+        # Warm the quote cache for every ticker in one batched download,
+        # so the per-ticker tool calls below are cache lookups
+        try:
+            await asyncio.to_thread(get_quotes, symbols)
+        except Exception as e:
+            logger.info(f"Batched quote prefetch failed, tickers will be fetched one by one: {e}")
+
+        logger.info(f"Running portfolio pipelines in parallel for {symbols}")
+        parallel = ParallelAgent(
+            name="PortfolioParallelAgent",
+            description="Runs the per-ticker stock pipelines concurrently.",
+            sub_agents=[_build_ticker_pipeline(symbol) for symbol in symbols],
+        )
+        async for event in parallel.run_async(ctx):
+            yield event
+
+        state = ctx.session.state
+        sections = []
+        for symbol in symbols:
+            key = _state_key(symbol)
+            sections.append(
+                f"## {symbol}\n"
+                f"**Stock Data:**\n{state.get(f'stock_data_{key}', 'No data available.')}\n\n"
+                f"**Advisor Suggestions:**\n{state.get(f'advisor_tips_{key}', 'No suggestions available.')}"
+            )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"portfolio_data": "\n\n".join(sections)}),
+        )
+
+
+portfolio_fan_out_agent = PortfolioFanOutAgent(
+    name="PortfolioFanOutAgent",
+    description="Gets stock data and advice for every ticker concurrently.",
+)
+
+# Step 3: Write the final report for all tickers in one pass.
+portfolio_writer_agent = LlmAgent(
+    model="gemini-2.0-flash-001",
+    name="PortfolioWriterBot",
+    description="Writes a final, human-readable multi-stock report.",
+    instruction="""
+    You are a skilled Financial Content Writer.
+    Your goal is to synthesize the data and advice for several stocks into a single, easy-to-read portfolio report.
+
+    **Per-Stock Data and Advice:**
+    {portfolio_data}
+
+    Start with a short comparison table (price, change %, trend, P/E) of all the stocks,
+    then give each stock its own section with "Today's Stock Market Summary" and "Advisor Suggestions".
+    """,
+    tools=[],
+    output_key="final_portfolio_report"
+)
+
+# --- Create the SequentialAgent using the `sub_agents` list ---
+
+portfolio_report_workflow = SequentialAgent(
+    name="PortfolioReportWorkflow",
+    description="A workflow that compares several stocks: it gets data and advice for every ticker in parallel and writes one combined report.",
+    sub_agents=[ticker_planner_agent, portfolio_fan_out_agent, portfolio_writer_agent],
+)
@@ -0,0 +1,229 @@
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dt_time, timedelta, timezone
+
+from src.orchestrator.cache.ttl_cache import TTLCache
+from src.config.logging import logger
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MARKET_OPEN = dt_time(9, 15)
+MARKET_CLOSE = dt_time(15, 30)
+
+# Quotes move during market hours, outside them the last close does not change
+QUOTE_TTL_MARKET_HOURS = 60
+QUOTE_TTL_CLOSED = 15 * 60
+PROFILE_TTL = 24 * 60 * 60
+EXCHANGE_TTL = 7 * 24 * 60 * 60
+
+# symbol -> resolved ticker with its exchange suffix (RELIANCE -> RELIANCE.NS)
+exchange_cache = TTLCache(name="stock_exchange", max_entries=4096, stale_ttl=0)
+# resolved ticker -> price data from one batched download
+quote_cache = TTLCache(name="stock_quotes", max_entries=4096, stale_ttl=60 * 60)
+# resolved ticker -> company name, sector, industry, P/E from the slow `info` scrape
+profile_cache = TTLCache(name="stock_profiles", max_entries=4096, stale_ttl=7 * 24 * 60 * 60)
+
+def _quote_ttl() -> float:
+    """
+    Returns how long a quote stays fresh: short while NSE/BSE are open, longer otherwise.
+    """
+    now = datetime.now(IST)
+    if now.weekday() < 5 and MARKET_OPEN <= now.time() <= MARKET_CLOSE:
+        return QUOTE_TTL_MARKET_HOURS
+    return QUOTE_TTL_CLOSED
+
+def _normalize_symbol(symbol: str) -> str:
+    return symbol.strip().upper()
+
+def _download(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Downloads 5 days of prices for many tickers in one round trip.
+    Tickers without data (wrong exchange, delisted) are left out of the result.
+    """
+    if not tickers:
+        return {}
+    # yfinance and pandas take about a second to import, they are loaded by the first stock lookup
+    import pandas as pd
+    import yfinance as yf
+
+    data = yf.download(
+        tickers=tickers,
+        period="5d",
+        group_by="ticker",
+        auto_adjust=False,
+        progress=False,
+        threads=True,
+    )
+    quotes = {}
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker]
+        else:
+            frame = data
+        frame = frame.dropna(subset=["Close"])
+        if frame.empty:
+            continue
+        closes = [float(value) for value in frame["Close"].tolist()]
+        quotes[ticker] = {
+            "closes": closes,
+            "last_price": closes[-1],
+            "previous_close": closes[-2] if len(closes) > 1 else None,
+            "volume": int(frame["Volume"].iloc[-1]) if "Volume" in frame else None,
+        }
+    return quotes
+
+def _resolve_and_download(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolves the exchange suffix of each symbol (NSE first, then BSE) and downloads their prices.
+    Resolved suffixes are remembered, so later calls go straight to the right exchange.
+
+    :return: symbol -> quote dictionary with a `ticker` key holding the resolved ticker.
+    """
+    quotes: Dict[str, Dict[str, Any]] = {}
+    resolved = {}
+    unresolved = []
+    for symbol in symbols:
+        if symbol.endswith((".NS", ".BO")):
+            resolved[symbol] = symbol
+        else:
+            ticker = exchange_cache.get(symbol)
+            if ticker is None:
+                unresolved.append(symbol)
+            else:
+                resolved[symbol] = ticker
+
+    known = _download(list(resolved.values()))
+    for symbol, ticker in resolved.items():
+        if ticker in known:
+            quotes[symbol] = {**known[ticker], "ticker": ticker}
+
+    # Symbols not seen before, try every one on NSE in one call, then the leftovers on BSE
+    for suffix in (".NS", ".BO"):
+        if not unresolved:
+            break
+        found = _download([f"{symbol}{suffix}" for symbol in unresolved])
+        still_unresolved = []
+        for symbol in unresolved:
+            ticker = f"{symbol}{suffix}"
+            if ticker in found:
+                exchange_cache.set(symbol, ticker, EXCHANGE_TTL)
+                quotes[symbol] = {**found[ticker], "ticker": ticker}
+            else:
+                still_unresolved.append(symbol)
+        unresolved = still_unresolved
+
+    return quotes
+
+def _load_profile(ticker: str) -> Dict[str, Any]:
+    """
+    Reads the slow `Ticker.info` profile and the market cap from `fast_info`.
+    """
+    import yfinance as yf
+
+    stock = yf.Ticker(ticker)
+    info = stock.info or {}
+    try:
+        market_cap = stock.fast_info.get("marketCap")
+    except Exception:
+        market_cap = info.get("marketCap")
+    return {
+        "long_name": info.get("longName", "N/A"),
+        "sector": info.get("sector", "N/A"),
+        "industry": info.get("industry", "N/A"),
+        "pe_ratio": info.get("trailingPE", "N/A"),
+        "market_cap": int(market_cap) if market_cap else "N/A",
+    }
+
+def get_profiles(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns company profiles for resolved tickers, loading the uncached ones concurrently.
+    """
+    profiles = {}
+    missing = []
+    for ticker in tickers:
+        profile = profile_cache.get(ticker)
+        if profile is None:
+            missing.append(ticker)
+        else:
+            profiles[ticker] = profile
+
+    def load(ticker: str) -> Dict[str, Any]:
+        try:
+            return profile_cache.get_or_load(ticker, lambda: (_load_profile(ticker), PROFILE_TTL))
+        except Exception as e:
+            logger.info(f"Could not load profile of {ticker}: {e}")
+            return {"long_name": "N/A", "sector": "N/A", "industry": "N/A", "pe_ratio": "N/A", "market_cap": "N/A"}
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as executor:
+            for ticker, profile in zip(missing, executor.map(load, missing)):
+                profiles[ticker] = profile
+    return profiles
+
+def get_quotes(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns quotes for many symbols, serving cached ones and fetching the rest in one batch.
+    Concurrent calls do not fetch the same symbol twice, and when the download fails or comes
+    back without a symbol, its last quote of the past hour is served instead.
+
+    :param symbols: NSE/BSE symbols with or without exchange suffix (e.g. 'RELIANCE', 'TCS.NS').
+    :return: symbol -> quote. Symbols that could not be resolved on either exchange are missing.
+    """
+    def load(missing: List[str]):
+        fetched = _resolve_and_download(missing)
+        logger.info(f"Fetched {len(fetched)}/{len(missing)} stock quotes in one batch")
+        return fetched, _quote_ttl()
+
+    symbols = list(dict.fromkeys(_normalize_symbol(symbol) for symbol in symbols))
+    return quote_cache.get_many_or_load(symbols, load)
+
+def format_report(quote: Dict[str, Any], profile: Dict[str, Any]) -> str:
+    """
+    Builds the human readable stock summary returned by the stock tools.
+    """
+    ticker = quote["ticker"]
+    closes = quote["closes"]
+    latest_price = closes[-1]
+    if len(closes) > 1:
+        price_change = latest_price - closes[-2]
+        price_change_pct = (price_change / closes[-2]) * 100
+    else:
+        price_change = 0
+        price_change_pct = 0
+    trend = "UPWARD" if price_change > 0 else "DOWNWARD" if price_change < 0 else "STABLE"
+
+    market_cap = profile.get("market_cap", "N/A")
+    volume = quote.get("volume")
+    market_cap_str = f"₹{market_cap:,}" if market_cap != 'N/A' else 'N/A'
+    volume_str = f"{volume:,}" if volume is not None else 'N/A'
+    previous_close = quote["previous_close"] if quote["previous_close"] is not None else 'N/A'
+
+    exchange = "NSE" if ticker.endswith('.NS') else "BSE" if ticker.endswith('.BO') else "Unknown"
+
+    return (
+        f"Stock Analysis for {ticker.upper()} ({exchange}):\n"
+        f"Company: {profile.get('long_name', 'N/A')}\n"
+        f"Sector: {profile.get('sector', 'N/A')}\n"
+        f"Industry: {profile.get('industry', 'N/A')}\n\n"
+        f"Current Price: ₹{quote['last_price']:.2f}\n"
+        f"Previous Close: ₹{previous_close}\n"
+        f"Latest Close: ₹{latest_price:.2f}\n"
+        f"Price Change: ₹{price_change:.2f} ({price_change_pct:.2f}%)\n"
+        f"Trend: {trend}\n\n"
+        f"Market Cap: {market_cap_str}\n"
+        f"Volume: {volume_str}\n"
+        f"P/E Ratio: {profile.get('pe_ratio', 'N/A')}"
+    )
+
+def get_reports(symbols: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Returns the stock summary of many symbols, None for the ones that could not be found.
+    """
+    quotes = get_quotes(symbols)
+    profiles = get_profiles([quote["ticker"] for quote in quotes.values()])
+    reports: Dict[str, Optional[str]] = {}
+    for symbol in dict.fromkeys(_normalize_symbol(symbol) for symbol in symbols):
+        quote = quotes.get(symbol)
+        reports[symbol] = format_report(quote, profiles[quote["ticker"]]) if quote else None
+    return reports
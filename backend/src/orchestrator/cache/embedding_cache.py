@@ -0,0 +1,146 @@
+from typing import List, Optional, Tuple, Dict
+from src.config.app_settings import EmbeddingCacheParams
+
+from array import array
+import hashlib
+import sqlite3
+import threading
+import time
+import os
+
+from src.config.logging import logger
+
+class EmbeddingCache:
+    """
+    A persistent, content-addressed cache for embedding vectors.
+    Vectors are keyed by (model, task_type, sha256(text)) and stored as float32 blobs in SQLite.
+    The cache is bounded by `max_entries`; the least recently used vectors are evicted first.
+    """
+
+    def __init__(self, params: Optional[EmbeddingCacheParams] = None):
+        """
+        Initializes the EmbeddingCache and creates the SQLite table if needed.
+
+        Args:
+            params: Location and size limit of the cache.
+        """
+        self.params = params or EmbeddingCacheParams()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.params.path))
+        os.makedirs(directory, exist_ok=True)
+        # The sync client writes from worker threads, access is serialised by self._lock
+        self._conn = sqlite3.connect(self.params.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        self._conn.commit()
+        # Counted once here and kept up to date by put_many and _evict, so writes never scan the table
+        (self._rows,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    @staticmethod
+    def make_key(model: str, task_type: str, text: str) -> str:
+        """
+        Builds the cache key for a text embedded with a given model and task type.
+        """
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model}:{task_type}:{digest}"
+
+    def get_many(self, model: str, task_type: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Looks up the vectors for a list of texts.
+        Returns a list aligned with `texts`, holding None for every text that is not cached.
+        """
+        keys = [self.make_key(model, task_type, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            # Stay below SQLite's limit on host parameters per statement
+            for i in range(0, len(unique_keys), 500):
+                part = unique_keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            vectors = [found.get(key) for key in keys]
+            hits = sum(vector is not None for vector in vectors)
+            self.hits += hits
+            self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, model: str, task_type: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """
+        Stores vectors for a list of texts and evicts the least recently used entries over the limit.
+        """
+        now = time.time()
+        blobs = {
+            self.make_key(model, task_type, text): array("f", vector).tobytes()
+            for text, vector in zip(texts, vectors)
+        }
+        rows = [(key, blob, now) for key, blob in blobs.items()]
+        with self._lock:
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            ).rowcount
+            if inserted < len(rows):
+                # Some keys were already cached, refresh them in place
+                self._conn.executemany(
+                    "UPDATE embeddings SET vector = ?, last_access = ? WHERE key = ?",
+                    [(blob, now, key) for key, blob in blobs.items()]
+                )
+            self._rows += inserted
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """
+        Deletes the least recently used entries until the cache fits in `max_entries`.
+        Must be called with self._lock held.
+        """
+        overflow = self._rows - self.params.max_entries
+        if overflow > 0:
+            evicted = self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            ).rowcount
+            self._rows -= evicted
+            logger.info(f"Embedding cache evicted {evicted} entries")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the hit/miss counters and the current number of cached vectors.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": self._rows,
+                "max_entries": self.params.max_entries,
+            }
+
+    def split_cached(self, model: str, task_type: str, texts: List[str]) -> Tuple[List[Optional[List[float]]], List[int]]:
+        """
+        Looks up a list of texts and also returns the indices of the ones that still need embedding.
+        """
+        vectors = self.get_many(model, task_type, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        return vectors, missing
@@ -0,0 +1,160 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from src.config.app_settings import SemanticCacheParams
+
+import itertools
+import re
+import time
+
+import numpy as np
+
+from src.config.logging import logger
+
+# Words that never tell two questions apart, left out of `entity_key`
+_FILLER_WORDS = frozenset("""
+a an the this that these those is are was were be will would should could can do does did
+what what's whats how how's hows which who when where why
+i me my we our you your it its there here
+in at on of for to from about with and or
+please tell give show get let know like right now current currently latest
+""".split())
+
+
+def entity_key(query: str) -> str:
+    """
+    Returns the words of a query that may name a place, a company, a ticker or a day, sorted.
+    Two queries with a different key are never answered from each other's cache entries,
+    however close their embeddings are: "weather in Pune" and "weather in Mumbai" differ in
+    a single token and embed almost identically.
+    """
+    words = re.findall(r"[\w&'.-]+", query.lower())
+    return " ".join(sorted({word.strip(".'") for word in words} - _FILLER_WORDS - {""}))
+
+
+class _Entry:
+    """
+    A cached answer together with the normalized embedding of the query that produced it.
+    """
+    __slots__ = ("entry_id", "scope", "query", "vector", "payload", "created_at")
+
+    def __init__(self, entry_id: int, scope: str, query: str, vector: np.ndarray, payload: Any):
+        self.entry_id = entry_id
+        self.scope = scope
+        self.query = query
+        self.vector = vector
+        self.payload = payload
+        self.created_at = time.time()
+
+
+class SemanticCache:
+    """
+    An in-memory semantic response cache.
+    A query is answered from the cache when a previous query of the same route and scope
+    (e.g. the same `document_id`) has a cosine similarity above the threshold and its answer
+    is younger than the route's TTL.
+    """
+
+    def __init__(self, params: Optional[SemanticCacheParams] = None):
+        """
+        Initializes the SemanticCache.
+
+        Args:
+            params: Similarity threshold, per-route TTLs and size limit.
+        """
+        self.params = params or SemanticCacheParams()
+        self._ids = itertools.count()
+        # route -> entries in insertion order, used for eviction
+        self._by_route: Dict[str, "OrderedDict[int, _Entry]"] = defaultdict(OrderedDict)
+        # (route, scope) -> entries, used for lookups
+        self._buckets: Dict[Tuple[str, str], Dict[int, _Entry]] = defaultdict(dict)
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "bypassed": 0})
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _ttl(self, route: str) -> float:
+        return self.params.ttl_seconds.get(route, min(self.params.ttl_seconds.values()))
+
+    def lookup(self, route: str, scope: str, vector: List[float]) -> Optional[Any]:
+        """
+        Returns the cached payload of the most similar fresh query, or None on a miss.
+
+        :param route: The endpoint the answer belongs to, selects the TTL.
+        :param scope: Partition inside the route, e.g. the document_id. Answers never cross scopes.
+        :param vector: Embedding of the incoming query.
+        """
+        bucket = self._buckets.get((route, scope))
+        deadline = time.time() - self._ttl(route)
+        if bucket:
+            for entry_id in [entry_id for entry_id, entry in bucket.items() if entry.created_at < deadline]:
+                self._remove(route, bucket[entry_id])
+
+        if bucket:
+            entries = list(bucket.values())
+            scores = np.stack([entry.vector for entry in entries]) @ self._normalize(vector)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.params.similarity_threshold:
+                self._counters[route]["hits"] += 1
+                logger.info(f"Semantic cache hit on {route} (similarity {scores[best]:.3f}) for '{entries[best].query}'")
+                return entries[best].payload
+
+        self._counters[route]["misses"] += 1
+        return None
+
+    def store(self, route: str, scope: str, query: str, vector: List[float], payload: Any) -> None:
+        """
+        Caches the answer of a query and evicts the oldest answers of the route beyond `max_entries`.
+        """
+        entry = _Entry(next(self._ids), scope, query, self._normalize(vector), payload)
+        self._by_route[route][entry.entry_id] = entry
+        self._buckets[(route, scope)][entry.entry_id] = entry
+        while len(self._by_route[route]) > self.params.max_entries:
+            _, oldest = next(iter(self._by_route[route].items()))
+            self._remove(route, oldest)
+
+    def record_bypass(self, route: str) -> None:
+        """
+        Counts a request that skipped the cache (bypass header or non-cacheable request).
+        """
+        self._counters[route]["bypassed"] += 1
+
+    def invalidate(self, route: str, scope: str) -> None:
+        """
+        Drops every cached answer of a scope, e.g. when a document is deleted or re-ingested.
+        """
+        bucket = self._buckets.get((route, scope), {})
+        for entry in list(bucket.values()):
+            self._remove(route, entry)
+
+    def clear(self) -> None:
+        """
+        Drops every cached answer, e.g. when the vector store is wiped. Counters are kept.
+        """
+        self._by_route.clear()
+        self._buckets.clear()
+
+    def _remove(self, route: str, entry: _Entry) -> None:
+        self._by_route[route].pop(entry.entry_id, None)
+        bucket = self._buckets.get((route, entry.scope))
+        if bucket is not None:
+            bucket.pop(entry.entry_id, None)
+            if not bucket:
+                del self._buckets[(route, entry.scope)]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss/bypass counters, hit rate and size per route.
+        """
+        routes = {}
+        for route, counters in self._counters.items():
+            lookups = counters["hits"] + counters["misses"]
+            routes[route] = {
+                **counters,
+                "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._by_route.get(route, {})),
+                "ttl_seconds": self._ttl(route),
+            }
+        return {"similarity_threshold": self.params.similarity_threshold, "routes": routes}
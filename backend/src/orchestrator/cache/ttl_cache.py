@@ -0,0 +1,223 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from collections import OrderedDict
+
+import threading
+import time
+
+from src.config.logging import logger
+
+# A loader returns the value together with the number of seconds it stays fresh
+Loader = Callable[[], Tuple[Any, float]]
+# A batch loader gets the missing keys and returns the values it found together with their freshness
+BatchLoader = Callable[[List[Hashable]], Tuple[Dict[Hashable, Any], float]]
+
+class _Flight:
+    """
+    An upstream call in progress, shared by every caller that missed on the same key.
+    """
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """
+    A thread-safe TTL cache with request coalescing (single-flight) and stale-on-error.
+    Concurrent misses on the same key share one loader call. When the loader fails, an expired
+    value younger than `stale_ttl` is served instead of the error.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, stale_ttl: float = 3600):
+        """
+        Initializes the TTLCache.
+
+        Args:
+            name: Used in log messages and stats.
+            max_entries: Maximum number of keys kept, least recently used ones are evicted first.
+            stale_ttl: How long after expiry a value may still be served when the upstream fails.
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        # key -> (value, expires_at)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the fresh value of a key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                return entry[0]
+        return None
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """
+        Stores a value for `ttl` seconds.
+        """
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def get_or_load(self, key: Hashable, loader: Loader) -> Any:
+        """
+        Returns the cached value of a key, calling `loader` at most once for concurrent misses.
+
+        :param key: The cache key.
+        :param loader: Called on a miss, returns (value, ttl_seconds). It may raise.
+        :return: The fresh value, or a stale one if the loader failed.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value, ttl = loader()
+            flight.value = value
+            with self._lock:
+                self._store(key, value, ttl)
+            return value
+        except Exception as e:
+            stale = self._stale(key)
+            if stale is not None:
+                logger.info(f"{self.name}: upstream failed for {key!r} ({e}), serving stale value")
+                flight.value = stale
+                return stale
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def get_many_or_load(self, keys: List[Hashable], loader: BatchLoader) -> Dict[Hashable, Any]:
+        """
+        Batch variant of `get_or_load`: the keys that miss are loaded with a single loader call.
+        Keys another caller is already loading are waited for instead of loaded again. A key the
+        loader failed on, or left out of its result, is served stale when it has a stale value.
+
+        :param keys: The cache keys.
+        :param loader: Called with the missing keys, returns ({key: value}, ttl_seconds). It may raise.
+        :return: key -> value for every key with a fresh, loaded or stale value.
+        :raises Exception: The loader's error when none of the keys could be served.
+        """
+        values: Dict[Hashable, Any] = {}
+        owned: Dict[Hashable, _Flight] = {}
+        waiting: Dict[Hashable, _Flight] = {}
+        with self._lock:
+            now = time.time()
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    values[key] = entry[0]
+                    continue
+                self.misses += 1
+                flight = self._flights.get(key)
+                if flight is None:
+                    owned[key] = self._flights[key] = _Flight()
+                else:
+                    self.coalesced += 1
+                    waiting[key] = flight
+
+        error: Optional[Exception] = None
+        if owned:
+            try:
+                loaded, ttl = loader(list(owned))
+            except Exception as e:
+                loaded, ttl, error = {}, 0.0, e
+            try:
+                with self._lock:
+                    for key in owned:
+                        if key in loaded:
+                            self._store(key, loaded[key], ttl)
+                for key, flight in owned.items():
+                    value = loaded[key] if key in loaded else self._stale(key)
+                    if value is not None:
+                        flight.value = values[key] = value
+                    elif error is not None:
+                        flight.error = error
+                if error is not None:
+                    logger.info(f"{self.name}: upstream failed for {len(owned)} keys ({error}), serving stale values")
+            finally:
+                with self._lock:
+                    for key in owned:
+                        self._flights.pop(key, None)
+                for flight in owned.values():
+                    flight.done.set()
+
+        for key, flight in waiting.items():
+            flight.done.wait()
+            if flight.value is not None:
+                values[key] = flight.value
+            elif flight.error is not None:
+                error = error or flight.error
+
+        if error is not None and not values:
+            raise error
+        return values
+
+    def _stale(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns an expired value that is still within the stale window.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] + self.stale_ttl > time.time():
+                self.stale_served += 1
+                return entry[0]
+        return None
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        """
+        Stores a value and evicts the least recently used keys beyond `max_entries`.
+        Must be called with self._lock held.
+        """
+        self._entries[key] = (value, time.time() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the hit, miss, coalesced and stale counters of the cache.
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "stale_served": self.stale_served,
+            }
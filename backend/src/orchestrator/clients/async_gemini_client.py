@@ -0,0 +1,234 @@
+from typing import List, Dict, Any, Optional
+from src.validation.output_schema import ChatResponse
+from src.config.app_settings import AskParams, EmbeddingParams
+from src.orchestrator.cache.embedding_cache import EmbeddingCache
+from src.orchestrator.metrics.prometheus import gemini_request_duration, embedding_batch_size
+from src.orchestrator.usage.accounting import usage_ledger
+from src.orchestrator.clients.gemini_client import GeminiClient, GEMINI_BASE_URL, RETRYABLE_STATUS_CODES, chat_model_params
+
+from openai import AsyncOpenAI, OpenAIError
+import asyncio
+import httpx
+import time
+import json
+
+from src.config.logging import logger
+
+class AsyncGeminiClient:
+    """
+    An asyncio client for interacting with the Gemini model.
+    It mirrors the `GeminiClient` surface (`ask`, `ask_with_history`, `embed_content`)
+    but never blocks the event loop, so it is the one to use from FastAPI request handlers.
+    """
+
+    def __init__(self, gemini_api_key, model_name="gemini-1.5-flash", embedding_model_name="gemini-embedding-001",
+                 embedding_params: Optional[EmbeddingParams] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None):
+        """
+        Initializes the AsyncGeminiClient.
+
+        Args:
+            api_key: Your Gemini API key. If None, it attempts to get it from the environment.
+            embedding_params: Batch size, concurrency and retry settings for `embed_content`.
+            embedding_cache: Optional persistent cache consulted before calling the embedding API.
+        """
+        self.client_gemini = AsyncOpenAI(
+            api_key=gemini_api_key,  # Google Gemini API key
+            base_url=GEMINI_BASE_URL  # Gemini base URL
+        )
+        self.model = model_name
+        self.embedding_model = embedding_model_name
+        self.embedding_params = embedding_params or EmbeddingParams()
+        self.embedding_cache = embedding_cache
+
+        # Pooled connections for the embedding batches, sized for the concurrency limit
+        self._http = httpx.AsyncClient(
+            base_url=GEMINI_BASE_URL,
+            timeout=self.embedding_params.timeout,
+            limits=httpx.Limits(max_connections=self.embedding_params.max_concurrency),
+        )
+
+    async def aclose(self) -> None:
+        """
+        Closes the underlying HTTP connections.
+        """
+        await self._http.aclose()
+        await self.client_gemini.close()
+
+    async def embed_content(self, text_chunks: List[str], task_type: str = "RETRIEVAL_DOCUMENT",
+                            output_dimensionality: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Generates embeddings for a list of text chunks.
+        With `output_dimensionality` (e.g. 768 or 1536) the API returns shorter vectors, which are not normalized.
+        Vectors already in `embedding_cache` are served from it; only the remaining unique
+        texts are sent to the API and their vectors are written back to the cache.
+        The returned embeddings are in the same order as `text_chunks`.
+        """
+        if self.embedding_cache is None or not text_chunks:
+            return await self._embed_uncached(text_chunks, task_type, output_dimensionality)
+
+        # Vectors of another length are cached under their own key
+        cache_model = f"{self.embedding_model}@{output_dimensionality}" if output_dimensionality else self.embedding_model
+        # The cache is SQLite (a hit is an UPDATE and a commit), it is read and written off the event loop
+        vectors, missing = await asyncio.to_thread(self.embedding_cache.split_cached, cache_model, task_type, text_chunks)
+        if missing:
+            # Identical chunks (e.g. repeated boilerplate) are embedded once
+            pending = list(dict.fromkeys(text_chunks[i] for i in missing))
+            fresh = (await self._embed_uncached(pending, task_type, output_dimensionality))['embedding']
+            await asyncio.to_thread(self.embedding_cache.put_many, cache_model, task_type, pending, fresh)
+            by_text = dict(zip(pending, fresh))
+            for i in missing:
+                vectors[i] = by_text[text_chunks[i]]
+        return {'embedding': vectors}
+
+    async def _embed_uncached(self, text_chunks: List[str], task_type: str,
+                              output_dimensionality: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Calls the embedding API for a list of text chunks, bypassing the cache.
+        Works like `GeminiClient.embed_content`: chunks are grouped into `batchEmbedContents`
+        requests and at most `embedding_params.max_concurrency` of them run at once.
+        The returned embeddings are in the same order as `text_chunks`.
+        """
+        if not text_chunks:
+            return {'embedding': []}
+
+        batch_size = self.embedding_params.batch_size
+        batches = [text_chunks[i:i + batch_size] for i in range(0, len(text_chunks), batch_size)]
+        semaphore = asyncio.Semaphore(self.embedding_params.max_concurrency)
+
+        async def run(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self._embed_batch(batch, task_type, output_dimensionality)
+
+        try:
+            # gather keeps the input order of the batches
+            results = await asyncio.gather(*(run(batch) for batch in batches))
+            embeddings = [vector for batch_result in results for vector in batch_result]
+            # Only texts actually sent to the API are charged, cache hits are free
+            usage_ledger.record_embedding(self.embedding_model, text_chunks)
+            return {'embedding': embeddings}
+        except Exception as e:
+            logger.info(f"Error creating embeddings with async client: {e}")
+            raise OpenAIError(f"Failed to create embeddings: {e}")
+
+    async def _embed_batch(self, batch: List[str], task_type: str, output_dimensionality: Optional[int] = None) -> List[List[float]]:
+        """
+        Sends one `batchEmbedContents` request and retries it on its own with exponential backoff.
+        Client errors other than rate limiting are not retried.
+        """
+        url = f"models/{self.embedding_model}:batchEmbedContents"
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{self.embedding_model}",
+                    "content": {"parts": [{"text": chunk}]},
+                    "taskType": task_type,
+                    **({"outputDimensionality": output_dimensionality} if output_dimensionality else {})
+                } for chunk in batch
+            ]
+        }
+        headers = {"x-goog-api-key": self.client_gemini.api_key}
+
+        params = self.embedding_params
+        embedding_batch_size.observe(len(batch), model=self.embedding_model)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            for attempt in range(params.max_retries + 1):
+                try:
+                    response = await self._http.post(url, json=payload, headers=headers)
+                    response.raise_for_status()
+                    vectors = [item['values'] for item in response.json()['embeddings']]
+                    outcome = "success"
+                    return vectors
+                except httpx.HTTPError as e:
+                    status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                    retryable = status is None or status in RETRYABLE_STATUS_CODES
+                    if not retryable or attempt == params.max_retries:
+                        raise
+                    delay = params.backoff_seconds * (2 ** attempt)
+                    logger.info(f"Embedding batch of {len(batch)} failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+        finally:
+            # One observation per batch, retries and backoff included
+            gemini_request_duration.observe(time.perf_counter() - started, model=self.embedding_model, operation="embed", outcome=outcome)
+
+    # Cost calculation does not depend on the transport, share it with the sync client
+    _calc_cost = GeminiClient._calc_cost
+
+    async def _create_chat_completion(
+            self,
+            messages: List[Dict[str, str]],
+            other_params: Optional[AskParams] = None
+            ) -> ChatResponse:
+
+        start_time = time.time()
+
+        try:
+            response = await self.client_gemini.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                **vars(other_params),
+            )
+            data = json.loads(response.content)
+            answer = data['choices'][0]['message']['content'].strip()
+            cost = self._calc_cost(data)
+            response_time = time.time() - start_time
+            gemini_request_duration.observe(response_time, model=self.model, operation="chat", outcome="success")
+            usage = data.get('usage') or {}
+            return ChatResponse(
+                answer=answer,
+                cost=cost,
+                time_taken=response_time,
+                model=self.model,
+                prompt_tokens=usage.get('prompt_tokens') or 0,
+                completion_tokens=usage.get('completion_tokens') or 0,
+                total_tokens=usage.get('total_tokens') or 0,
+            )
+
+        except Exception as e:
+            gemini_request_duration.observe(time.time() - start_time, model=self.model, operation="chat", outcome="error")
+            logger.info(f"Error with Gemini request: {e}")
+            raise OpenAIError
+
+    async def ask(
+            self,
+            prompt: str = "What can you help me with?",
+            system_message: str = "You are a helpful assistant.",
+            custom_params: Optional[AskParams] = None
+            ) -> ChatResponse:
+        """
+        Asks the Gemini model a question without blocking the event loop.
+        Args:
+            prompt: The question to ask.
+            system_message: The system message to set the context.
+            custom_params: Additional parameters for the chat completion.
+            Returns:
+            The model's response as a ChatResponse object."""
+        messages = [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt},
+        ]
+        return await self._create_chat_completion(
+            messages=messages,
+            other_params=custom_params if custom_params else chat_model_params
+        )
+
+    async def ask_with_history(
+            self,
+            messages: List[Dict[str, Any]],
+            prompt: str = "What can you help me with?",
+            system_message: str = "You are a helpful assistant.",
+            custom_params: Optional[AskParams] = None
+            ) -> ChatResponse:
+
+        prompt = prompt.strip() or "Ask me to ask anything."
+        # Copy so the caller's chat history is not mutated
+        messages = list(messages) + [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}
+        ]
+        return await self._create_chat_completion(
+            messages=messages,
+            other_params=custom_params if custom_params else chat_model_params
+        )
@@ -1,143 +1,244 @@
-from typing import List, Dict, Any, Optional
-from src.validation.output_schema import ChatResponse
-from src.config.app_settings import AskParams
-
-from openai import OpenAI, OpenAIError
-import time
-import json
-
-from src.config.logging import logger
-
-chat_model_params = AskParams()  
-
-class GeminiClient:
-    """
-    A client for interacting with the Gemini model.
-    """
-
-    def __init__(self, gemini_api_key, model_name="gemini-1.5-flash", embedding_model_name="gemini-embedding-001"):
-        """
-        Initializes the GeminiClient.
-
-        Args:
-            api_key: Your Gemini API key. If None, it attempts to get it from the environment.
-        """
-
-        self.client_gemini = OpenAI(
-            api_key=gemini_api_key,  # Google Gemini API key
-            base_url="https://generativelanguage.googleapis.com/v1beta/"  # Gemini base URL
-        )
-        self.model = model_name
-        self.embedding_model = embedding_model_name
-
-    def embed_content(self, text_chunks: List[str], task_type: str = "RETRIEVAL_DOCUMENT") -> Dict[str, Any]:
-        """
-        Generates embeddings for a list of text chunks.
-        Note: The OpenAI Python client's standard `embeddings.create` does not directly support
-        the `task_type` parameter in its signature. This is a feature of the native Google GenAI SDK.
-        We will call the API in a loop for simplicity here.
-        A more advanced implementation might use batching if the custom endpoint supports it.
-        """
-        try:
-            # The 'openai' library's standard `create` method doesn't support lists of content for this endpoint structure.
-            # We must loop through the chunks.
-            embeddings = []
-            import requests
-
-            for chunk in text_chunks:
-                url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.embedding_model}:embedContent?key={self.client_gemini.api_key}"
-                payload = {
-                    "content": {"parts": [{"text": chunk}]},
-                    "task_type": task_type
-                }
-                response = requests.post(url, json=payload)
-                response.raise_for_status()
-                embeddings.append(response.json()['embedding']['values'])
-            return {'embedding': embeddings}
-        except Exception as e:
-            logger.info(f"Error creating embeddings with custom client: {e}")
-            raise OpenAIError(f"Failed to create embeddings: {e}")
-
-    def _calc_cost(self,data: Any) -> float:
-        """
-        Calculates the cost of the request.
-        This is a placeholder function and should be implemented based on the actual cost calculation logic.
-        """
-        prompt_tokens= data['usage']['prompt_tokens']
-        completion_tokens= data['usage']['completion_tokens']
-        total_tokens= data['usage']['total_tokens']
-        cost = 0.0
-        # Example cost calculation logic (this is just a placeholder)
-
-        return cost
-
-    def _create_chat_completion(
-            self,
-            messages: List[Dict[str, str]],
-            other_params: Optional[AskParams] = None
-            ) -> ChatResponse:
-        
-        start_time = time.time()
-
-        try:
-            response = self.client_gemini.chat.completions.with_raw_response.create(
-                model=self.model,
-                messages=messages,
-                **vars(other_params),
-            )
-            data = json.loads(response.content)
-            answer = data['choices'][0]['message']['content'].strip()
-            cost = self._calc_cost(data)
-            response_time = time.time() - start_time
-            return ChatResponse(answer=answer, cost=cost, time_taken=response_time)
-        
-        except Exception as e:
-            logger.info(f"Error with Gemini request: {e}")
-            raise OpenAIError
-
-
-    def ask(
-            self, 
-            prompt: str = "What can you help me with?",
-            system_message: str = "You are a helpful assistant.",
-            # assistant_message: str = "Sure, I can help with that.",
-            custom_params: Optional[AskParams] = None
-            ) -> ChatResponse:
-        """ 
-        Asks the Gemini model a question.
-        Args:
-            prompt: The question to ask.
-            system_message: The system message to set the context.
-            assistant_message: The initial message from the assistant.
-            custom_params: Additional parameters for the chat completion.
-            Returns:
-            The model's response as a ChatResponse object."""
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": prompt},
-            # {"role": "assistant", "content": assistant_message}
-        ]
-        return self._create_chat_completion(
-            messages=messages,
-            other_params=custom_params if custom_params else chat_model_params
-        )
-
-
-    def ask_with_history(
-            self, 
-            messages: List[Dict[str, Any]],
-            prompt: str = "What can you help me with?",
-            system_message: str = "You are a helpful assistant.",
-            custom_params: Optional[AskParams] = None
-            ) -> ChatResponse:
-        
-        prompt = prompt.strip() or "Ask me to ask anything."
-        content = [{"type": "text", "text": prompt}]
-        messages += [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": prompt}
-        ]
-        return self._create_chat_completion(
-            messages=messages,
-            other_params=custom_params if custom_params else chat_model_params
-        )
+from typing import List, Dict, Any, Optional
+from src.validation.output_schema import ChatResponse
+from src.config.app_settings import AskParams, EmbeddingParams
+from src.orchestrator.cache.embedding_cache import EmbeddingCache
+from src.orchestrator.metrics.prometheus import gemini_request_duration, embedding_batch_size
+from src.orchestrator.usage.accounting import usage_ledger
+
+from openai import OpenAI, OpenAIError
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+import requests
+import time
+import json
+
+from src.config.logging import logger
+
+chat_model_params = AskParams()  
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/"
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class GeminiClient:
+    """
+    A client for interacting with the Gemini model.
+    """
+
+    def __init__(self, gemini_api_key, model_name="gemini-1.5-flash", embedding_model_name="gemini-embedding-001",
+                 embedding_params: Optional[EmbeddingParams] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None):
+        """
+        Initializes the GeminiClient.
+
+        Args:
+            api_key: Your Gemini API key. If None, it attempts to get it from the environment.
+            embedding_params: Batch size, concurrency and retry settings for `embed_content`.
+            embedding_cache: Optional persistent cache consulted before calling the embedding API.
+        """
+
+        self.client_gemini = OpenAI(
+            api_key=gemini_api_key,  # Google Gemini API key
+            base_url=GEMINI_BASE_URL  # Gemini base URL
+        )
+        self.model = model_name
+        self.embedding_model = embedding_model_name
+        self.embedding_params = embedding_params or EmbeddingParams()
+        self.embedding_cache = embedding_cache
+
+        # One pooled HTTP session shared by all embedding batches, sized for the concurrency limit
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.embedding_params.max_concurrency)
+        self._http.mount("https://", adapter)
+
+    def embed_content(self, text_chunks: List[str], task_type: str = "RETRIEVAL_DOCUMENT",
+                      output_dimensionality: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Generates embeddings for a list of text chunks.
+        With `output_dimensionality` (e.g. 768 or 1536) the API returns shorter vectors, which are not normalized.
+        Vectors already in `embedding_cache` are served from it; only the remaining unique
+        texts are sent to the API and their vectors are written back to the cache.
+        The returned embeddings are in the same order as `text_chunks`.
+        """
+        if self.embedding_cache is None or not text_chunks:
+            return self._embed_uncached(text_chunks, task_type, output_dimensionality)
+
+        # Vectors of another length are cached under their own key
+        cache_model = f"{self.embedding_model}@{output_dimensionality}" if output_dimensionality else self.embedding_model
+        vectors, missing = self.embedding_cache.split_cached(cache_model, task_type, text_chunks)
+        if missing:
+            # Identical chunks (e.g. repeated boilerplate) are embedded once
+            pending = list(dict.fromkeys(text_chunks[i] for i in missing))
+            fresh = (self._embed_uncached(pending, task_type, output_dimensionality))['embedding']
+            self.embedding_cache.put_many(cache_model, task_type, pending, fresh)
+            by_text = dict(zip(pending, fresh))
+            for i in missing:
+                vectors[i] = by_text[text_chunks[i]]
+        return {'embedding': vectors}
+
+    def _embed_uncached(self, text_chunks: List[str], task_type: str,
+                        output_dimensionality: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Calls the embedding API for a list of text chunks, bypassing the cache.
+        Note: The OpenAI Python client's standard `embeddings.create` does not directly support
+        the `task_type` parameter in its signature. This is a feature of the native Google GenAI SDK,
+        so we call the REST `batchEmbedContents` endpoint directly.
+        Chunks are grouped into batches of `embedding_params.batch_size` and up to
+        `embedding_params.max_concurrency` batches are sent at once over a pooled session.
+        The returned embeddings are in the same order as `text_chunks`.
+        """
+        if not text_chunks:
+            return {'embedding': []}
+
+        batch_size = self.embedding_params.batch_size
+        batches = [text_chunks[i:i + batch_size] for i in range(0, len(text_chunks), batch_size)]
+
+        try:
+            if len(batches) == 1:
+                results = [self._embed_batch(batches[0], task_type, output_dimensionality)]
+            else:
+                workers = min(self.embedding_params.max_concurrency, len(batches))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # executor.map keeps the input order of the batches
+                    results = list(executor.map(lambda batch: self._embed_batch(batch, task_type, output_dimensionality), batches))
+
+            embeddings = [vector for batch_result in results for vector in batch_result]
+            # Only texts actually sent to the API are charged, cache hits are free
+            usage_ledger.record_embedding(self.embedding_model, text_chunks)
+            return {'embedding': embeddings}
+        except Exception as e:
+            logger.info(f"Error creating embeddings with custom client: {e}")
+            raise OpenAIError(f"Failed to create embeddings: {e}")
+
+    def _embed_batch(self, batch: List[str], task_type: str, output_dimensionality: Optional[int] = None) -> List[List[float]]:
+        """
+        Sends one `batchEmbedContents` request and retries it on its own with exponential backoff.
+        Client errors other than rate limiting are not retried.
+        """
+        url = f"{GEMINI_BASE_URL}models/{self.embedding_model}:batchEmbedContents"
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{self.embedding_model}",
+                    "content": {"parts": [{"text": chunk}]},
+                    "taskType": task_type,
+                    **({"outputDimensionality": output_dimensionality} if output_dimensionality else {})
+                } for chunk in batch
+            ]
+        }
+        headers = {"x-goog-api-key": self.client_gemini.api_key}
+
+        params = self.embedding_params
+        embedding_batch_size.observe(len(batch), model=self.embedding_model)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            for attempt in range(params.max_retries + 1):
+                try:
+                    response = self._http.post(url, json=payload, headers=headers, timeout=params.timeout)
+                    response.raise_for_status()
+                    vectors = [item['values'] for item in response.json()['embeddings']]
+                    outcome = "success"
+                    return vectors
+                except requests.RequestException as e:
+                    status = e.response.status_code if e.response is not None else None
+                    retryable = status is None or status in RETRYABLE_STATUS_CODES
+                    if not retryable or attempt == params.max_retries:
+                        raise
+                    delay = params.backoff_seconds * (2 ** attempt)
+                    logger.info(f"Embedding batch of {len(batch)} failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+                    time.sleep(delay)
+        finally:
+            # One observation per batch, retries and backoff included
+            gemini_request_duration.observe(time.perf_counter() - started, model=self.embedding_model, operation="embed", outcome=outcome)
+
+    def _calc_cost(self, data: Any) -> float:
+        """
+        Calculates the cost of the request from the `usage` block of the completion and the
+        per-model price table, and charges it to the current usage scope.
+        """
+        usage = data.get('usage') or {}
+        prompt_tokens = usage.get('prompt_tokens') or 0
+        completion_tokens = usage.get('completion_tokens') or 0
+        return usage_ledger.record(self.model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def _create_chat_completion(
+            self,
+            messages: List[Dict[str, str]],
+            other_params: Optional[AskParams] = None
+            ) -> ChatResponse:
+        
+        start_time = time.time()
+
+        try:
+            response = self.client_gemini.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                **vars(other_params),
+            )
+            data = json.loads(response.content)
+            answer = data['choices'][0]['message']['content'].strip()
+            cost = self._calc_cost(data)
+            response_time = time.time() - start_time
+            gemini_request_duration.observe(response_time, model=self.model, operation="chat", outcome="success")
+            usage = data.get('usage') or {}
+            return ChatResponse(
+                answer=answer,
+                cost=cost,
+                time_taken=response_time,
+                model=self.model,
+                prompt_tokens=usage.get('prompt_tokens') or 0,
+                completion_tokens=usage.get('completion_tokens') or 0,
+                total_tokens=usage.get('total_tokens') or 0,
+            )
+        
+        except Exception as e:
+            gemini_request_duration.observe(time.time() - start_time, model=self.model, operation="chat", outcome="error")
+            logger.info(f"Error with Gemini request: {e}")
+            raise OpenAIError
+
+
+    def ask(
+            self, 
+            prompt: str = "What can you help me with?",
+            system_message: str = "You are a helpful assistant.",
+            # assistant_message: str = "Sure, I can help with that.",
+            custom_params: Optional[AskParams] = None
+            ) -> ChatResponse:
+        """ 
+        Asks the Gemini model a question.
+        Args:
+            prompt: The question to ask.
+            system_message: The system message to set the context.
+            assistant_message: The initial message from the assistant.
+            custom_params: Additional parameters for the chat completion.
+            Returns:
+            The model's response as a ChatResponse object."""
+        messages = [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt},
+            # {"role": "assistant", "content": assistant_message}
+        ]
+        return self._create_chat_completion(
+            messages=messages,
+            other_params=custom_params if custom_params else chat_model_params
+        )
+
+
+    def ask_with_history(
+            self, 
+            messages: List[Dict[str, Any]],
+            prompt: str = "What can you help me with?",
+            system_message: str = "You are a helpful assistant.",
+            custom_params: Optional[AskParams] = None
+            ) -> ChatResponse:
+        
+        prompt = prompt.strip() or "Ask me to ask anything."
+        content = [{"type": "text", "text": prompt}]
+        messages += [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}
+        ]
+        return self._create_chat_completion(
+            messages=messages,
+            other_params=custom_params if custom_params else chat_model_params
+        )
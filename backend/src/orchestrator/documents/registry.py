@@ -0,0 +1,156 @@
+from typing import Any, Dict, List, Optional, Tuple
+from src.config.app_settings import DocumentRegistryParams
+from src.validation.output_schema import DocumentRecord
+
+import json
+import sqlite3
+import threading
+import os
+
+from src.config.logging import logger
+
+FIELDS = ("document_id", "filename", "content_hash", "text_hash", "chunk_count", "embedding_model", "partition", "ingested_at",
+          "user_id", "chunk_stats", "embedding_dimensions")
+HASH_FIELDS = ("content_hash", "text_hash")
+# Stored as JSON text
+JSON_FIELDS = ("chunk_stats",)
+# Columns added after the first release, added to older registries on startup
+ADDED_COLUMNS = {
+    "user_id": "TEXT NOT NULL DEFAULT 'anonymous'",
+    "chunk_stats": "TEXT",
+    "embedding_dimensions": "INTEGER",
+}
+
+
+class DocumentRegistry:
+    """
+    A persistent registry of the ingested documents.
+    Rows live in SQLite and are mirrored in memory, so existence checks and hash lookups
+    are dictionary lookups instead of metadata scans over the vector store.
+    """
+
+    def __init__(self, params: Optional[DocumentRegistryParams] = None):
+        """
+        Initializes the DocumentRegistry, creates the SQLite table if needed and loads every row.
+
+        Args:
+            params: Location of the registry file.
+        """
+        self.params = params or DocumentRegistryParams()
+        self._lock = threading.Lock()
+        self._documents: Dict[str, DocumentRecord] = {}
+        # (hash field, hash) -> document_id
+        self._by_hash: Dict[Tuple[str, str], str] = {}
+
+        directory = os.path.dirname(os.path.abspath(self.params.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.params.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " document_id TEXT PRIMARY KEY,"
+            " filename TEXT,"
+            " content_hash TEXT,"
+            " text_hash TEXT,"
+            " chunk_count INTEGER NOT NULL,"
+            " embedding_model TEXT NOT NULL,"
+            " partition TEXT NOT NULL,"
+            " ingested_at REAL NOT NULL,"
+            " user_id TEXT NOT NULL DEFAULT 'anonymous',"
+            " chunk_stats TEXT,"
+            " embedding_dimensions INTEGER)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+        for column, definition in ADDED_COLUMNS.items():
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE documents ADD COLUMN {column} {definition}")
+        self._conn.commit()
+
+        rows = self._conn.execute(f"SELECT {', '.join(FIELDS)} FROM documents").fetchall()
+        for row in rows:
+            values = dict(zip(FIELDS, row))
+            for field in JSON_FIELDS:
+                if values[field] is not None:
+                    values[field] = json.loads(values[field])
+            self._index(DocumentRecord(**values))
+        logger.info(f"Document registry loaded {len(self._documents)} documents")
+
+    def _index(self, record: DocumentRecord) -> None:
+        """
+        Adds a record to the in-memory maps. Must be called with self._lock held (or during init).
+        """
+        self._documents[record.document_id] = record
+        for field in HASH_FIELDS:
+            value = getattr(record, field)
+            if value:
+                self._by_hash[(field, value)] = record.document_id
+
+    @staticmethod
+    def _column(record: DocumentRecord, field: str) -> Any:
+        value = getattr(record, field)
+        return json.dumps(value) if field in JSON_FIELDS and value is not None else value
+
+    def add(self, record: DocumentRecord) -> None:
+        """
+        Stores or replaces the row of a document.
+        """
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO documents ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                tuple(self._column(record, field) for field in FIELDS)
+            )
+            self._conn.commit()
+            self._index(record)
+
+    def remove(self, document_id: str) -> Optional[DocumentRecord]:
+        """
+        Deletes the row of a document and returns it, or None if it is not registered.
+        """
+        with self._lock:
+            record = self._documents.pop(document_id, None)
+            if record is None:
+                return None
+            for field in HASH_FIELDS:
+                value = getattr(record, field)
+                if value and self._by_hash.get((field, value)) == document_id:
+                    del self._by_hash[(field, value)]
+            self._conn.execute("DELETE FROM documents WHERE document_id = ?", (document_id,))
+            self._conn.commit()
+            return record
+
+    def clear(self) -> None:
+        """
+        Deletes every row, used when the vector store is wiped.
+        """
+        with self._lock:
+            self._documents.clear()
+            self._by_hash.clear()
+            self._conn.execute("DELETE FROM documents")
+            self._conn.commit()
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._documents
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def get(self, document_id: str) -> Optional[DocumentRecord]:
+        """
+        Returns the record of a document, or None.
+        """
+        return self._documents.get(document_id)
+
+    def find(self, field: str, value: str) -> Optional[str]:
+        """
+        Returns the ID of the document with `field == value`, `field` being `content_hash` or `text_hash`.
+        """
+        return self._by_hash.get((field, value))
+
+    def list(self, offset: int = 0, limit: int = 100, user_id: Optional[str] = None) -> List[DocumentRecord]:
+        """
+        Returns documents, most recently ingested first, optionally only those of one user.
+        """
+        with self._lock:
+            records = [record for record in self._documents.values() if user_id is None or record.user_id == user_id]
+        records.sort(key=lambda record: record.ingested_at, reverse=True)
+        return records[offset:offset + limit]
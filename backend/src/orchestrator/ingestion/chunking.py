@@ -0,0 +1,411 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.config.app_settings import IngestionParams
+
+import io
+import math
+import re
+
+MARKDOWN = "markdown"
+RECURSIVE = "recursive"
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_SENTENCE_END = re.compile(r"(?<=[.!?:;])\s+(?=\S)")
+
+# (kind, text, heading level) with kind one of heading, table, list, code, paragraph
+Block = Tuple[str, str, int]
+
+
+def count_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """
+    Estimates the number of tokens of a text without calling the API.
+    Every word or punctuation mark is at least one token, long words count one token per
+    `chars_per_token` characters, which tracks SentencePiece tokenizers closely on prose.
+    """
+    return sum(max(1, math.ceil(len(match.group()) / chars_per_token)) for match in _TOKEN_PATTERN.finditer(text))
+
+
+class ChunkStats:
+    """
+    Per-document chunking statistics, collected while the chunks are produced.
+    """
+
+    def __init__(self, strategy: str, chunk_tokens: int):
+        """
+        Initializes the ChunkStats.
+
+        Args:
+            strategy: Name of the chunker that produced the chunks.
+            chunk_tokens: The token budget of one chunk.
+        """
+        self.strategy = strategy
+        self.chunk_tokens = chunk_tokens
+        self.chunks = 0
+        self.tokens = 0
+        self.min_tokens = 0
+        self.max_tokens = 0
+        self.source_tokens = 0
+        self.overlap_tokens = 0
+        self.context_tokens = 0
+        self.split_blocks = 0
+        self.blocks: Dict[str, int] = {}
+
+    def add_chunk(self, tokens: int) -> None:
+        self.min_tokens = tokens if self.chunks == 0 else min(self.min_tokens, tokens)
+        self.max_tokens = max(self.max_tokens, tokens)
+        self.chunks += 1
+        self.tokens += tokens
+
+    def as_dict(self) -> Dict[str, Any]:
+        mean = self.tokens / self.chunks if self.chunks else 0.0
+        return {
+            "strategy": self.strategy,
+            "chunks": self.chunks,
+            "chunk_tokens": self.chunk_tokens,
+            "tokens": self.tokens,
+            "source_tokens": self.source_tokens,
+            "mean_tokens": round(mean, 1),
+            "min_tokens": self.min_tokens,
+            "max_tokens": self.max_tokens,
+            # How full the average chunk is relative to the budget
+            "fill_ratio": round(mean / self.chunk_tokens, 3) if self.chunk_tokens else 0.0,
+            # Share of the embedded tokens that repeat text already embedded in another chunk
+            "duplicated_ratio": round(max(0, self.tokens - self.source_tokens) / self.tokens, 3) if self.tokens else 0.0,
+            "overlap_tokens": self.overlap_tokens,
+            "context_tokens": self.context_tokens,
+            "split_blocks": self.split_blocks,
+            "blocks": dict(self.blocks),
+        }
+
+
+def iter_blocks(text: str) -> Iterator[Block]:
+    """
+    Yields the structural blocks of a markdown text (as produced by MarkItDown) in order:
+    headings, tables, list blocks, fenced code and paragraphs.
+    Lines are read lazily, page breaks (form feeds) are treated as blank lines.
+    """
+    kind: Optional[str] = None
+    lines: List[str] = []
+    fence: Optional[str] = None
+
+    def block() -> Block:
+        return kind, "\n".join(lines).strip("\n"), 0
+
+    for line in io.StringIO(text):
+        line = line.rstrip("\r\n").replace("\x0c", "")
+
+        if fence is not None:
+            lines.append(line)
+            if line.strip().startswith(fence):
+                yield block()
+                kind, lines, fence = None, [], None
+            continue
+
+        fence_match = _FENCE.match(line)
+        heading = _HEADING.match(line)
+        if not line.strip():
+            line_kind = None
+        elif fence_match:
+            line_kind = "code"
+        elif heading:
+            line_kind = "heading"
+        elif line.lstrip().startswith("|"):
+            line_kind = "table"
+        elif _LIST_ITEM.match(line) or (kind == "list" and line[:1].isspace()):
+            line_kind = "list"
+        else:
+            line_kind = "paragraph"
+
+        if kind is not None and (line_kind != kind or line_kind in ("heading", "code")):
+            yield block()
+            kind, lines = None, []
+
+        if line_kind == "heading":
+            yield "heading", line.strip(), len(heading.group(1))
+        elif line_kind == "code":
+            kind, lines, fence = "code", [line], fence_match.group(1)
+        elif line_kind is not None:
+            kind = line_kind
+            lines.append(line)
+
+    if kind is not None and lines:
+        yield block()
+
+
+class MarkdownChunker:
+    """
+    Splits markdown into chunks of at most `chunk_tokens` estimated tokens along its structure.
+
+    - Blocks (paragraphs, tables, list blocks, code) are packed whole into a chunk while they fit.
+    - A heading closes the current chunk once it holds `min_chunk_tokens`, so sections start
+      their own chunk without leaving a trail of tiny ones.
+    - A block larger than the budget is split on its own units: table rows (the header row is
+      repeated), list items, code lines, or sentences.
+    - Overlap is adaptive: none across sections, tables, lists and code, the last sentence
+      between two paragraphs, and up to `max_overlap_tokens` when a paragraph is cut in the middle.
+    - With `heading_context`, a chunk that does not start at its heading is prefixed with the
+      heading path, so it still says which section it belongs to.
+    """
+
+    name = MARKDOWN
+
+    def __init__(self, params: Optional[IngestionParams] = None):
+        """
+        Initializes the MarkdownChunker.
+
+        Args:
+            params: The chunk budget, overlap and heading context settings.
+        """
+        self.params = params or IngestionParams()
+
+    def tokens(self, text: str) -> int:
+        return count_tokens(text, self.params.chars_per_token)
+
+    def new_stats(self) -> ChunkStats:
+        return ChunkStats(self.name, self.params.chunk_tokens)
+
+    def _pieces(self, kind: str, text: str, budget: int) -> Iterator[Tuple[str, int, bool]]:
+        """
+        Yields (text, tokens, continues) pieces of a block that each fit in `budget` tokens,
+        `continues` being True when the piece carries on a block cut in the middle.
+        """
+        tokens = self.tokens(text)
+        if tokens <= budget:
+            yield text, tokens, False
+            return
+
+        header: List[str] = []
+        if kind == "table":
+            rows = text.split("\n")
+            # The header and its |---| separator row go with every part of the table
+            if len(rows) > 2 and set(rows[1].replace("|", "").strip()) <= set("-: "):
+                header, rows = rows[:2], rows[2:]
+            units, joiner = rows, "\n"
+        elif kind == "list":
+            units = re.split(r"\n(?=(?:[-*+]|\d+[.)])\s)", text)
+            joiner = "\n"
+        elif kind == "code":
+            units, joiner = text.split("\n"), "\n"
+        else:
+            units = _SENTENCE_END.split(text)
+            joiner = " "
+
+        header_tokens = self.tokens("\n".join(header)) if header else 0
+        part: List[str] = list(header)
+        part_tokens = header_tokens
+        first = True
+        for unit in self._fit_units(units, budget - header_tokens, keep_lines=kind in ("table", "list", "code")):
+            unit_tokens = self.tokens(unit)
+            if part_tokens + unit_tokens > budget and len(part) > len(header):
+                yield joiner.join(part), part_tokens, not first
+                first = False
+                part, part_tokens = list(header), header_tokens
+            part.append(unit)
+            part_tokens += unit_tokens
+        if len(part) > len(header):
+            yield joiner.join(part), part_tokens, not first
+
+    def _fit_units(self, units: List[str], budget: int, keep_lines: bool = False) -> Iterator[str]:
+        """
+        Cuts the rare unit that is larger than the budget on its own (e.g. a run-on sentence) on words.
+        With `keep_lines` (code, tables, lists) a unit is cut on lines first and its whitespace is kept.
+        A single word still over the budget (a URL, a data URI, minified JSON) is cut by characters.
+        """
+        budget = max(budget, 1)
+        for unit in units:
+            if self.tokens(unit) <= budget:
+                yield unit
+            elif keep_lines and "\n" in unit:
+                yield from self._pack(self._fit_units(unit.split("\n"), budget, keep_lines), budget, "\n")
+            else:
+                words = re.findall(r"\s*\S+", unit) if keep_lines else unit.split()
+                pieces = (piece for word in words for piece in self._cut_word(word, budget))
+                yield from self._pack(pieces, budget, "" if keep_lines else " ")
+
+    def _cut_word(self, word: str, budget: int) -> Iterator[str]:
+        """
+        Cuts a word into pieces of at most `budget` tokens, `budget * chars_per_token` characters
+        at a time, fewer where punctuation counts one token per character.
+        """
+        start = 0
+        while start < len(word):
+            piece = word[start:start + max(1, int(budget * self.params.chars_per_token))]
+            piece_tokens = self.tokens(piece)
+            while len(piece) > 1 and piece_tokens > budget:
+                piece = piece[:max(1, len(piece) * budget // piece_tokens)]
+                piece_tokens = self.tokens(piece)
+            yield piece
+            start += len(piece)
+
+    def _pack(self, pieces: Iterator[str], budget: int, joiner: str) -> Iterator[str]:
+        """
+        Joins consecutive pieces into parts of at most `budget` tokens.
+        """
+        part: List[str] = []
+        part_tokens = 0
+        for piece in pieces:
+            piece_tokens = self.tokens(piece)
+            if part and part_tokens + piece_tokens > budget:
+                yield joiner.join(part)
+                part, part_tokens = [], 0
+            part.append(piece)
+            part_tokens += piece_tokens
+        if part:
+            yield joiner.join(part)
+
+    def _overlap(self, text: str, limit: int) -> Tuple[str, int]:
+        """
+        Returns the trailing sentences of a paragraph that fit in `limit` tokens.
+        """
+        sentences = _SENTENCE_END.split(text)
+        tail: List[str] = []
+        tokens = 0
+        for sentence in reversed(sentences[1:]):
+            sentence_tokens = self.tokens(sentence)
+            if tokens + sentence_tokens > limit:
+                break
+            tail.insert(0, sentence)
+            tokens += sentence_tokens
+        return " ".join(tail), tokens
+
+    def split(self, text: str, stats: Optional[ChunkStats] = None) -> Iterator[str]:
+        """
+        Yields the chunks of a markdown text lazily.
+
+        :param text: The markdown text of a document.
+        :param stats: Collects the per-document statistics when given.
+        :return: An iterator over the chunks.
+        """
+        params = self.params
+        stats = stats or self.new_stats()
+        headings: Dict[int, str] = {}
+        parts: List[str] = []
+        tokens = 0
+        has_body = False
+        # The last piece added, used for the overlap of the next chunk
+        last: Optional[Tuple[str, str, int]] = None
+
+        def context() -> Tuple[str, int]:
+            if not params.heading_context or not headings:
+                return "", 0
+            path = " > ".join(re.sub(r"^#+\s*", "", headings[level]) for level in sorted(headings))
+            return path, self.tokens(path)
+
+        for kind, block, level in iter_blocks(text):
+            block_tokens = self.tokens(block)
+            stats.source_tokens += block_tokens
+            stats.blocks[kind] = stats.blocks.get(kind, 0) + 1
+
+            if kind == "heading":
+                # A new section starts a new chunk once the current one is worth embedding on its own
+                if has_body and tokens >= params.min_chunk_tokens:
+                    stats.add_chunk(tokens)
+                    yield "\n\n".join(parts)
+                    parts, tokens, has_body, last = [], 0, False, None
+                headings = {key: value for key, value in headings.items() if key < level}
+                headings[level] = block
+                parts.append(block)
+                tokens += block_tokens
+                continue
+
+            prefix, prefix_tokens = context()
+            budget = params.chunk_tokens - prefix_tokens - params.max_overlap_tokens
+            pieces = list(self._pieces(kind, block, max(budget, params.chunk_tokens // 2)))
+            if len(pieces) > 1:
+                stats.split_blocks += 1
+
+            for piece, piece_tokens, continues in pieces:
+                if has_body and tokens + piece_tokens > params.chunk_tokens:
+                    stats.add_chunk(tokens)
+                    yield "\n\n".join(parts)
+                    parts, tokens = [], 0
+                    if prefix:
+                        parts.append(prefix)
+                        tokens += prefix_tokens
+                        stats.context_tokens += prefix_tokens
+                    if last is not None and last[0] == "paragraph" and kind == "paragraph":
+                        # Mid-paragraph cuts keep more context than cuts between paragraphs
+                        limit = params.max_overlap_tokens if continues else params.max_overlap_tokens // 2
+                        overlap, overlap_tokens = self._overlap(last[1], limit)
+                        if overlap:
+                            parts.append(overlap)
+                            tokens += overlap_tokens
+                            stats.overlap_tokens += overlap_tokens
+                parts.append(piece)
+                tokens += piece_tokens
+                has_body = True
+                last = (kind, piece, piece_tokens)
+
+        if parts:
+            stats.add_chunk(tokens)
+            yield "\n\n".join(parts)
+
+
+class RecursiveChunker:
+    """
+    The character based splitter used before token-aware chunking: `RecursiveCharacterTextSplitter`
+    with `chunk_size` / `chunk_overlap` characters, fed one `split_window` of the text at a time.
+    """
+
+    name = RECURSIVE
+
+    def __init__(self, params: Optional[IngestionParams] = None):
+        """
+        Initializes the RecursiveChunker.
+
+        Args:
+            params: The character chunk size, overlap and split window.
+        """
+        # Only needed by this legacy strategy, langchain is slow to import
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+        self.params = params or IngestionParams()
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.params.chunk_size,
+            chunk_overlap=self.params.chunk_overlap,
+            length_function=len
+        )
+
+    def tokens(self, text: str) -> int:
+        return count_tokens(text, self.params.chars_per_token)
+
+    def new_stats(self) -> ChunkStats:
+        return ChunkStats(self.name, math.ceil(self.params.chunk_size / self.params.chars_per_token))
+
+    def split(self, text: str, stats: Optional[ChunkStats] = None) -> Iterator[str]:
+        """
+        Yields the chunks of a text lazily.
+        The text is handed to the splitter one window at a time, cut on a paragraph or line
+        boundary, so the full list of chunks never exists in memory.
+        """
+        stats = stats or self.new_stats()
+        window = self.params.split_window
+        start = 0
+        while start < len(text):
+            end = min(start + window, len(text))
+            if end < len(text):
+                cut = text.rfind("\n\n", start, end)
+                if cut <= start:
+                    cut = text.rfind("\n", start, end)
+                if cut > start:
+                    end = cut
+            stats.source_tokens += self.tokens(text[start:end])
+            for chunk in self.text_splitter.split_text(text[start:end]):
+                stats.add_chunk(self.tokens(chunk))
+                yield chunk
+            start = end
+
+
+def build_chunker(params: Optional[IngestionParams] = None, strategy: Optional[str] = None):
+    """
+    Returns the chunker selected by `strategy`, or by `params.chunk_strategy` if not given.
+    """
+    params = params or IngestionParams()
+    strategy = strategy or params.chunk_strategy
+    if strategy == MARKDOWN:
+        return MarkdownChunker(params)
+    if strategy == RECURSIVE:
+        return RecursiveChunker(params)
+    raise ValueError(f"Unknown chunk strategy '{strategy}', expected '{MARKDOWN}' or '{RECURSIVE}'.")
@@ -0,0 +1,234 @@
+from typing import Any, Callable, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src.config.app_settings import ConversionParams
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+from fastapi import HTTPException
+
+from src.config.logging import logger
+
+# The MarkItDown instance of the current process, built once by `_init_worker` and reused for every document
+_markitdown = None
+
+
+def _init_worker(pids: Optional[Any] = None) -> None:
+    """
+    Runs once in every worker process: reports the process ID on `pids`, then imports markitdown
+    with its converters and builds the MarkItDown instance, so the first document a worker gets
+    does not pay for them.
+    """
+    global _markitdown
+    if pids is not None:
+        pids.put(os.getpid())
+    # The root logger is at DEBUG, pdfminer logs every token it parses at that level
+    for name in ("pdfminer", "pdfplumber", "PIL"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    from markitdown import MarkItDown
+    import pdfminer.high_level  # noqa: F401 - used by `convert_pdf_pages`
+
+    _markitdown = MarkItDown()
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def convert_file(path: str) -> str:
+    """
+    Extracts the text of a document with MarkItDown, headed by its title when it has one.
+    """
+    if _markitdown is None:
+        _init_worker()
+    result = _markitdown.convert(path)
+    text = ""
+    if result.title:
+        text += f"# {result.title}\n\n"
+    if result.text_content:
+        text += result.text_content
+    return text
+
+
+def pdf_page_count(path: str) -> int:
+    """
+    Counts the pages of a PDF. Only the page tree is read, not the page content.
+    """
+    from pdfminer.pdfpage import PDFPage
+
+    with open(path, "rb") as handle:
+        return sum(1 for _ in PDFPage.get_pages(handle))
+
+
+def convert_pdf_pages(path: str, first: int, last: int) -> str:
+    """
+    Extracts the text of the pages `first` to `last` (exclusive, 0-based) of a PDF with pdfminer,
+    as MarkItDown does for PDFs without form-style pages. Every page ends with a form feed, so
+    the ranges of a document concatenate to the text of the whole document.
+    """
+    from pdfminer.high_level import extract_text
+
+    return extract_text(path, page_numbers=range(first, last))
+
+
+def page_ranges(pages: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """
+    Splits `pages` pages into consecutive (first, last) ranges of at most `pages_per_task` pages.
+    """
+    step = max(1, pages_per_task)
+    return [(first, min(first + step, pages)) for first in range(0, pages, step)]
+
+
+class DocumentConverter:
+    """
+    Converts documents to text in a pool of worker processes, off the event loop and outside the
+    server's GIL, so a large upload does not slow down the requests of other users.
+
+    The workers are started with `start()` and each keeps one MarkItDown instance. Large PDFs can
+    be split into page ranges converted in parallel (`pdf_split_min_pages`, off by default), the
+    text is then reassembled in page order.
+    A document that takes longer than `timeout_seconds` fails and the pool is restarted, since a
+    running conversion cannot be cancelled otherwise; conversions of other documents that were
+    running in the old pool are retried once on the new one.
+    """
+
+    def __init__(self, params: Optional[ConversionParams] = None):
+        """
+        Initializes the DocumentConverter.
+
+        Args:
+            params: Number of worker processes, timeout and PDF splitting settings.
+        """
+        self.params = params or ConversionParams()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Worker processes report their ID on `_started` when they start, collected into `_pids`
+        self._started: Optional[Any] = None
+        self._pids: Set[int] = set()
+        # Incremented on every restart, tells a conversion broken by another document's restart from a crash
+        self._generation = 0
+
+    def start(self) -> None:
+        """
+        Starts the worker processes and loads MarkItDown in each of them, in the background.
+        Without workers, documents are converted in a thread of the server process.
+        """
+        if self.params.workers <= 0 or self._executor is not None:
+            return
+        # spawn, not fork: the server process runs threads (ChromaDB, the asyncio executor) that a fork would copy mid-flight
+        context = multiprocessing.get_context("spawn")
+        self._started = context.SimpleQueue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.params.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._started,),
+        )
+        # A task submitted while no worker is idle starts a new process, up to max_workers
+        started = time.perf_counter()
+        warmups = [self._executor.submit(_worker_ready) for _ in range(self.params.workers)]
+        remaining = [len(warmups)]
+
+        def warmed(_) -> None:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                logger.info(f"{self.params.workers} conversion workers ready in {time.perf_counter() - started:.2f}s")
+
+        for future in warmups:
+            future.add_done_callback(warmed)
+
+    def stop(self) -> None:
+        """
+        Stops the worker processes. Conversions still running are abandoned.
+        """
+        if self._executor is not None:
+            self._terminate()
+            self._executor = None
+
+    def _terminate(self) -> None:
+        # ProcessPoolExecutor cannot cancel a running task, its processes are killed instead, by the
+        # IDs they reported. The futures of the work they held fail with BrokenProcessPool. A process
+        # still starting has not reported yet, but it holds no work and exits on shutdown.
+        while not self._started.empty():
+            self._pids.add(self._started.get())
+        for pid in self._pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                # Already exited
+                pass
+        self._pids.clear()
+        self._executor.shutdown(wait=False)
+        self._started.close()
+
+    def _restart(self, reason: str) -> None:
+        logger.info(f"Restarting the conversion workers: {reason}")
+        self.stop()
+        self._generation += 1
+        self.start()
+
+    async def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs a conversion function in the pool, or in a thread when there are no workers.
+        """
+        if self.params.workers <= 0:
+            return await asyncio.to_thread(function, *args)
+        retried = False
+        while True:
+            if self._executor is None:
+                self.start()
+            generation = self._generation
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+            except BrokenProcessPool:
+                if generation == self._generation:
+                    # A worker died on this document (crash, out of memory)
+                    self._restart("a worker process died")
+                    raise HTTPException(status_code=400, detail="The document converter crashed on this document.")
+                if retried:
+                    raise
+                # The pool was restarted because of another document, convert this one again
+                retried = True
+
+    async def _convert(self, path: str) -> str:
+        if self.params.workers > 0 and self.params.pdf_split_min_pages > 0 and path.lower().endswith(".pdf"):
+            try:
+                pages = await self._run(pdf_page_count, path)
+            except HTTPException:
+                raise
+            except Exception as e:
+                # Encrypted or damaged PDFs are left to MarkItDown
+                logger.info(f"Could not count the pages of {path}: {e}")
+                pages = 0
+            if pages >= self.params.pdf_split_min_pages:
+                ranges = page_ranges(pages, self.params.pdf_pages_per_task)
+                logger.info(f"Converting {pages} pages of {path} in {len(ranges)} parallel ranges")
+                parts = await asyncio.gather(*(self._run(convert_pdf_pages, path, first, last) for first, last in ranges))
+                return "".join(parts)
+        return await self._run(convert_file, path)
+
+    async def convert(self, path: str) -> str:
+        """
+        Extracts the text of a spooled document.
+
+        :param path: Path of the document, its extension selects the MarkItDown converter.
+        :return: The text of the document, headed by its title when it has one.
+        :raises HTTPException: 400 if the conversion timed out or crashed.
+        """
+        started = time.perf_counter()
+        try:
+            text = await asyncio.wait_for(self._convert(path), timeout=self.params.timeout_seconds)
+        except asyncio.TimeoutError:
+            if self.params.workers > 0:
+                self._restart(f"converting {path} took more than {self.params.timeout_seconds:g}s")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Converting the document took more than {self.params.timeout_seconds:g} seconds."
+            )
+        logger.info(f"Converted {path} in {time.perf_counter() - started:.2f}s")
+        return text
@@ -0,0 +1,244 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from src.config.app_settings import IngestionJobParams
+from src.validation.output_schema import IngestionJobStatus
+from src.orchestrator.ingestion.pipeline import IngestionPipeline
+from src.orchestrator.metrics.prometheus import ingestion_stage_duration
+from src.orchestrator.usage.accounting import UsageScope, usage_ledger
+
+import asyncio
+import os
+import time
+import uuid
+
+from fastapi import UploadFile, HTTPException
+
+from src.config.logging import logger
+
+class IngestionJobManager:
+    """
+    Runs document ingestion as background jobs on a bounded pool of asyncio workers.
+    The upload request only spools the file to disk and enqueues a job, so its latency
+    does not depend on the document size. Job progress is kept in memory for the status endpoint.
+    """
+
+    def __init__(self, pipeline: IngestionPipeline, params: Optional[IngestionJobParams] = None):
+        """
+        Initializes the IngestionJobManager.
+
+        Args:
+            pipeline: The pipeline that converts, splits, embeds and stores the documents.
+            params: Worker count, queue size and job retention settings.
+        """
+        self.pipeline = pipeline
+        self.params = params or IngestionJobParams()
+        self.jobs: "OrderedDict[str, IngestionJobStatus]" = OrderedDict()
+        # content_hash -> job_id of the queued or running job for those bytes
+        self._active_by_hash: Dict[str, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # Jobs being run and holders of `paused()`, a job only starts while nobody holds the workers
+        self._running = 0
+        self._pauses = 0
+        self._state = asyncio.Condition()
+
+    async def start(self) -> None:
+        """
+        Starts the worker tasks and the document conversion processes.
+        Must be called from the running event loop (FastAPI lifespan).
+        """
+        self.pipeline.converter.start()
+        self._queue = asyncio.Queue(maxsize=self.params.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.params.workers)
+        ]
+        logger.info(f"Started {self.params.workers} ingestion workers")
+
+    async def stop(self) -> None:
+        """
+        Cancels the worker tasks and stops the conversion processes. Jobs still in the queue are dropped.
+        """
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.pipeline.converter.stop()
+
+    @property
+    def active(self) -> int:
+        """
+        Number of jobs queued or running.
+        """
+        return len(self._active_by_hash)
+
+    @property
+    def running(self) -> int:
+        """
+        Number of jobs running, the others are queued.
+        """
+        return self._running
+
+    @asynccontextmanager
+    async def paused(self) -> AsyncIterator[None]:
+        """
+        Holds the workers for the duration of the `async with` block, once the running jobs finished.
+        Uploads are still accepted, their jobs start after the block.
+        """
+        async with self._state:
+            self._pauses += 1
+            try:
+                await self._state.wait_for(lambda: self._running == 0)
+            except BaseException:
+                self._pauses -= 1
+                self._state.notify_all()
+                raise
+        try:
+            yield
+        finally:
+            async with self._state:
+                self._pauses -= 1
+                self._state.notify_all()
+
+    async def submit(self, file: UploadFile, user_id: str = "anonymous") -> IngestionJobStatus:
+        """
+        Spools an upload to disk and queues it for ingestion.
+        Uploads whose bytes are already indexed are completed at once with the existing
+        document_id, and uploads of bytes that are already being ingested share that job.
+
+        :param file: The uploaded file.
+        :param user_id: The user uploading the document.
+        :return: The status of the job, holding its job_id and document_id.
+        """
+        if self._queue is None:
+            raise HTTPException(status_code=503, detail="Ingestion workers are not running.")
+        if self._queue.full():
+            raise HTTPException(status_code=503, detail="Ingestion queue is full, retry later.")
+
+        path, content_hash = await self.pipeline.spool(file)
+        now = time.time()
+
+        # Checked after the last await so two concurrent uploads of the same bytes cannot both get through,
+        # and before the registry, which holds the row of a document from the start of its indexing
+        active_job_id = self._active_by_hash.get(content_hash)
+        if active_job_id is not None:
+            os.remove(path)
+            logger.info(f"{file.filename} is already being ingested by job {active_job_id}")
+            return self.jobs[active_job_id]
+
+        existing_id = self.pipeline.find_document("content_hash", content_hash)
+        if existing_id is not None:
+            os.remove(path)
+            job = IngestionJobStatus(
+                job_id=str(uuid.uuid4()),
+                document_id=existing_id,
+                filename=file.filename,
+                user_id=user_id,
+                content_hash=content_hash,
+                duplicate=True,
+                status="completed",
+                stage="done",
+                created_at=now,
+                started_at=now,
+                finished_at=now,
+            )
+            self._remember(job)
+            logger.info(f"{file.filename} is already indexed as document {existing_id}")
+            return job
+
+        job = IngestionJobStatus(
+            job_id=str(uuid.uuid4()),
+            document_id=str(uuid.uuid4()),
+            filename=file.filename,
+            user_id=user_id,
+            content_hash=content_hash,
+            created_at=now,
+        )
+        try:
+            self._queue.put_nowait((job, path))
+        except asyncio.QueueFull:
+            os.remove(path)
+            raise HTTPException(status_code=503, detail="Ingestion queue is full, retry later.")
+        self._remember(job)
+        self._active_by_hash[content_hash] = job.job_id
+        logger.info(f"Queued ingestion job {job.job_id} for {job.filename}")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJobStatus]:
+        """
+        Returns the status of a job, or None if it is unknown or no longer retained.
+        """
+        return self.jobs.get(job_id)
+
+    def _remember(self, job: IngestionJobStatus) -> None:
+        """
+        Stores a job and forgets the oldest finished ones beyond `max_retained`.
+        """
+        self.jobs[job.job_id] = job
+        while len(self.jobs) > self.params.max_retained:
+            oldest_id = next(
+                (job_id for job_id, old in self.jobs.items() if old.status in ("completed", "failed")),
+                None
+            )
+            if oldest_id is None:
+                break
+            del self.jobs[oldest_id]
+
+    async def _worker(self, index: int) -> None:
+        """
+        Takes jobs off the queue and runs them through the pipeline, one at a time.
+        """
+        while True:
+            job, path = await self._queue.get()
+            try:
+                async with self._state:
+                    await self._state.wait_for(lambda: self._pauses == 0)
+                    self._running += 1
+                try:
+                    await self._run(job, path)
+                finally:
+                    async with self._state:
+                        self._running -= 1
+                        self._state.notify_all()
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: IngestionJobStatus, path: str) -> None:
+        """
+        Runs a single job and records its stage, counters and timings.
+        """
+        job.status = "running"
+        job.started_at = time.time()
+        stage_started = job.started_at
+
+        def on_progress(stage: str, **fields: Any) -> None:
+            nonlocal stage_started
+            now = time.time()
+            if stage != job.stage:
+                if job.stage != "queued":
+                    job.stage_timings[job.stage] = now - stage_started
+                    ingestion_stage_duration.observe(now - stage_started, stage=job.stage)
+                job.stage = stage
+                stage_started = now
+            for name, value in fields.items():
+                setattr(job, name, value)
+
+        # Embedding tokens and cost are charged to the document
+        scope = UsageScope("upload_doc", document_id=job.document_id)
+        try:
+            with scope:
+                await self.pipeline.process(path, job.filename, job.document_id, on_progress, job.content_hash, job.user_id)
+            on_progress("done")
+            job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.info(f"Ingestion job {job.job_id} failed: {job.error}")
+            if os.path.exists(path):
+                os.remove(path)
+        finally:
+            self._active_by_hash.pop(job.content_hash, None)
+            job.usage = usage_ledger.finish(scope)
+            job.finished_at = time.time()
+            logger.info(f"Ingestion job {job.job_id} {job.status} in {job.finished_at - job.started_at:.2f}s")
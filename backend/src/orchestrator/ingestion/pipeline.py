@@ -0,0 +1,268 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from src.config.app_settings import IngestionParams
+from src.orchestrator.vectorstore.partitioned_store import PartitionedVectorStore
+from src.orchestrator.documents.registry import DocumentRegistry
+from src.orchestrator.ingestion.chunking import ChunkStats, build_chunker
+from src.orchestrator.ingestion.conversion import DocumentConverter
+from src.validation.output_schema import DocumentRecord
+
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import time
+import uuid
+from itertools import islice
+
+from fastapi import UploadFile, HTTPException
+
+from src.config.logging import logger
+
+# Called as on_progress(stage, chunks_embedded=..., chunks_total=...) whenever the pipeline advances
+ProgressCallback = Callable[..., None]
+
+def _noop_progress(stage: str, **fields: Any) -> None:
+    pass
+
+class IngestionPipeline:
+    """
+    A streaming, bounded-memory document ingestion pipeline.
+    The upload is spooled to disk, converted to text, split lazily and then embedded and
+    upserted to ChromaDB one window of chunks at a time, so memory stays flat for large
+    documents and the first chunks are searchable before the last ones are embedded.
+    """
+
+    def __init__(self, store: PartitionedVectorStore, embedding_client, registry: DocumentRegistry,
+                 params: Optional[IngestionParams] = None, converter: Optional[DocumentConverter] = None):
+        """
+        Initializes the IngestionPipeline.
+
+        Args:
+            store: The partitioned vector store the chunks are written to.
+            embedding_client: Async Gemini client used to embed the chunks.
+            registry: The document registry every ingested document is recorded in.
+            params: Spooling, splitting and batching settings.
+            converter: Converts the spooled documents to text in worker processes.
+        """
+        self.store = store
+        self.embedding_client = embedding_client
+        self.registry = registry
+        self.params = params or IngestionParams()
+        self.converter = converter or DocumentConverter()
+        # text_hash -> set once the document being indexed with that text succeeded or failed
+        self._indexing: Dict[str, asyncio.Event] = {}
+        # Token-aware markdown chunking by default, see `IngestionParams.chunk_strategy`
+        self.chunker = build_chunker(self.params)
+        os.makedirs(self.params.spool_dir, exist_ok=True)
+
+    async def spool(self, file: UploadFile) -> Tuple[str, str]:
+        """
+        Copies the upload to a temporary file in `spool_dir` without holding it in memory,
+        hashing the raw bytes on the way.
+        The original file extension is kept so MarkItDown can pick the right converter.
+
+        :param file: The uploaded file.
+        :return: Path of the spooled file and the sha256 of its bytes. The caller is responsible for removing the file.
+        """
+        suffix = os.path.splitext(file.filename or "")[1]
+        handle, path = tempfile.mkstemp(suffix=suffix, dir=self.params.spool_dir)
+        digest = hashlib.sha256()
+        with os.fdopen(handle, "wb") as out:
+            while True:
+                block = await file.read(self.params.read_size)
+                if not block:
+                    break
+                digest.update(block)
+                out.write(block)
+        return path, digest.hexdigest()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """
+        Hashes the extracted text after collapsing whitespace and case, so the same content
+        saved as a different file (re-exported PDF, other format) is still recognised.
+        """
+        normalized = re.sub(r"\s+", " ", text).strip().lower()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def find_document(self, field: str, value: str) -> Optional[str]:
+        """
+        Returns the ID of an already ingested document with `field == value`.
+        This is an in-memory lookup in the document registry.
+
+        :param field: `content_hash` or `text_hash`.
+        :param value: The hash to look for.
+        :return: The existing document_id, or None.
+        """
+        return self.registry.find(field, value)
+
+    def iter_chunks(self, text: str, stats: Optional[ChunkStats] = None) -> Iterator[str]:
+        """
+        Yields the chunks of a text lazily, so the full list of chunks never exists in memory.
+
+        :param text: The extracted text of a document.
+        :param stats: Collects the chunk statistics of the document when given.
+        """
+        return self.chunker.split(text, stats)
+
+    async def index(self, document_id: str, filename: str, chunks: Iterable[str],
+                    on_progress: ProgressCallback = _noop_progress,
+                    extra_metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Embeds chunks in windows of `embed_window` and upserts them to the document's partition in
+        batches of `upsert_batch_size` as soon as each window is embedded.
+        Vectors are requested at the length of the partition's storage mode.
+
+        :param document_id: The ID of the document the chunks belong to.
+        :param filename: Original name of the uploaded file.
+        :param chunks: Iterable of text chunks, typically `iter_chunks(text)`.
+        :param on_progress: Callback receiving the number of chunks stored after each window.
+        :param extra_metadata: Fields added to every chunk's metadata (e.g. the content hashes).
+        :return: The number of chunks stored.
+        """
+        metadata = {"document_id": document_id, "filename": str(filename), **(extra_metadata or {})}
+        dimensions = self.store.mode_for(document_id).output_dimensionality
+        iterator = iter(chunks)
+        stored = 0
+        while True:
+            window = list(islice(iterator, self.params.embed_window))
+            if not window:
+                break
+
+            embeddings = (await self.embedding_client.embed_content(window, output_dimensionality=dimensions))["embedding"]
+
+            batch_size = self.params.upsert_batch_size
+            for i in range(0, len(window), batch_size):
+                batch = window[i:i + batch_size]
+                await self.store.upsert(
+                    document_id,
+                    embeddings=embeddings[i:i + batch_size],
+                    documents=batch,
+                    metadatas=[dict(metadata) for _ in batch],
+                    ids=[f"{document_id}_{stored + i + j}" for j in range(len(batch))]
+                )
+
+            stored += len(window)
+            on_progress("embedding", chunks_embedded=stored)
+            logger.info(f"Stored {stored} chunks of document {document_id}")
+        return stored
+
+    async def process(self, path: str, filename: str, document_id: str,
+                      on_progress: ProgressCallback = _noop_progress,
+                      content_hash: Optional[str] = None, user_id: str = "anonymous") -> str:
+        """
+        Converts, splits, embeds and stores a spooled document, then removes the spooled file.
+        If a document with the same normalized text is already indexed, nothing is embedded
+        and its existing document_id is returned. If one is being indexed, its outcome is awaited first.
+        A document that fails is removed again, its registry row and the chunks already stored.
+
+        :param path: Path returned by `spool`.
+        :param filename: Original name of the uploaded file.
+        :param document_id: The ID to store the chunks under.
+        :param on_progress: Callback receiving the stage and counters as the pipeline advances.
+        :param content_hash: sha256 of the raw bytes returned by `spool`, stored in the chunk metadata.
+        :param user_id: The user who uploaded the document, recorded in the registry.
+        :return: The document_id the content is stored under.
+        """
+        try:
+            on_progress("converting")
+            text = await self.converter.convert(path)
+            if not text:
+                raise HTTPException(status_code=400, detail=f"Could not extract text from {filename}.")
+
+            text_hash = self.text_hash(text)
+            # The registry row of a document is written before its chunks, it only counts as a
+            # duplicate once that document is indexed
+            while text_hash in self._indexing:
+                logger.info(f"{filename} has the same text as a document being indexed, waiting for it")
+                await self._indexing[text_hash].wait()
+            existing_id = self.find_document("text_hash", text_hash)
+            if existing_id is not None:
+                logger.info(f"{filename} has the same text as document {existing_id}, skipping ingestion")
+                on_progress("done", document_id=existing_id, duplicate=True)
+                return existing_id
+
+            indexed = self._indexing[text_hash] = asyncio.Event()
+            try:
+                return await self._index_document(text, text_hash, filename, document_id, on_progress, content_hash, user_id)
+            finally:
+                del self._indexing[text_hash]
+                indexed.set()
+        finally:
+            os.remove(path)
+
+    async def _index_document(self, text: str, text_hash: str, filename: str, document_id: str,
+                              on_progress: ProgressCallback, content_hash: Optional[str], user_id: str) -> str:
+        """
+        Splits, embeds and stores the text of a document that is not indexed yet.
+        """
+        # Splitting is cheap next to embedding, a counting pass gives an exact total for progress reports
+        # and the chunk statistics of the document
+        on_progress("chunking")
+        stats = self.chunker.new_stats()
+        total = await asyncio.to_thread(lambda: sum(1 for _ in self.iter_chunks(text, stats)))
+        logger.info(f"{filename} split into {total} chunks: {stats.as_dict()}")
+        on_progress("embedding", chunks_embedded=0, chunks_total=total)
+
+        hashes = {"text_hash": text_hash}
+        if content_hash:
+            hashes["content_hash"] = content_hash
+        try:
+            # Large documents get their own collection, small ones are searched exactly in memory
+            dedicated = self.store.is_large(total)
+            if dedicated:
+                await asyncio.to_thread(self.store.create_partition, document_id)
+
+            # Registered before indexing so the first chunks can be queried while the rest are embedded
+            record = DocumentRecord(
+                document_id=document_id,
+                filename=str(filename),
+                content_hash=content_hash,
+                text_hash=text_hash,
+                chunk_count=total,
+                embedding_model=self.embedding_client.embedding_model,
+                embedding_dimensions=self.store.mode_for(document_id).dimensions,
+                partition="dedicated" if dedicated else "shared",
+                ingested_at=time.time(),
+                user_id=user_id,
+                chunk_stats=stats.as_dict(),
+            )
+            await asyncio.to_thread(self.registry.add, record)
+            stored = await self.index(document_id, filename, self.iter_chunks(text), on_progress, hashes)
+        except Exception:
+            await self._discard(document_id)
+            raise
+        record.chunk_count = stored
+        record.ingested_at = time.time()
+        await asyncio.to_thread(self.registry.add, record)
+        logger.info(f"Document {document_id} ingested with {stored} chunks")
+        return document_id
+
+    async def _discard(self, document_id: str) -> None:
+        """
+        Removes what a failed ingestion left behind: the chunks already stored and the registry row.
+        """
+        try:
+            await asyncio.to_thread(self.store.delete_document, document_id)
+        except Exception as e:
+            logger.info(f"Could not delete the chunks of failed document {document_id}: {e}")
+        await asyncio.to_thread(self.registry.remove, document_id)
+
+    async def run(self, file: UploadFile) -> Dict[str, Any]:
+        """
+        Runs the full pipeline for one upload inside the current request.
+        An upload whose bytes are already indexed returns the existing document_id without any work.
+
+        :param file: The uploaded file.
+        :return: A dictionary containing the processed document's info.
+        """
+        path, content_hash = await self.spool(file)
+        existing_id = self.find_document("content_hash", content_hash)
+        if existing_id is not None:
+            os.remove(path)
+            return {"document_id": existing_id}
+
+        # Create a unique ID for the document
+        document_id = await self.process(path, file.filename, str(uuid.uuid4()), content_hash=content_hash)
+        return {"document_id": document_id}
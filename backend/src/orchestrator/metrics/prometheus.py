@@ -0,0 +1,271 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+
+import bisect
+import threading
+import time
+
+# Default latency buckets in seconds, from a cache hit to a long agent chain
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+# Buckets for batch sizes, up to the 100 texts a `batchEmbedContents` request accepts
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bound(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """
+    A thread-safe histogram with labels, exported in the Prometheus text format
+    (cumulative `_bucket` series plus `_sum` and `_count`).
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Initializes the Histogram.
+
+        Args:
+            name: The metric name, e.g. `http_request_duration_seconds`.
+            documentation: The `# HELP` text.
+            labelnames: Names of the labels every observation must provide.
+            buckets: Upper bounds of the buckets, `+Inf` is added automatically.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Records one observation for the given label values.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        """
+        Observes the duration of the `with` block, also when it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def expose(self) -> Iterable[str]:
+        """
+        Yields the lines of this metric in the Prometheus text format.
+        """
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in sorted(self._series.items())]
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_bound(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Counter:
+    """
+    A thread-safe monotonically increasing counter with labels.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initializes the Counter.
+
+        Args:
+            name: The metric name, conventionally ending in `_total`.
+            documentation: The `# HELP` text.
+            labelnames: Names of the labels every increment must provide.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Adds `amount` to the counter of the given label values.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def expose(self) -> Iterable[str]:
+        """
+        Yields the lines of this metric in the Prometheus text format.
+        """
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class MetricsRegistry:
+    """
+    Holds the process-wide metrics and renders them for the `/metrics` endpoint.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Adds a metric to the registry and returns it. Names must be unique.
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def expose(self) -> str:
+        """
+        Returns every registered metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.expose()]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests until the response starts, by route template.",
+    ("method", "path", "status"),
+))
+agent_duration = registry.register(Histogram(
+    "agent_duration_seconds",
+    "Wall-clock time an ADK agent was active within one run, derived from the runner events.",
+    ("agent", "route"),
+))
+tool_duration = registry.register(Histogram(
+    "tool_duration_seconds",
+    "Time between a tool call event and its result event, or of the tool call of a code-only workflow step.",
+    ("tool", "agent"),
+))
+agent_runs = registry.register(Counter(
+    "agent_runs_total",
+    "Agent runs by route and outcome.",
+    ("route", "outcome"),
+))
+gemini_request_duration = registry.register(Histogram(
+    "gemini_request_duration_seconds",
+    "Latency of Gemini API calls, including retries, by model and operation.",
+    ("model", "operation", "outcome"),
+))
+embedding_batch_size = registry.register(Histogram(
+    "embedding_batch_size",
+    "Number of texts sent in one batchEmbedContents request.",
+    ("model",),
+    buckets=SIZE_BUCKETS,
+))
+chroma_duration = registry.register(Histogram(
+    "chroma_operation_duration_seconds",
+    "Latency of ChromaDB calls by operation.",
+    ("operation",),
+))
+vector_search_duration = registry.register(Histogram(
+    "vector_search_duration_seconds",
+    "Latency of a document query by search path (bruteforce in memory, dedicated collection, or fanout over several documents).",
+    ("path",),
+))
+ingestion_stage_duration = registry.register(Histogram(
+    "ingestion_stage_duration_seconds",
+    "Time an ingestion job spent in each pipeline stage.",
+    ("stage",),
+    buckets=LATENCY_BUCKETS + (300.0, 600.0),
+))
+
+
+class AgentRunTracker:
+    """
+    Derives per-agent and per-tool durations from the events of one `runner.run_async` call.
+    An agent is active from the event before its first event (or the start of the run) until
+    its last event; a tool from its function call event until the matching function response.
+    """
+
+    def __init__(self, route: str):
+        """
+        Initializes the AgentRunTracker.
+
+        Args:
+            route: The route the run was dispatched to, used as a label.
+        """
+        self.route = route
+        self._last_event_at = time.perf_counter()
+        # agent -> [first active, last event]
+        self._agents: Dict[str, List[float]] = {}
+        # call id -> (tool name, agent, started)
+        self._calls: Dict[str, Tuple[str, str, float]] = {}
+
+    def observe(self, event) -> None:
+        """
+        Records the timing of one runner event.
+        """
+        now = time.perf_counter()
+        author = event.author or "unknown"
+        if author != "user":
+            span = self._agents.get(author)
+            if span is None:
+                self._agents[author] = [self._last_event_at, now]
+            else:
+                span[1] = now
+
+        for call in event.get_function_calls():
+            self._calls[call.id or call.name] = (call.name, author, now)
+        for result in event.get_function_responses():
+            started = self._calls.pop(result.id or result.name, None)
+            if started is not None:
+                tool_duration.observe(now - started[2], tool=started[0], agent=started[1])
+        self._last_event_at = now
+
+    def finish(self, outcome: str = "success") -> None:
+        """
+        Observes the duration of every agent seen in the run.
+        """
+        for agent, (first, last) in self._agents.items():
+            agent_duration.observe(last - first, agent=agent, route=self.route)
+        agent_runs.inc(route=self.route, outcome=outcome)
+        self._agents.clear()
+        self._calls.clear()
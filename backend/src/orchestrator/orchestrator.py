@@ -1,238 +1,778 @@
-from src.validation.input_schema import InputQuery
-from src.validation.output_schema import OutputQuery
-from src.orchestrator.clients.gemini_client import GeminiClient
-
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai.types import Content, Part
-import os
-
-import chromadb
-import uuid
-from io import BytesIO
-from google import genai
-
-from typing import List, Dict, Any, Optional
-from markitdown import MarkItDown
-from fastapi import FastAPI, Request, Depends, UploadFile, File, Form, HTTPException
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-
-from dotenv import load_dotenv
-load_dotenv()
-
-from src.config.logging import logger
-
-class BuddyOrchestrator:
-    """
-    The BuddyOrchestrator class is responsible for managing the orchestration of tasks.
-    It handles the initialization and execution of various components within the application.
-    """
-
-    def __init__(self, config: Optional[dict] = None):
-        """
-        Initializes the BuddyOrchestrator with the given configuration.
-
-        :param config: Configuration object containing necessary settings.
-        """
-        self.config = config
-        MODEL_LIST = ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-embedding-001"]
-        self.client = {
-            model: GeminiClient(
-                gemini_api_key=os.getenv("GEMINI_API_KEY"),
-                model_name=model
-            ) for model in MODEL_LIST
-        }
-        self.aclient = {}
-        self.genai_client = genai.Client()
-
-        try:
-            chroma_client = chromadb.PersistentClient(path="./chroma_db")
-            # Get or create a collection to store document vectors
-            self.collection = chroma_client.get_or_create_collection(name="documents_collection")
-        except Exception as e:
-            raise Exception(f"Failed to initialize ChromaDB: {e}. Make sure you have the required system dependencies for SQLite3.")
-    
-    async def document_ingestion(self, file: UploadFile) -> Dict[str, Any]:
-        """
-        Ingests a document, processes it, and stores it in the vector store.
-
-        :param file: The document file to be ingested.
-        :return: A dictionary containing the processed document's info.
-        """
-        if not file:
-            raise HTTPException(status_code=400, detail="No file was uploaded.")
-
-        content = await file.read()
-        filename = file.filename
-
-        # Extract text
-        md = MarkItDown()
-        result = md.convert(BytesIO(content))
-
-        logger.info("Markitdown conversion Done")
-        text = ""
-        if result.title:
-            text += f"# {result.title}\n\n"
-        if result.text_content:
-            text += result.text_content
-
-        if not text:
-            raise HTTPException(status_code=400, detail=f"Could not extract text from {filename}.")
-
-        # Create a unique ID for the document
-        document_id = str(uuid.uuid4())
-
-        # Split text into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len
-        )
-        text_chunks = text_splitter.split_text(text)
-
-        logger.info("Document split into chunks")
-
-        # Generate embeddings in one batch
-        result = self.client["gemini-embedding-001"].embed_content(text_chunks)
-        embeddings = result["embedding"]
-
-        logger.info("Embeddings generated")
-
-        # Unique IDs for chunks
-        chunk_ids = [f"{document_id}_{i}" for i in range(len(text_chunks))]
-
-        # Store in ChromaDB
-        self.collection.add(
-            embeddings=embeddings,
-            documents=text_chunks,
-            metadatas=[{"document_id": str(document_id), "filename": str(filename)} for _ in text_chunks],
-            ids=chunk_ids
-        )
-
-        logger.info("Chunks stored in ChromaDB")
-
-        return {"document_id": document_id}
-    
-    async def chat_with_document(self, query: str, document_id: str, top_k: int = 3) -> Dict[str, Any]:
-        """
-        Answers a query based on the ingested document using the stored embeddings.
-
-        :param query: The user's question.
-        :param document_id: The ID of the document to search within.
-        :param top_k: Number of relevant chunks to retrieve.
-        :return: A dictionary containing the answer and sources.
-        """
-        if not query.strip():
-            raise HTTPException(status_code=400, detail="Query cannot be empty.")
-
-        # Step 1: Embed the query
-        query_embedding = self.client["gemini-embedding-001"].embed_content(
-            text_chunks=[query],
-            task_type="RETRIEVAL_QUERY"
-        )["embedding"]
-
-        # Step 2: Search relevant chunks in ChromaDB
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            where={"document_id": document_id}
-        )
-
-        if not results.get("documents") or results["documents"] is None or not results["documents"] or results["documents"][0] is None:
-            raise HTTPException(status_code=404, detail="No relevant document chunks found for the given document_id.")
-
-        retrieved_docs = results["documents"][0]
-
-        if not results.get("metadatas") or results["metadatas"] is None or not results["metadatas"] or results["metadatas"][0] is None:
-            raise HTTPException(status_code=404, detail="No relevant metadata found for the given document_id.")
-        
-        retrieved_meta = results["metadatas"][0]
-
-        # Step 3: Build context
-        context_text = "\n\n".join(retrieved_docs)
-
-        # Step 4: Ask Gemini
-        prompt = (
-            f"You are a helpful assistant. Use the following document excerpts to answer the question.\n\n"
-            f"Document Context:\n{context_text}\n\n"
-            f"Question: {query}\n\n"
-            f"Answer:"
-        )
-
-        answer = self.client["gemini-1.5-flash"].ask(prompt).answer
-
-        return {
-            "query": query,
-            "answer": answer,
-            "sources": [
-                {"chunk": doc, "metadata": meta}
-                for doc, meta in zip(retrieved_docs, retrieved_meta)
-            ]
-        }
-
-    async def buddy_talk(self, query_data: InputQuery) -> OutputQuery:
-        """
-        Processes a query and returns an answer.
-
-        :param query: The query to be processed.
-        :return: The answer to the query.
-        """
-        # Dummy logic — replace with your orchestrator / LLM call
-        answer = f"You said: {query_data.query}"
-        answer = self.client["gemini-1.5-flash"].ask_with_history(
-            prompt=query_data.query,
-            messages=query_data.chat_history or []
-        )
-        return OutputQuery(query=query_data.query, answer=answer.answer)
-    
-    async def run_agent_interaction(self, query_data: InputQuery, runner: Runner, session_service: InMemorySessionService):
-        """
-        Runs the agent interaction based on the provided query data. 
-        Chat history is processed and the response is generated. 
-
-        :param query_data: InputQuery object containing the query and chat history.
-        :param runner: Runner instance to execute the agent.
-        :param session_service: InMemorySessionService instance to manage session state.
-        :return: OutputQuery object containing the query and the agent's response.
-        """
-        # Assuming runner and session_service are already initialized
-        APP_NAME="test_agent_app"
-        USER_ID="user1"
-        SESSION_ID="1234"
-
-        content = Content(role="user", parts=[Part(text=query_data.query)])
-        logger.info(f"History: {query_data.chat_history}")
-        logger.info(f"Running agent interaction with content: {content}")
-
-        events = runner.run_async(
-            user_id=USER_ID,
-            session_id=SESSION_ID,
-            new_message=content,
-        )
-
-        response = ""
-        async for event in events:
-            if event.is_final_response() and event.content and event.content.parts:
-                response = event.content.parts[0].text
-
-        # Testing session events and state
-        # Uncomment the following lines to explore session events
-        # logger.info("========== Session Event Exploration ==========")
-        # session = await session_service.get_session(
-        #     app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
-        # )
-        # logger.info(f"Type of session: {type(session)}")4
-        # if session is not None:
-        #     logger.info(f"Session State: {session.state}")
-        #     logger.info(f"Session Events: {len(session.events)}")
-        # else:
-        #     logger.info("Session is None. Cannot display state or events.")
-        # logger.info("===============================================")
-
-        return OutputQuery(query=query_data.query, answer=f"This is a response from the agent interaction.\n{response}")
-    
-        
-
-        
-
-        
\ No newline at end of file
+from src.validation.input_schema import InputQuery
+from src.validation.output_schema import OutputQuery, IngestionJobStatus
+from src.orchestrator.clients.gemini_client import GeminiClient
+from src.orchestrator.clients.async_gemini_client import AsyncGeminiClient
+from src.orchestrator.cache.embedding_cache import EmbeddingCache
+from src.orchestrator.cache.semantic_cache import SemanticCache, entity_key
+from src.orchestrator.ingestion.pipeline import IngestionPipeline
+from src.orchestrator.ingestion.jobs import IngestionJobManager
+from src.config.app_settings import EmbeddingCacheParams, SemanticCacheParams, VectorStoreParams, ChatBatchParams
+
+from src.orchestrator.sessions.session_store import TieredSessionService
+from src.orchestrator.router import IntentRouter, ROOT_ROUTE
+from src.orchestrator.metrics.prometheus import AgentRunTracker
+from src.orchestrator.vectorstore.partitioned_store import PartitionedVectorStore
+from src.orchestrator.vectorstore.snapshots import VectorStoreSnapshots
+from src.orchestrator.documents.registry import DocumentRegistry
+from src.orchestrator.usage.accounting import UsageScope, usage_ledger
+
+from google.adk.runners import Runner
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.genai.types import Content, Part
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+from functools import cached_property
+
+from google import genai
+
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Callable, Iterable
+from fastapi import FastAPI, Request, Depends, UploadFile, File, Form, HTTPException
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.config.logging import logger
+
+APP_NAME = "test_agent_app"
+
+class _LazyClients(dict):
+    """
+    Gemini clients keyed by model name, each one created on first use.
+    Only the clients created so far are visited when iterating, e.g. to close them.
+    """
+
+    def __init__(self, models: Iterable[str], factory: Callable[[str], Any]):
+        super().__init__()
+        self.models = tuple(models)
+        self.factory = factory
+
+    def __missing__(self, model: str) -> Any:
+        if model not in self.models:
+            raise KeyError(model)
+        client = self[model] = self.factory(model)
+        return client
+
+class BuddyOrchestrator:
+    """
+    The BuddyOrchestrator class is responsible for managing the orchestration of tasks.
+    It handles the initialization and execution of various components within the application.
+
+    Construction is cheap, so importing `src.main` stays fast: the Gemini clients, ChromaDB and the
+    ingestion pipeline are created the first time they are used, at the latest by `start()`.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        """
+        Initializes the BuddyOrchestrator with the given configuration.
+
+        :param config: Configuration object containing necessary settings.
+        """
+        self.config = config
+        MODEL_LIST = ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-embedding-001"]
+        # Cheaper model answering sessions that are over their token budget
+        self.downgrade_model = usage_ledger.params.downgrade_model
+        if self.downgrade_model not in MODEL_LIST:
+            MODEL_LIST.append(self.downgrade_model)
+
+        # Shared by ingestion and query embedding, so re-uploads and repeated questions cost no API calls
+        cache_params = EmbeddingCacheParams()
+        self.embedding_cache = EmbeddingCache(cache_params) if cache_params.enabled else None
+
+        self.client = _LazyClients(MODEL_LIST, lambda model: GeminiClient(
+            gemini_api_key=os.getenv("GEMINI_API_KEY"),
+            model_name=model,
+            embedding_cache=self.embedding_cache
+        ))
+        # Async clients for the FastAPI request path, they do not block the event loop
+        self.aclient = _LazyClients(MODEL_LIST, lambda model: AsyncGeminiClient(
+            gemini_api_key=os.getenv("GEMINI_API_KEY"),
+            model_name=model,
+            embedding_cache=self.embedding_cache
+        ))
+
+        # Answers to near-duplicate questions are served from memory instead of re-running the chains
+        semantic_params = SemanticCacheParams()
+        self.semantic_cache = SemanticCache(semantic_params) if semantic_params.enabled else None
+
+        self.vector_params = VectorStoreParams()
+        self.chat_batch_params = ChatBatchParams()
+
+        # One row per ingested document, answers existence checks and listings without touching ChromaDB
+        self.document_registry = DocumentRegistry()
+        self.snapshots = VectorStoreSnapshots(self.vector_params, self.document_registry.params)
+        self._warm_task: Optional[asyncio.Task] = None
+
+    @cached_property
+    def genai_client(self) -> genai.Client:
+        """
+        The google-genai client, created on first use.
+        """
+        return genai.Client()
+
+    @cached_property
+    def router(self) -> IntentRouter:
+        """
+        Sends clear weather/stock queries straight to their workflow, skipping the root agent's LLM hop.
+        Created on first use, together with the embedding client it classifies with.
+        """
+        return IntentRouter(self.aclient["gemini-embedding-001"])
+
+    @cached_property
+    def vector_store(self) -> PartitionedVectorStore:
+        """
+        The partitioned vector store, opened on first use. chromadb is imported here, it is the
+        slowest dependency to import and opening the persistent client reads its SQLite database.
+        """
+        try:
+            import chromadb
+
+            chroma_client = chromadb.PersistentClient(path=self.vector_params.path)
+            # Chunks are partitioned per document: small documents are searched exactly in memory,
+            # large ones get their own collection
+            return PartitionedVectorStore(chroma_client, self.vector_params)
+        except Exception as e:
+            raise Exception(f"Failed to initialize ChromaDB: {e}. Make sure you have the required system dependencies for SQLite3.")
+
+    @cached_property
+    def ingestion_pipeline(self) -> IngestionPipeline:
+        return IngestionPipeline(
+            store=self.vector_store,
+            embedding_client=self.aclient["gemini-embedding-001"],
+            registry=self.document_registry
+        )
+
+    @cached_property
+    def ingestion_jobs(self) -> IngestionJobManager:
+        return IngestionJobManager(self.ingestion_pipeline)
+
+    async def start(self) -> None:
+        """
+        Starts the background workers. Called from the FastAPI lifespan once the event loop runs.
+        ChromaDB is opened here, before the first request, so no upload or question pays for it.
+        The indexes of the hot documents are loaded in the background, requests are served meanwhile.
+        """
+        await self.ingestion_jobs.start()
+        self._warm_task = asyncio.create_task(self.warm_vector_store(), name="vector-store-warmup")
+
+    async def aclose(self) -> None:
+        """
+        Stops the background workers, remembers the hot documents for the next start and closes
+        the connections held by the async Gemini clients.
+        """
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+        # Components that were never used are not created just to be closed
+        if "ingestion_jobs" in self.__dict__:
+            await self.ingestion_jobs.stop()
+        if "vector_store" in self.__dict__:
+            try:
+                self.vector_store.save_hot_documents(self.vector_params.warm_documents)
+            except OSError as e:
+                logger.info(f"Could not save the hot documents: {e}")
+        for aclient in self.aclient.values():
+            await aclient.aclose()
+
+    async def warm_vector_store(self) -> int:
+        """
+        Loads the indexes of the documents that were queried most in the previous run, topped up
+        with the most recently ingested ones, so the first queries after a restart are not cold.
+
+        :return: The number of documents warmed.
+        """
+        limit = self.vector_params.warm_documents
+        if limit <= 0:
+            return 0
+        hot = [document_id for document_id in self.vector_store.load_hot_documents() if document_id in self.document_registry]
+        recent = [record.document_id for record in self.document_registry.list(limit=limit)]
+        document_ids = list(dict.fromkeys(hot + recent))[:limit]
+        started = time.perf_counter()
+        warmed = await self.vector_store.warm(document_ids)
+        logger.info(f"Warmed {warmed} of {len(document_ids)} documents in {time.perf_counter() - started:.2f}s")
+        return warmed
+
+    async def wipe_documents(self) -> Dict[str, Any]:
+        """
+        Deletes every ingested document: the collections, the document registry and the cached answers.
+        Refused while ingestion jobs are queued or running.
+
+        :return: The number of documents deleted.
+        """
+        if self.ingestion_jobs.active:
+            raise HTTPException(status_code=409, detail="Ingestion jobs are running, retry once they finished.")
+        documents = len(self.document_registry)
+        await asyncio.to_thread(self.vector_store.wipe)
+        await asyncio.to_thread(self.document_registry.clear)
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+        logger.info(f"Wiped {documents} documents")
+        return {"documents_deleted": documents}
+
+    async def snapshot_documents(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Takes a snapshot of the vector store and the document registry.
+        Refused while ingestion jobs are running. Queued jobs and new uploads wait until the copy
+        is done, so the two hold the same, whole documents.
+
+        :param name: Name of the snapshot, defaults to the current UTC time.
+        :return: The manifest of the snapshot.
+        """
+        if self.ingestion_jobs.running:
+            raise HTTPException(status_code=409, detail="Ingestion jobs are running, retry once they finished.")
+        try:
+            async with self.ingestion_jobs.paused():
+                return await asyncio.to_thread(self.snapshots.create, name)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except FileExistsError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    async def document_ingestion(self, file: UploadFile, user_id: str = "anonymous") -> IngestionJobStatus:
+        """
+        Queues a document for ingestion and returns at once.
+        A background worker runs the streaming `IngestionPipeline` (convert, split, embed, store);
+        progress can be followed with `get_ingestion_job`.
+
+        :param file: The document file to be ingested.
+        :param user_id: The user uploading the document, cross-document questions can search all of a user's documents.
+        :return: The job status, holding the job_id and the document_id the document will be stored under.
+        """
+        if not file:
+            raise HTTPException(status_code=400, detail="No file was uploaded.")
+
+        return await self.ingestion_jobs.submit(file, user_id)
+
+    def get_ingestion_job(self, job_id: str) -> IngestionJobStatus:
+        """
+        Returns the status of an ingestion job.
+
+        :param job_id: The ID returned by `document_ingestion`.
+        :return: The job status with its stage, chunk counters and timings.
+        """
+        job = self.ingestion_jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+        return job
+    
+    def check_budget(self, session_id: Optional[str]) -> bool:
+        """
+        Applies the per-session token budget before a request runs.
+
+        :param session_id: The session the request is charged to.
+        :return: True if the request must be answered by the cheaper `downgrade_model`.
+        :raises HTTPException: 429 if the session is over budget and the budget action is `reject`.
+        """
+        if not usage_ledger.over_budget(session_id):
+            return False
+        if usage_ledger.params.budget_action == "downgrade":
+            logger.info(f"Session {session_id} is over its token budget, answering with {self.downgrade_model}")
+            return True
+        raise HTTPException(
+            status_code=429,
+            detail=f"Session '{session_id}' has used its budget of {usage_ledger.params.session_token_budget} tokens."
+        )
+
+    async def chat_with_document(self, query: str, document_id: str, top_k: int = 3, use_cache: bool = True,
+                                 session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Answers a query based on the ingested document using the stored embeddings.
+        A semantically equivalent question already answered for the same document is served
+        from the semantic cache without retrieval or generation.
+        Tokens and cost are charged to the document and, if given, to the session.
+
+        :param query: The user's question.
+        :param document_id: The ID of the document to search within.
+        :param top_k: Number of relevant chunks to retrieve.
+        :param use_cache: Set to False to bypass the semantic cache.
+        :param session_id: Optional session the request is charged to, its token budget applies.
+        :return: A dictionary containing the answer, sources, whether it came from the cache and the usage.
+        """
+        if not query.strip():
+            raise HTTPException(status_code=400, detail="Query cannot be empty.")
+
+        downgraded = self.check_budget(session_id)
+        scope = UsageScope("chat_doc", session_id=session_id, document_id=document_id)
+        with scope:
+            response = await self._answer_from_document(
+                query, document_id, top_k, use_cache,
+                model=self.downgrade_model if downgraded else "gemini-1.5-flash"
+            )
+        return {**response, "downgraded": downgraded, "usage": usage_ledger.finish(scope)}
+
+    async def chat_with_document_batch(self, queries: List[str], document_id: str, top_k: int = 3, use_cache: bool = True,
+                                       session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Answers many questions about the same document in one pass.
+        The budget check, the query embeddings (one batch request) and the vector search (one
+        multi-query search) run once for the whole batch; the answers are then generated
+        concurrently, at most `ChatBatchParams.max_concurrency` at a time.
+
+        :param queries: The user's questions.
+        :param document_id: The ID of the document to search within.
+        :param top_k: Number of relevant chunks to retrieve per question.
+        :param use_cache: Set to False to bypass the semantic cache.
+        :param session_id: Optional session the batch is charged to, its token budget applies.
+        :return: A dictionary holding one result per question, in order, each with an `error` that is None on success.
+        """
+        downgraded = self.check_budget(session_id)
+        model = self.downgrade_model if downgraded else "gemini-1.5-flash"
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        for index, query in enumerate(queries):
+            if not query.strip():
+                results[index] = {"query": query, "error": "Query cannot be empty."}
+        pending = [index for index, result in enumerate(results) if result is None]
+
+        scope = UsageScope("chat_doc_batch", session_id=session_id, document_id=document_id)
+        with scope:
+            if pending:
+                embeddings = (await self.aclient["gemini-embedding-001"].embed_content(
+                    text_chunks=[queries[index] for index in pending],
+                    task_type="RETRIEVAL_QUERY"
+                ))["embedding"]
+                by_index = dict(zip(pending, embeddings))
+
+                cache_scope = self._cache_scope(document_id, top_k)
+                for index in pending:
+                    cached = self._lookup_cached(queries[index], cache_scope, by_index[index], use_cache)
+                    if cached is not None:
+                        results[index] = cached
+                misses = [index for index in pending if results[index] is None]
+
+                searches = await self.vector_store.query_many(document_id, [by_index[index] for index in misses], top_k)
+                semaphore = asyncio.Semaphore(self.chat_batch_params.max_concurrency)
+
+                async def answer(index: int, search) -> None:
+                    retrieved_docs, retrieved_meta, _ = search
+                    if not retrieved_docs:
+                        results[index] = {"query": queries[index], "error": "No relevant document chunks found for the given document_id."}
+                        return
+                    try:
+                        async with semaphore:
+                            response = await self._generate_answer(queries[index], retrieved_docs, retrieved_meta, model)
+                    except Exception as e:
+                        logger.info(f"Batch question {index} on document {document_id} failed: {e}")
+                        results[index] = {"query": queries[index], "error": f"Answer generation failed: {e}"}
+                        return
+                    self._store_cached(queries[index], cache_scope, by_index[index], response, use_cache)
+                    results[index] = response
+
+                await asyncio.gather(*(answer(index, search) for index, search in zip(misses, searches)))
+
+        items = []
+        for index, result in enumerate(results):
+            items.append({"index": index, "answer": None, "sources": [], "cached": False, "error": None, **result})
+        return {
+            "document_id": document_id,
+            "results": items,
+            "downgraded": downgraded,
+            "usage": usage_ledger.finish(scope),
+        }
+
+    async def chat_with_documents(self, query: str, document_ids: List[str], top_k: int = 5, use_cache: bool = True,
+                                  session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Answers a query from several documents with a single generation call.
+        The query is embedded once, every document is searched in its own partition concurrently,
+        and only the global `top_k` chunks over all documents go into the prompt. Each chunk is
+        numbered so the answer can cite it, and the sources say which document it came from.
+
+        :param query: The user's question.
+        :param document_ids: The documents to search within.
+        :param top_k: Number of chunks to use over all documents.
+        :param use_cache: Set to False to bypass the semantic cache.
+        :param session_id: Optional session the request is charged to, its token budget applies.
+        :return: A dictionary containing the answer, the attributed sources, whether it came from the cache and the usage.
+        """
+        if not query.strip():
+            raise HTTPException(status_code=400, detail="Query cannot be empty.")
+
+        downgraded = self.check_budget(session_id)
+        model = self.downgrade_model if downgraded else "gemini-1.5-flash"
+        scope = UsageScope("chat_docs", session_id=session_id, document_ids=document_ids)
+        with scope:
+            query_embedding = (await self.aclient["gemini-embedding-001"].embed_content(
+                text_chunks=[query],
+                task_type="RETRIEVAL_QUERY"
+            ))["embedding"][0]
+
+            # The answer depends on the set of documents searched, not on the order they were given in
+            id_digest = hashlib.sha256(",".join(sorted(set(document_ids))).encode("utf-8")).hexdigest()[:16]
+            cache_scope = self._cache_scope(f"multi-{id_digest}", top_k)
+            response = self._lookup_cached(query, cache_scope, query_embedding, use_cache)
+            if response is None:
+                matches = await self.vector_store.query_documents(document_ids, query_embedding, top_k)
+                if not matches:
+                    raise HTTPException(status_code=404, detail="No relevant document chunks found for the given documents.")
+                response = await self._generate_attributed_answer(query, matches, model)
+                self._store_cached(query, cache_scope, query_embedding, response, use_cache)
+
+        return {**response, "document_ids": document_ids, "downgraded": downgraded, "usage": usage_ledger.finish(scope)}
+
+    async def _generate_attributed_answer(self, query: str, matches: List[Tuple[str, Dict[str, Any], float]], model: str) -> Dict[str, Any]:
+        """
+        Asks `model` to answer from chunks of several documents, citing them by number.
+        """
+        sources = []
+        excerpts = []
+        for number, (chunk, metadata, score) in enumerate(matches, start=1):
+            record = self.document_registry.get(metadata.get("document_id", ""))
+            filename = record.filename if record is not None else metadata.get("filename")
+            sources.append({
+                "citation": number,
+                "document_id": metadata.get("document_id"),
+                "filename": filename,
+                "score": round(score, 4),
+                "chunk": chunk,
+                "metadata": metadata,
+            })
+            excerpts.append(f"[{number}] (from {filename})\n{chunk}")
+
+        prompt = (
+            f"You are a helpful assistant. Use the following excerpts from several documents to answer the question.\n"
+            f"Cite the excerpts you use by their number, e.g. [1] or [2][3].\n\n"
+            f"Document Context:\n" + "\n\n".join(excerpts) + "\n\n"
+            f"Question: {query}\n\n"
+            f"Answer:"
+        )
+
+        answer = (await self.aclient[model].ask(prompt)).answer
+        return {"query": query, "answer": answer, "sources": sources, "cached": False}
+
+    @staticmethod
+    def _cache_scope(document_id: str, top_k: int) -> str:
+        # The answer depends on the retrieved context, so top_k is part of the cache scope
+        return f"{document_id}:{top_k}"
+
+    def _lookup_cached(self, query: str, cache_scope: str, query_embedding: List[float], use_cache: bool) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached answer to a semantically equivalent document question, or None.
+        """
+        if self.semantic_cache is None:
+            return None
+        if not use_cache:
+            self.semantic_cache.record_bypass("chat_doc")
+            return None
+        cached = self.semantic_cache.lookup("chat_doc", cache_scope, query_embedding)
+        if cached is not None:
+            return {**cached, "query": query, "cached": True}
+        return None
+
+    def _store_cached(self, query: str, cache_scope: str, query_embedding: List[float], response: Dict[str, Any], use_cache: bool) -> None:
+        if self.semantic_cache is not None and use_cache:
+            self.semantic_cache.store("chat_doc", cache_scope, query, query_embedding, response)
+
+    async def _generate_answer(self, query: str, retrieved_docs: List[str], retrieved_meta: List[Dict[str, Any]], model: str) -> Dict[str, Any]:
+        """
+        Asks `model` to answer a question from the retrieved chunks.
+        """
+        # Build context
+        context_text = "\n\n".join(retrieved_docs)
+
+        # Ask Gemini
+        prompt = (
+            f"You are a helpful assistant. Use the following document excerpts to answer the question.\n\n"
+            f"Document Context:\n{context_text}\n\n"
+            f"Question: {query}\n\n"
+            f"Answer:"
+        )
+
+        answer = (await self.aclient[model].ask(prompt)).answer
+
+        return {
+            "query": query,
+            "answer": answer,
+            "sources": [
+                {"chunk": doc, "metadata": meta}
+                for doc, meta in zip(retrieved_docs, retrieved_meta)
+            ],
+            "cached": False
+        }
+
+    async def _answer_from_document(self, query: str, document_id: str, top_k: int, use_cache: bool, model: str) -> Dict[str, Any]:
+        """
+        Retrieves the chunks of a document closest to the query and asks `model` to answer from them.
+        """
+
+        # Step 1: Embed the query
+        query_embedding = (await self.aclient["gemini-embedding-001"].embed_content(
+            text_chunks=[query],
+            task_type="RETRIEVAL_QUERY"
+        ))["embedding"][0]
+
+        cache_scope = self._cache_scope(document_id, top_k)
+        cached = self._lookup_cached(query, cache_scope, query_embedding, use_cache)
+        if cached is not None:
+            return cached
+
+        # Step 2: Search relevant chunks in the document's partition
+        retrieved_docs, retrieved_meta = await self.vector_store.query(document_id, query_embedding, top_k)
+
+        if not retrieved_docs:
+            raise HTTPException(status_code=404, detail="No relevant document chunks found for the given document_id.")
+
+        # Step 3: Build the context and ask Gemini
+        response = await self._generate_answer(query, retrieved_docs, retrieved_meta, model)
+        self._store_cached(query, cache_scope, query_embedding, response, use_cache)
+        return response
+
+    async def buddy_talk(self, query_data: InputQuery) -> OutputQuery:
+        """
+        Processes a query and returns an answer.
+
+        :param query: The query to be processed.
+        :return: The answer to the query.
+        """
+        # Dummy logic — replace with your orchestrator / LLM call
+        answer = f"You said: {query_data.query}"
+        answer = await self.aclient["gemini-1.5-flash"].ask_with_history(
+            prompt=query_data.query,
+            messages=query_data.chat_history or []
+        )
+        return OutputQuery(query=query_data.query, answer=answer.answer)
+    
+    async def _resolve_session(self, query_data: InputQuery, session_service: TieredSessionService) -> str:
+        """
+        Returns the session ID to run the query in, creating the caller's session on first use.
+        """
+        session_id = query_data.session_id or str(uuid.uuid4())
+        await session_service.get_or_create_session(
+            app_name=APP_NAME, user_id=query_data.user_id, session_id=session_id
+        )
+        return session_id
+
+    async def _embed_cacheable_query(self, query_data: InputQuery, use_cache: bool) -> Optional[List[float]]:
+        """
+        Returns the query embedding used for the `buddy_talk` semantic cache, or None if the query
+        must not be answered from the cache. Follow-ups that carry chat history or continue a
+        session (`session_id`) depend on the conversation and always run the agents.
+        """
+        if self.semantic_cache is None:
+            return None
+        if not use_cache or query_data.chat_history or query_data.session_id:
+            self.semantic_cache.record_bypass("buddy_talk")
+            return None
+        try:
+            return (await self.aclient["gemini-embedding-001"].embed_content(
+                text_chunks=[query_data.query],
+                task_type="RETRIEVAL_QUERY"
+            ))["embedding"][0]
+        except Exception as e:
+            logger.info(f"Skipping semantic cache, query embedding failed: {e}")
+            return None
+
+    async def _downgraded_answer(self, query_data: InputQuery) -> str:
+        """
+        Answers with a single call to the cheaper `downgrade_model`, without the agents or their tools.
+        """
+        response = await self.aclient[self.downgrade_model].ask_with_history(
+            prompt=query_data.query,
+            messages=query_data.chat_history or []
+        )
+        return response.answer
+
+    async def _select_runner(self, query: str, runner: Runner, routed_runners: Optional[Dict[str, Runner]],
+                             query_embedding: Optional[List[float]] = None) -> Tuple[str, Runner]:
+        """
+        Picks the runner for a query: a workflow runner when the intent router is confident,
+        the root agent's runner otherwise. The semantic cache's query embedding is reused by the router.
+        """
+        if not routed_runners:
+            return ROOT_ROUTE, runner
+        route = await self.router.route(query, query_embedding)
+        return route, routed_runners.get(route, runner)
+
+    async def run_agent_interaction(self, query_data: InputQuery, runner: Runner, session_service: TieredSessionService, use_cache: bool = True,
+                                    routed_runners: Optional[Dict[str, Runner]] = None):
+        """
+        Runs the agent interaction based on the provided query data. 
+        Chat history is processed and the response is generated. 
+        Each caller gets its own session, keyed by `query_data.user_id` and `query_data.session_id`.
+        Clear weather/stock queries are dispatched straight to their workflow runner.
+        Standalone questions (no chat history, no session_id) similar to a recent one routed to
+        the same workflow and naming the same places or companies are answered from the semantic cache.
+
+        :param query_data: InputQuery object containing the query and chat history.
+        :param runner: Runner instance to execute the root agent.
+        :param session_service: TieredSessionService instance to manage session state.
+        :param use_cache: Set to False to bypass the semantic cache.
+        :param routed_runners: Runners of the workflows the intent router may dispatch to, keyed by route.
+        :return: OutputQuery object containing the query, the agent's response and the session it ran in.
+        """
+        scope = UsageScope("buddy_talk", session_id=query_data.session_id)
+        downgraded = self.check_budget(query_data.session_id)
+        start_time = time.perf_counter()
+        if not downgraded:
+            with scope:
+                query_embedding = await self._embed_cacheable_query(query_data, use_cache)
+                route, runner = await self._select_runner(query_data.query, runner, routed_runners, query_embedding)
+            # The TTL follows the workflow, and answers are only shared between queries naming the same entities
+            cache_route, cache_scope = f"buddy_talk:{route}", entity_key(query_data.query)
+            if query_embedding is not None:
+                cached = self.semantic_cache.lookup(cache_route, cache_scope, query_embedding)
+                if cached is not None:
+                    return OutputQuery(
+                        query=query_data.query,
+                        answer=cached,
+                        user_id=query_data.user_id,
+                        session_id=query_data.session_id,
+                        cached=True,
+                        usage=usage_ledger.finish(scope),
+                    )
+
+        USER_ID = query_data.user_id
+        SESSION_ID = await self._resolve_session(query_data, session_service)
+        scope.session_id = SESSION_ID
+
+        if downgraded:
+            with scope:
+                answer = await self._downgraded_answer(query_data)
+            return OutputQuery(
+                query=query_data.query,
+                answer=answer,
+                user_id=USER_ID,
+                session_id=SESSION_ID,
+                usage=usage_ledger.finish(scope),
+                downgraded=True,
+            )
+
+        content = Content(role="user", parts=[Part(text=query_data.query)])
+        logger.info(f"History: {query_data.chat_history}")
+        logger.info(f"Running agent interaction with content: {content}")
+
+        events = runner.run_async(
+            user_id=USER_ID,
+            session_id=SESSION_ID,
+            new_message=content,
+        )
+
+        # Per-agent and per-tool durations for /metrics
+        tracker = AgentRunTracker(route)
+        response = ""
+        try:
+            async for event in events:
+                tracker.observe(event)
+                usage_ledger.record_event(event, runner.agent, scope)
+                if event.is_final_response() and event.content and event.content.parts:
+                    response = event.content.parts[0].text
+        except Exception:
+            tracker.finish("error")
+            raise
+        tracker.finish()
+
+        # Testing session events and state
+        # Uncomment the following lines to explore session events
+        # logger.info("========== Session Event Exploration ==========")
+        # session = await session_service.get_session(
+        #     app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
+        # )
+        # logger.info(f"Type of session: {type(session)}")4
+        # if session is not None:
+        #     logger.info(f"Session State: {session.state}")
+        #     logger.info(f"Session Events: {len(session.events)}")
+        # else:
+        #     logger.info("Session is None. Cannot display state or events.")
+        # logger.info("===============================================")
+
+        logger.info(f"Agent interaction route={route} took {time.perf_counter() - start_time:.2f}s")
+        answer = f"This is a response from the agent interaction.\n{response}"
+        if query_embedding is not None and response:
+            self.semantic_cache.store(cache_route, cache_scope, query_data.query, query_embedding, answer)
+
+        return OutputQuery(
+            query=query_data.query,
+            answer=answer,
+            user_id=USER_ID,
+            session_id=SESSION_ID,
+            usage=usage_ledger.finish(scope),
+        )
+
+    async def stream_agent_interaction(self, query_data: InputQuery, runner: Runner, session_service: TieredSessionService,
+                                       routed_runners: Optional[Dict[str, Runner]] = None,
+                                       downgraded: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of `run_agent_interaction`.
+        The runner is put in SSE streaming mode and every intermediate step is yielded as soon as
+        it happens: tool calls and results, state written by sub-agents (e.g. `weather_data`),
+        token deltas of the responses and finally the complete answer.
+
+        :param query_data: InputQuery object containing the query and chat history.
+        :param runner: Runner instance to execute the root agent.
+        :param session_service: TieredSessionService instance to manage session state.
+        :param routed_runners: Runners of the workflows the intent router may dispatch to, keyed by route.
+        :param downgraded: Answer with the cheaper `downgrade_model` instead of the agents, see `check_budget`.
+        :return: Async iterator of event dictionaries, each with a `type` key.
+        """
+        USER_ID = query_data.user_id
+        SESSION_ID = await self._resolve_session(query_data, session_service)
+        yield {"type": "session", "user_id": USER_ID, "session_id": SESSION_ID}
+
+        # Entered only around awaits, never across a yield, so the context variable does not leak to the consumer
+        scope = UsageScope("buddy_talk_stream", session_id=SESSION_ID)
+        if downgraded:
+            with scope:
+                answer = await self._downgraded_answer(query_data)
+            yield {"type": "done", "query": query_data.query, "answer": answer, "user_id": USER_ID, "session_id": SESSION_ID,
+                   "downgraded": True, "usage": usage_ledger.finish(scope)}
+            return
+
+        with scope:
+            route, runner = await self._select_runner(query_data.query, runner, routed_runners)
+        yield {"type": "route", "route": route}
+
+        content = Content(role="user", parts=[Part(text=query_data.query)])
+        logger.info(f"Streaming agent interaction with content: {content}")
+
+        events = runner.run_async(
+            user_id=USER_ID,
+            session_id=SESSION_ID,
+            new_message=content,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        )
+
+        tracker = AgentRunTracker(route)
+        response = ""
+        try:
+            async for event in events:
+                tracker.observe(event)
+                usage_ledger.record_event(event, runner.agent, scope)
+                for item in _describe_event(event):
+                    yield item
+                if event.is_final_response() and not event.partial and event.content and event.content.parts:
+                    response = event.content.parts[0].text or ""
+        except Exception as e:
+            tracker.finish("error")
+            logger.info(f"Error while streaming agent interaction: {e}")
+            yield {"type": "error", "message": str(e), "usage": usage_ledger.finish(scope)}
+            return
+        tracker.finish()
+
+        yield {"type": "done", "query": query_data.query, "answer": response, "user_id": USER_ID, "session_id": SESSION_ID,
+               "usage": usage_ledger.finish(scope)}
+
+
+def _describe_event(event) -> List[Dict[str, Any]]:
+    """
+    Converts an ADK event into the items sent to the client by `stream_agent_interaction`.
+    """
+    items: List[Dict[str, Any]] = []
+    for call in event.get_function_calls():
+        items.append({"type": "tool_call", "author": event.author, "name": call.name, "args": call.args})
+    for result in event.get_function_responses():
+        items.append({"type": "tool_result", "author": event.author, "name": result.name, "response": result.response})
+
+    if event.partial and event.content and event.content.parts:
+        text = "".join(part.text or "" for part in event.content.parts)
+        if text:
+            items.append({"type": "delta", "author": event.author, "text": text})
+
+    if event.actions and event.actions.state_delta:
+        items.append({"type": "state", "author": event.author, "state": dict(event.actions.state_delta)})
+
+    if event.is_final_response() and not event.partial and event.content and event.content.parts:
+        text = "".join(part.text or "" for part in event.content.parts)
+        if text:
+            items.append({"type": "message", "author": event.author, "text": text})
+    return items
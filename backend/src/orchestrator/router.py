@@ -0,0 +1,162 @@
+from typing import Dict, List, Optional, Tuple
+from src.config.app_settings import RouterParams
+
+import asyncio
+import re
+import time
+
+import numpy as np
+
+from src.config.logging import logger
+
+ROOT_ROUTE = "root"
+
+# Cheap first pass, a query matching exactly one route's rules is routed without any model call.
+# Only unambiguous phrases: "rain" or "wind" alone also appear in songs, idioms ("rain check") and
+# company names, such queries are left to the embedding classifier.
+RULES: Dict[str, re.Pattern] = {
+    "weather": re.compile(
+        r"\b(weather|temperature|humidity|umbrella|(hot|cold) outside|"
+        r"(will|is) it (going to )?(rain|snow)(ing)?|is it (windy|sunny|humid))\b",
+        re.IGNORECASE,
+    ),
+    "stock": re.compile(
+        r"\b(stocks?|share price|nse|bse|sensex|nifty|ticker|market cap|p/?e ratio)\b",
+        re.IGNORECASE,
+    ),
+}
+PORTFOLIO_RULE = re.compile(r"\b(compare|comparison|portfolio|versus|vs\.?)\b", re.IGNORECASE)
+
+# Example utterances for the embedding classifier, used when the rules are silent or ambiguous
+EXAMPLES: Dict[str, List[str]] = {
+    "weather": [
+        "What's the weather in Pune?",
+        "Will it rain in Mumbai today?",
+        "How hot is it in Delhi right now?",
+        "Give me today's weather report",
+        "Should I carry a jacket in Bangalore this evening?",
+        "What is the climate like outside?",
+    ],
+    "stock": [
+        "How is TCS doing today?",
+        "What is the current price of Reliance?",
+        "Give me a stock report for INFY",
+        "Should I buy HDFC Bank shares?",
+        "How did Tata Motors perform in the market this week?",
+        "Latest market update for Wipro",
+    ],
+    "portfolio": [
+        "Compare RELIANCE, TCS, INFY and HDFCBANK",
+        "How are my stocks TCS, Wipro and Infosys doing?",
+        "Give me a report on Reliance and Tata Motors",
+        "Which is better to invest in, HDFC Bank or ICICI Bank?",
+        "Portfolio update for SBIN, ITC and LT",
+    ],
+}
+
+
+class IntentRouter:
+    """
+    A cheap local router in front of the root agent.
+    Keyword rules are tried first, then an embedding-similarity classifier over example
+    utterances. Only confident decisions skip the root LLM agent; everything else falls back to it.
+    """
+
+    def __init__(self, embedding_client, params: Optional[RouterParams] = None):
+        """
+        Initializes the IntentRouter.
+
+        Args:
+            embedding_client: Async Gemini client used to embed queries and example utterances.
+            params: Similarity threshold and margin for the embedding classifier.
+        """
+        self.embedding_client = embedding_client
+        self.params = params or RouterParams()
+        self._examples: Optional[Dict[str, np.ndarray]] = None
+        self._examples_lock = asyncio.Lock()
+
+    @staticmethod
+    def _normalize(vectors: List[List[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _match_rules(self, query: str) -> Optional[str]:
+        """
+        Returns the route whose keywords match, or None when no route or several routes match.
+        """
+        matched = [route for route, pattern in RULES.items() if pattern.search(query)]
+        if len(matched) != 1:
+            return None
+        if matched[0] == "stock" and PORTFOLIO_RULE.search(query):
+            return "portfolio"
+        return matched[0]
+
+    async def _example_matrix(self) -> Dict[str, np.ndarray]:
+        """
+        Embeds the example utterances once (they also land in the embedding cache).
+        They are embedded like queries (RETRIEVAL_QUERY), so the embedding the semantic cache
+        computes for a query can be compared with them as is.
+        """
+        async with self._examples_lock:
+            if self._examples is None:
+                routes = list(EXAMPLES)
+                texts = [text for route in routes for text in EXAMPLES[route]]
+                vectors = self._normalize((await self.embedding_client.embed_content(texts, task_type="RETRIEVAL_QUERY"))["embedding"])
+                self._examples = {}
+                start = 0
+                for route in routes:
+                    end = start + len(EXAMPLES[route])
+                    self._examples[route] = vectors[start:end]
+                    start = end
+        return self._examples
+
+    async def _classify_embedding(self, query: str, query_embedding: Optional[List[float]] = None) -> Tuple[Optional[str], float]:
+        """
+        Returns the closest route and its similarity, or (None, similarity) when not confident.
+        The query is only embedded when its RETRIEVAL_QUERY embedding is not given.
+        """
+        examples = await self._example_matrix()
+        if query_embedding is None:
+            query_embedding = (await self.embedding_client.embed_content([query], task_type="RETRIEVAL_QUERY"))["embedding"][0]
+        query_vector = self._normalize([query_embedding])[0]
+        scores = sorted(
+            ((float(np.max(matrix @ query_vector)), route) for route, matrix in examples.items()),
+            reverse=True
+        )
+        best_score, best_route = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        if best_score >= self.params.similarity_threshold and best_score - runner_up >= self.params.margin:
+            return best_route, best_score
+        return None, best_score
+
+    async def route(self, query: str, query_embedding: Optional[List[float]] = None) -> str:
+        """
+        Classifies a query and returns the route to dispatch it to (`root` when unsure).
+        The decision, the method that made it and its latency are logged.
+
+        Args:
+            query: The user's query.
+            query_embedding: Its RETRIEVAL_QUERY embedding when the caller already has it, saves a round trip.
+        """
+        if not self.params.enabled:
+            return ROOT_ROUTE
+
+        start = time.perf_counter()
+        route = self._match_rules(query)
+        method, confidence = "rule", 1.0
+        if route is None:
+            try:
+                route, confidence = await self._classify_embedding(query, query_embedding)
+                method = "embedding"
+            except Exception as e:
+                logger.info(f"Router embedding classifier failed, falling back to root agent: {e}")
+                route, confidence, method = None, 0.0, "error"
+        if route is None:
+            route = ROOT_ROUTE
+            method = f"{method}-fallback"
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Router decision: route={route} method={method} confidence={confidence:.3f} latency_ms={elapsed_ms:.1f}")
+        return route
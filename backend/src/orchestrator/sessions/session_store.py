@@ -0,0 +1,136 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from src.config.app_settings import SessionParams
+
+import time
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, DatabaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from src.config.logging import logger
+
+SessionKey = Tuple[str, str, str]
+
+class TieredSessionService(BaseSessionService):
+    """
+    An ADK session service with a durable SQLite (or any SQLAlchemy) tier and an in-memory hot tier.
+    Sessions are read from memory when possible and loaded from the database otherwise.
+    Events are written through to the database, and idle sessions are evicted from memory
+    by LRU and TTL, so memory per worker stays bounded however many users are active.
+    """
+
+    def __init__(self, params: Optional[SessionParams] = None):
+        """
+        Initializes the TieredSessionService.
+
+        Args:
+            params: Database URL, hot tier size, idle TTL and per-session event limit.
+        """
+        self.params = params or SessionParams()
+        self.store = DatabaseSessionService(db_url=self.params.db_url)
+        # (app_name, user_id, session_id) -> (session, last access time), oldest first
+        self._hot: "OrderedDict[SessionKey, Tuple[Session, float]]" = OrderedDict()
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = await self.store.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        self._put(session)
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        self._evict_expired()
+        cached = self._hot.get(key)
+        if cached is not None and config is None:
+            self._hot[key] = (cached[0], time.time())
+            self._hot.move_to_end(key)
+            return cached[0]
+
+        session = await self.store.get_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=config or GetSessionConfig(num_recent_events=self.params.max_events),
+        )
+        if session is not None and config is None:
+            self._put(session)
+        return session
+
+    async def get_or_create_session(self, *, app_name: str, user_id: str, session_id: str) -> Session:
+        """
+        Returns the session for a caller supplied user and session id, creating it on first use.
+        """
+        session = await self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            session = await self.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            logger.info(f"Created session {session_id} for user {user_id}")
+        return session
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return await self.store.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._hot.pop((app_name, user_id, session_id), None)
+        await self.store.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await self.store.append_event(session, event)
+        # Only the most recent events are kept in memory and sent back to the model
+        overflow = len(session.events) - self.params.max_events
+        if overflow > 0:
+            del session.events[:overflow]
+        key = (session.app_name, session.user_id, session.id)
+        if key in self._hot:
+            self._hot[key] = (session, time.time())
+            self._hot.move_to_end(key)
+        return event
+
+    def _put(self, session: Session) -> None:
+        """
+        Adds a session to the hot tier and evicts the least recently used ones beyond the limit.
+        """
+        key = (session.app_name, session.user_id, session.id)
+        self._hot[key] = (session, time.time())
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.params.max_hot_sessions:
+            evicted_key, _ = self._hot.popitem(last=False)
+            logger.debug(f"Evicted session {evicted_key} from memory (LRU)")
+
+    def _evict_expired(self) -> None:
+        """
+        Drops sessions idle for longer than `ttl_seconds` from the hot tier.
+        They stay in the database and are reloaded on the next request.
+        """
+        deadline = time.time() - self.params.ttl_seconds
+        while self._hot:
+            key, (_, last_access) = next(iter(self._hot.items()))
+            if last_access >= deadline:
+                break
+            self._hot.popitem(last=False)
+            logger.debug(f"Evicted session {key} from memory (TTL)")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of sessions held in memory and the limits of the hot tier.
+        """
+        return {
+            "hot_sessions": len(self._hot),
+            "max_hot_sessions": self.params.max_hot_sessions,
+            "ttl_seconds": self.params.ttl_seconds,
+        }
@@ -0,0 +1,266 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from collections import OrderedDict
+from contextvars import ContextVar
+from src.config.app_settings import PricingParams, UsageParams
+from src.orchestrator.metrics.prometheus import registry, Counter
+
+import threading
+
+from src.config.logging import logger
+
+llm_tokens = registry.register(Counter(
+    "llm_tokens_total",
+    "Tokens sent to and received from Gemini, by model and kind (prompt, completion, embedding).",
+    ("model", "kind"),
+))
+llm_cost = registry.register(Counter(
+    "llm_cost_usd_total",
+    "Estimated Gemini spend in USD, by model.",
+    ("model",),
+))
+
+
+class UsageTotals:
+    """
+    Token and cost counters of one request, session, document or endpoint.
+    """
+    __slots__ = ("requests", "prompt_tokens", "completion_tokens", "embedding_tokens", "cost")
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.embedding_tokens = 0
+        self.cost = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens + self.embedding_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int, embedding_tokens: int, cost: float) -> None:
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.embedding_tokens += embedding_tokens
+        self.cost += cost
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "embedding_tokens": self.embedding_tokens,
+            "total_tokens": self.total_tokens,
+            "cost": round(self.cost, 8),
+        }
+
+
+class UsageScope:
+    """
+    Attributes the Gemini usage of one request to an endpoint, a session and a document.
+    While the scope is entered (`with UsageScope(...)`) every call made by the Gemini clients in
+    the same task or thread is charged to it. Agent events are charged explicitly with
+    `UsageLedger.record_event`, so the scope does not need to stay entered across an async generator.
+    """
+
+    def __init__(self, endpoint: str, session_id: Optional[str] = None, document_id: Optional[str] = None,
+                 document_ids: Sequence[str] = ()):
+        """
+        Initializes the UsageScope.
+
+        Args:
+            endpoint: Name of the entry point, e.g. `buddy_talk` or `chat_doc`.
+            session_id: The agent session the request runs in, if any.
+            document_id: The document the request reads or writes, if any.
+            document_ids: The documents a cross-document question searches. Each of them is
+                charged the whole request, so document totals do not add up to the endpoint's.
+        """
+        self.endpoint = endpoint
+        self.session_id = session_id
+        self.document_id = document_id
+        self.document_ids = tuple(dict.fromkeys(([document_id] if document_id else []) + list(document_ids)))
+        self.totals = UsageTotals()
+        self._tokens: List[Any] = []
+
+    def __enter__(self) -> "UsageScope":
+        self._tokens.append(_current_scope.set(self))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _current_scope.reset(self._tokens.pop())
+
+
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar("usage_scope", default=None)
+
+
+class UsageLedger:
+    """
+    Prices Gemini calls and aggregates their tokens and cost per endpoint, session and document.
+    Session and document totals are kept in memory for the `max_tracked` most recently active
+    ones, which is also what the per-session token budgets are checked against.
+
+    Budgets are a guard against runaway conversations, not a quota. They are not persisted:
+    - A restart resets them, and each server process counts its own sessions.
+    - A session evicted beyond `max_tracked` starts again from zero.
+    - Requests without a `session_id` are charged to no session, so no budget applies to them.
+    """
+
+    def __init__(self, pricing: Optional[PricingParams] = None, params: Optional[UsageParams] = None):
+        """
+        Initializes the UsageLedger.
+
+        Args:
+            pricing: USD per 1M tokens per model.
+            params: Session budget, budget action and tracking limits.
+        """
+        self.pricing = pricing or PricingParams()
+        self.params = params or UsageParams()
+        self.endpoints: Dict[str, UsageTotals] = {}
+        self.sessions: "OrderedDict[str, UsageTotals]" = OrderedDict()
+        self.documents: "OrderedDict[str, UsageTotals]" = OrderedDict()
+        self._unpriced: set = set()
+        self._lock = threading.Lock()
+
+    def _price_of(self, model: str) -> Optional[Dict[str, float]]:
+        """
+        Returns the prices of a model, matching exactly first and then by the longest known prefix.
+        """
+        model = model.split("/")[-1]
+        prices = self.pricing.prices
+        if model in prices:
+            return prices[model]
+        prefixes = [name for name in prices if model.startswith(name)]
+        return prices[max(prefixes, key=len)] if prefixes else None
+
+    def price(self, model: str, prompt_tokens: int, completion_tokens: int = 0) -> float:
+        """
+        Returns the cost in USD of a call, 0.0 for models missing from the price table.
+        """
+        prices = self._price_of(model)
+        if prices is None:
+            if model not in self._unpriced:
+                self._unpriced.add(model)
+                logger.info(f"No price configured for model {model}, its cost is counted as 0")
+            return 0.0
+        return (prompt_tokens * prices["input"] + completion_tokens * prices["output"]) / 1_000_000
+
+    def estimate_tokens(self, texts: Iterable[str]) -> int:
+        """
+        Estimates the token count of texts whose usage the API does not report.
+        """
+        return sum(max(1, int(len(text) / self.pricing.chars_per_token)) for text in texts)
+
+    def _totals(self, table: "OrderedDict[str, UsageTotals]", key: str) -> UsageTotals:
+        """
+        Returns the totals of a session or document, evicting the least recently active beyond `max_tracked`.
+        Must be called with self._lock held.
+        """
+        totals = table.get(key)
+        if totals is None:
+            totals = table[key] = UsageTotals()
+            while len(table) > self.params.max_tracked:
+                table.popitem(last=False)
+        table.move_to_end(key)
+        return totals
+
+    def record(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0, embedding_tokens: int = 0,
+               scope: Optional[UsageScope] = None) -> float:
+        """
+        Prices one call and adds it to the current (or given) scope and its aggregates.
+
+        :param model: The model that served the call.
+        :param prompt_tokens: Input tokens of a generation call.
+        :param completion_tokens: Output tokens of a generation call.
+        :param embedding_tokens: Input tokens of an embedding call.
+        :param scope: The scope to charge, defaults to the one entered in the current context.
+        :return: The cost of the call in USD.
+        """
+        cost = self.price(model, prompt_tokens + embedding_tokens, completion_tokens)
+        for kind, count in (("prompt", prompt_tokens), ("completion", completion_tokens), ("embedding", embedding_tokens)):
+            if count:
+                llm_tokens.inc(count, model=model, kind=kind)
+        llm_cost.inc(cost, model=model)
+
+        scope = scope or _current_scope.get()
+        endpoint = scope.endpoint if scope is not None else "background"
+        with self._lock:
+            self.endpoints.setdefault(endpoint, UsageTotals()).add(prompt_tokens, completion_tokens, embedding_tokens, cost)
+            if scope is not None:
+                scope.totals.add(prompt_tokens, completion_tokens, embedding_tokens, cost)
+                if scope.session_id:
+                    self._totals(self.sessions, scope.session_id).add(prompt_tokens, completion_tokens, embedding_tokens, cost)
+                for document_id in scope.document_ids:
+                    self._totals(self.documents, document_id).add(prompt_tokens, completion_tokens, embedding_tokens, cost)
+        return cost
+
+    def record_embedding(self, model: str, texts: List[str]) -> float:
+        """
+        Charges an embedding call. `batchEmbedContents` returns no usage, so tokens are estimated.
+        """
+        return self.record(model, embedding_tokens=self.estimate_tokens(texts))
+
+    def record_event(self, event, root_agent, scope: Optional[UsageScope] = None) -> float:
+        """
+        Charges the model usage reported on an ADK event to a scope.
+        The model is looked up from the agent that authored the event.
+        Partial (streamed) events are skipped, their usage is repeated on the final event.
+        """
+        usage = getattr(event, "usage_metadata", None)
+        if usage is None or getattr(event, "partial", False):
+            return 0.0
+        agent = root_agent.find_agent(event.author) if root_agent is not None else None
+        model = getattr(agent, "model", None)
+        model = model if isinstance(model, str) else getattr(model, "model", None)
+        prompt_tokens = usage.prompt_token_count or 0
+        # Thinking tokens are billed as output
+        completion_tokens = (usage.candidates_token_count or 0) + (getattr(usage, "thoughts_token_count", None) or 0)
+        return self.record(model or "unknown", prompt_tokens, completion_tokens, scope=scope)
+
+    def finish(self, scope: UsageScope) -> Dict[str, Any]:
+        """
+        Counts the request of a scope once it is done and returns its totals.
+        """
+        with self._lock:
+            scope.totals.requests += 1
+            self.endpoints.setdefault(scope.endpoint, UsageTotals()).requests += 1
+            if scope.session_id:
+                self._totals(self.sessions, scope.session_id).requests += 1
+            for document_id in scope.document_ids:
+                self._totals(self.documents, document_id).requests += 1
+        return scope.totals.as_dict()
+
+    def over_budget(self, session_id: Optional[str]) -> bool:
+        """
+        True if budgets are enabled and the session used up its `session_token_budget`.
+        """
+        budget = self.params.session_token_budget
+        if budget <= 0 or not session_id:
+            return False
+        with self._lock:
+            totals = self.sessions.get(session_id)
+            return totals is not None and totals.total_tokens >= budget
+
+    def session_usage(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            totals = self.sessions.get(session_id)
+            return totals.as_dict() if totals is not None else None
+
+    def document_usage(self, document_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            totals = self.documents.get(document_id)
+            return totals.as_dict() if totals is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the totals per endpoint and the number of tracked sessions and documents.
+        """
+        with self._lock:
+            return {
+                "endpoints": {name: totals.as_dict() for name, totals in self.endpoints.items()},
+                "tracked_sessions": len(self.sessions),
+                "tracked_documents": len(self.documents),
+                "session_token_budget": self.params.session_token_budget,
+                "budget_action": self.params.budget_action,
+            }
+
+
+usage_ledger = UsageLedger()
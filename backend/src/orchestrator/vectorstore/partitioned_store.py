@@ -0,0 +1,419 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+from collections import Counter, OrderedDict
+from src.config.app_settings import VectorStoreParams
+from src.orchestrator.metrics.prometheus import chroma_duration, vector_search_duration
+from src.orchestrator.vectorstore.quantization import NONE, QuantizedVectors, StorageMode, candidate_count, normalize, top_indices
+
+import asyncio
+import heapq
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.config.logging import logger
+
+DEDICATED_PREFIX = "doc_"
+# Written next to the ChromaDB files on shutdown, read on startup to warm the hot documents
+HOT_DOCUMENTS_FILE = "hot_documents.json"
+
+# Chunk texts, their metadata and their cosine similarity to the query, best first
+SearchResult = Tuple[List[str], List[Dict[str, Any]], List[float]]
+
+
+class _DocumentMatrix:
+    """
+    The chunks of one small document held in memory for exact search.
+    """
+    __slots__ = ("ids", "vectors", "documents", "metadatas")
+
+    def __init__(self, ids: List[str], vectors: QuantizedVectors, documents: List[str], metadatas: List[Dict[str, Any]]):
+        self.ids = ids
+        self.vectors = vectors
+        self.documents = documents
+        self.metadatas = metadatas
+
+
+class PartitionedVectorStore:
+    """
+    Stores document chunks partitioned by document, so query latency depends on the size of
+    the document asked about and not on the size of the corpus.
+
+    - Small documents (up to `brute_force_max_chunks` chunks) are persisted in the shared
+      collection, but queried with an exact NumPy dot product over that document's vectors,
+      which are loaded once and kept in an LRU bounded by `max_cached_vectors`.
+    - Large documents get a dedicated collection (`doc_<document_id>`) whose HNSW index only
+      holds their own chunks, so no metadata filter is needed at query time.
+
+    Every collection records its `StorageMode` in its metadata when it is created: the length of
+    its vectors, and for the shared collection the quantization of the in-memory copy. ChromaDB
+    itself only stores float vectors, so dedicated collections are not quantized.
+    """
+
+    def __init__(self, client, params: Optional[VectorStoreParams] = None):
+        """
+        Initializes the PartitionedVectorStore.
+
+        Args:
+            client: The ChromaDB client (e.g. `chromadb.PersistentClient`).
+            params: Collection names, storage modes, the brute-force size limit and the in-memory budget.
+        """
+        self.client = client
+        self.params = params or VectorStoreParams()
+        self.shared_default = StorageMode(self.params.shared_dimensions, self.params.shared_quantization, self.params.rescore_factor)
+        self.dedicated_default = StorageMode(self.params.dedicated_dimensions, NONE, self.params.rescore_factor)
+        self.shared = self._open_collection(self.params.shared_collection, self.shared_default.to_metadata())
+        # An existing collection keeps the mode it was created with, its vectors have that length
+        self.shared_mode = StorageMode.from_metadata(self.shared.metadata, self.shared_default)
+        if str(self.shared_mode) != str(self.shared_default):
+            logger.info(f"Shared collection was created as {self.shared_mode}, ignoring the configured {self.shared_default}")
+        self._modes: Dict[str, StorageMode] = {}
+        # Depending on the Chroma version list_collections returns names or collection objects
+        names = [getattr(collection, "name", collection) for collection in client.list_collections()]
+        self._dedicated: Set[str] = {name[len(DEDICATED_PREFIX):] for name in names if name.startswith(DEDICATED_PREFIX)}
+        self._matrices: "OrderedDict[str, _DocumentMatrix]" = OrderedDict()
+        self._cached_vectors = 0
+        self._cached_bytes = 0
+        # Bumped on every write, a load that raced with a write is not cached
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # document_id -> number of queries, ranks the documents to warm on the next start
+        self._query_counts: Counter = Counter()
+
+    @staticmethod
+    def _collection_name(document_id: str) -> str:
+        return f"{DEDICATED_PREFIX}{document_id}"
+
+    def _open_collection(self, name: str, metadata: Dict[str, Any]):
+        """
+        Returns a collection, creating it with `metadata` if it does not exist yet.
+        The metadata of an existing collection is left as it is.
+        """
+        try:
+            return self.client.get_collection(name=name)
+        except Exception:
+            return self.client.get_or_create_collection(name=name, metadata=metadata)
+
+    def mode_for(self, document_id: str) -> StorageMode:
+        """
+        Returns the storage mode of the collection a document's chunks go to.
+        """
+        if document_id not in self._dedicated:
+            return self.shared_mode
+        mode = self._modes.get(document_id)
+        if mode is None:
+            collection = self._collection_for(document_id)
+            mode = self._modes[document_id] = StorageMode.from_metadata(collection.metadata, self.dedicated_default)
+        return mode
+
+    def is_large(self, chunk_count: int) -> bool:
+        """
+        True if a document with `chunk_count` chunks gets its own collection.
+        """
+        return chunk_count > self.params.brute_force_max_chunks
+
+    def is_dedicated(self, document_id: str) -> bool:
+        return document_id in self._dedicated
+
+    def _collection_for(self, document_id: str):
+        if document_id in self._dedicated:
+            return self.client.get_collection(name=self._collection_name(document_id))
+        return self.shared
+
+    def create_partition(self, document_id: str) -> None:
+        """
+        Creates the dedicated collection of a large document before its chunks are added.
+        """
+        collection = self._open_collection(
+            self._collection_name(document_id),
+            {"hnsw:space": "cosine", **self.dedicated_default.to_metadata()}
+        )
+        self._dedicated.add(document_id)
+        self._modes[document_id] = StorageMode.from_metadata(collection.metadata, self.dedicated_default)
+        logger.info(f"Created dedicated collection for document {document_id} ({self._modes[document_id]})")
+
+    async def upsert(self, document_id: str, ids: List[str], embeddings: List[List[float]],
+                     documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Writes chunks to the document's partition and drops its stale in-memory copy.
+        """
+        collection = self._collection_for(document_id)
+        with chroma_duration.time(operation="upsert"):
+            await asyncio.to_thread(
+                collection.upsert, ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas
+            )
+        self._forget(document_id)
+
+    def delete_document(self, document_id: str) -> None:
+        """
+        Deletes the chunks of a document: its dedicated collection, or its rows of the shared collection.
+        """
+        if document_id in self._dedicated:
+            self.client.delete_collection(name=self._collection_name(document_id))
+            self._dedicated.discard(document_id)
+            self._modes.pop(document_id, None)
+        else:
+            with chroma_duration.time(operation="delete"):
+                self.shared.delete(where={"document_id": document_id})
+        self._forget(document_id)
+        with self._lock:
+            self._query_counts.pop(document_id, None)
+
+    async def query(self, document_id: str, embedding: List[float], top_k: int) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Returns the `top_k` chunks of a document closest to a query embedding, best first.
+
+        :param document_id: The document to search within.
+        :param embedding: The query embedding.
+        :param top_k: Number of chunks to return.
+        :return: The chunk texts and their metadata.
+        """
+        documents, metadatas, _ = (await self.query_many(document_id, [embedding], top_k))[0]
+        return documents, metadatas
+
+    async def query_many(self, document_id: str, embeddings: List[List[float]], top_k: int) -> List[SearchResult]:
+        """
+        Searches a document for several query embeddings at once: one multi-query call on a
+        dedicated collection, or one matrix product over the in-memory vectors of a small document.
+        Queries are truncated to the length of the partition's vectors. With a quantized in-memory
+        copy, the quantized scores shortlist `top_k * rescore_factor` candidates, which are re-scored
+        with their full-precision vectors.
+
+        :param document_id: The document to search within.
+        :param embeddings: The query embeddings, at full or at the partition's length.
+        :param top_k: Number of chunks to return per query.
+        :return: Per query, the chunk texts, their metadata and their cosine similarity, best first.
+        """
+        if not embeddings:
+            return []
+
+        self._query_counts[document_id] += len(embeddings)
+        start = time.perf_counter()
+        if document_id in self._dedicated:
+            queries = self.mode_for(document_id).prepare(embeddings)
+            collection = self._collection_for(document_id)
+            with chroma_duration.time(operation="query"):
+                results = await asyncio.to_thread(collection.query, query_embeddings=queries.tolist(), n_results=top_k)
+            vector_search_duration.observe(time.perf_counter() - start, path="dedicated")
+            documents = results.get("documents") or [[] for _ in embeddings]
+            metadatas = results.get("metadatas") or [[] for _ in embeddings]
+            distances = results.get("distances") or [[] for _ in embeddings]
+            # Dedicated collections use the cosine space, distance = 1 - similarity
+            return [
+                (list(docs or []), list(metas or []), [1.0 - float(d) for d in (dists or [])])
+                for docs, metas, dists in zip(documents, metadatas, distances)
+            ]
+
+        matrix = await self._matrix(document_id)
+        if matrix is None:
+            return [([], [], []) for _ in embeddings]
+        mode = self.shared_mode
+        queries = mode.prepare(embeddings)
+        # (chunks x dim) @ (dim x queries), every query scored in one product
+        scores = matrix.vectors.scores(queries)
+        count = candidate_count(mode, top_k, len(matrix.ids))
+        candidates = [top_indices(column, count) for column in scores.T]
+
+        if not matrix.vectors.exact and mode.rescore_factor:
+            # The quantized scores only shortlist, the final order comes from the full-precision vectors
+            full = await self._full_vectors(matrix, np.unique(np.concatenate(candidates)))
+            ranked = []
+            for query, candidate in zip(queries, candidates):
+                candidate = np.asarray([i for i in candidate if i in full], dtype=np.int64)
+                if len(candidate) == 0:
+                    ranked.append((candidate, np.empty(0, dtype=np.float32)))
+                    continue
+                exact = np.stack([full[i] for i in candidate]) @ query
+                best = top_indices(exact, top_k)
+                ranked.append((candidate[best], exact[best]))
+        else:
+            ranked = [(candidate[:top_k], column[candidate[:top_k]]) for column, candidate in zip(scores.T, candidates)]
+
+        results = [
+            ([matrix.documents[i] for i in best], [matrix.metadatas[i] for i in best], [float(score) for score in best_scores])
+            for best, best_scores in ranked
+        ]
+        vector_search_duration.observe(time.perf_counter() - start, path="bruteforce")
+        return results
+
+    async def _full_vectors(self, matrix: _DocumentMatrix, indices: np.ndarray) -> Dict[int, np.ndarray]:
+        """
+        Loads the full-precision vectors of some chunks of a small document, by their index in `matrix`.
+        """
+        ids = [matrix.ids[i] for i in indices]
+        with chroma_duration.time(operation="rescore"):
+            result = await asyncio.to_thread(self.shared.get, ids=ids, include=["embeddings"])
+        if not result["ids"]:
+            return {}
+        by_id = dict(zip(result["ids"], normalize(result["embeddings"])))
+        return {int(i): by_id[matrix.ids[i]] for i in indices if matrix.ids[i] in by_id}
+
+    async def query_documents(self, document_ids: List[str], embedding: List[float], top_k: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """
+        Searches several documents for one query embedding and returns the global `top_k`.
+        Every document is searched in its own partition, all of them concurrently, and the
+        per-document results are merged on their cosine similarity.
+
+        :param document_ids: The documents to search within.
+        :param embedding: The query embedding.
+        :param top_k: Number of chunks to return over all documents.
+        :return: (chunk text, metadata, similarity) tuples, best first.
+        """
+        start = time.perf_counter()
+        # Each document contributes at most top_k chunks to the global top_k
+        per_document = await asyncio.gather(*(self.query_many(document_id, [embedding], top_k) for document_id in document_ids))
+        candidates = [
+            (document, metadata, score)
+            for results in per_document
+            for documents, metadatas, scores in results
+            for document, metadata, score in zip(documents, metadatas, scores)
+        ]
+        merged = heapq.nlargest(top_k, candidates, key=lambda candidate: candidate[2])
+        vector_search_duration.observe(time.perf_counter() - start, path="fanout")
+        return merged
+
+    async def _matrix(self, document_id: str) -> Optional[_DocumentMatrix]:
+        """
+        Returns the in-memory vectors of a small document, loading them from the shared collection on a miss.
+        """
+        with self._lock:
+            matrix = self._matrices.get(document_id)
+            if matrix is not None:
+                self._matrices.move_to_end(document_id)
+                self.hits += 1
+                return matrix
+            self.misses += 1
+            version = self._versions.get(document_id, 0)
+
+        with chroma_duration.time(operation="get"):
+            result = await asyncio.to_thread(
+                self.shared.get, where={"document_id": document_id}, include=["embeddings", "documents", "metadatas"]
+            )
+        if not result["ids"]:
+            return None
+
+        vectors = QuantizedVectors(self.shared_mode.prepare(result["embeddings"]), self.shared_mode.quantization)
+        matrix = _DocumentMatrix(list(result["ids"]), vectors, list(result["documents"]), list(result["metadatas"]))
+
+        with self._lock:
+            if document_id not in self._matrices and self._versions.get(document_id, 0) == version:
+                self._matrices[document_id] = matrix
+                self._cached_vectors += len(vectors)
+                self._cached_bytes += vectors.nbytes
+            while self._cached_vectors > self.params.max_cached_vectors and len(self._matrices) > 1:
+                _, evicted = self._matrices.popitem(last=False)
+                self._cached_vectors -= len(evicted.vectors)
+                self._cached_bytes -= evicted.vectors.nbytes
+        return matrix
+
+    def hot_documents(self, limit: int) -> List[str]:
+        """
+        Returns the most queried documents of this run, hottest first.
+        """
+        return [document_id for document_id, _ in self._query_counts.most_common(limit)]
+
+    def save_hot_documents(self, limit: int) -> None:
+        """
+        Writes the hottest documents next to the ChromaDB files, merged with the previous list
+        so documents not queried in a short run are not forgotten.
+        """
+        hot = list(dict.fromkeys(self.hot_documents(limit) + self.load_hot_documents()))[:limit]
+        path = os.path.join(self.params.path, HOT_DOCUMENTS_FILE)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(hot, handle)
+        logger.info(f"Saved {len(hot)} hot documents to {path}")
+
+    def load_hot_documents(self) -> List[str]:
+        """
+        Returns the hot documents saved by the previous run, hottest first.
+        """
+        path = os.path.join(self.params.path, HOT_DOCUMENTS_FILE)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, encoding="utf-8") as handle:
+                return [str(document_id) for document_id in json.load(handle)]
+        except (OSError, ValueError) as e:
+            logger.info(f"Ignoring unreadable hot document list {path}: {e}")
+            return []
+
+    async def warm(self, document_ids: List[str]) -> int:
+        """
+        Loads the indexes of documents before they are queried: the HNSW index of a dedicated
+        collection is read from disk by a first query, the vectors of a small document are
+        loaded into the exact-search cache. Stops once the in-memory budget is full.
+
+        :param document_ids: The documents to warm, hottest first.
+        :return: The number of documents warmed.
+        """
+        warmed = 0
+        for document_id in document_ids:
+            try:
+                if document_id in self._dedicated:
+                    collection = self._collection_for(document_id)
+                    probe = [[1.0] + [0.0] * (self.mode_for(document_id).dimensions - 1)]
+                    with chroma_duration.time(operation="warm"):
+                        await asyncio.to_thread(collection.query, query_embeddings=probe, n_results=1)
+                else:
+                    if self._cached_vectors >= self.params.max_cached_vectors:
+                        break
+                    if await self._matrix(document_id) is None:
+                        continue
+                warmed += 1
+            except Exception as e:
+                logger.info(f"Could not warm document {document_id}: {e}")
+        return warmed
+
+    def wipe(self) -> None:
+        """
+        Deletes every collection and recreates an empty shared one. The caller clears the document registry.
+        """
+        for document_id in list(self._dedicated):
+            self.client.delete_collection(name=self._collection_name(document_id))
+        self.client.delete_collection(name=self.params.shared_collection)
+        self.shared = self._open_collection(self.params.shared_collection, self.shared_default.to_metadata())
+        self.shared_mode = StorageMode.from_metadata(self.shared.metadata, self.shared_default)
+        with self._lock:
+            for document_id in set(self._matrices) | self._dedicated:
+                self._versions[document_id] = self._versions.get(document_id, 0) + 1
+            self._dedicated.clear()
+            self._modes.clear()
+            self._matrices.clear()
+            self._cached_vectors = 0
+            self._cached_bytes = 0
+            self._query_counts.clear()
+        path = os.path.join(self.params.path, HOT_DOCUMENTS_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+        logger.info("Vector store wiped")
+
+    def _forget(self, document_id: str) -> None:
+        with self._lock:
+            self._versions[document_id] = self._versions.get(document_id, 0) + 1
+            matrix = self._matrices.pop(document_id, None)
+            if matrix is not None:
+                self._cached_vectors -= len(matrix.vectors)
+                self._cached_bytes -= matrix.vectors.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of partitions and the state of the in-memory exact-search cache.
+        """
+        with self._lock:
+            return {
+                "dedicated_collections": len(self._dedicated),
+                "cached_documents": len(self._matrices),
+                "cached_vectors": self._cached_vectors,
+                "cached_bytes": self._cached_bytes,
+                "shared_storage": str(self.shared_mode),
+                "dedicated_storage": str(self.dedicated_default),
+                "rescore_factor": self.params.rescore_factor,
+                "max_cached_vectors": self.params.max_cached_vectors,
+                "brute_force_max_chunks": self.params.brute_force_max_chunks,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,179 @@
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+NONE = "none"
+INT8 = "int8"
+BINARY = "binary"
+QUANTIZATIONS = (NONE, INT8, BINARY)
+
+# gemini-embedding-001 returns 3072 values, its Matryoshka training keeps any prefix usable
+FULL_DIMENSIONS = 3072
+DIMENSIONS = (768, 1536, FULL_DIMENSIONS)
+
+# Rows converted to float32 at a time when scoring int8 codes, bounds the temporary memory.
+# NumPy's integer matmul has no BLAS kernel: quantizing the query too and multiplying int8 by int8
+# (accumulating in int32) measured no faster for one query and 2.5x slower for four.
+_SCORE_BLOCK = 4096
+# Number of set bits of every byte value, for Hamming distances on packed bits
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class StorageMode:
+    """
+    How the vectors of one collection are stored and searched.
+
+    - `dimensions`: length of the stored vectors. Shorter vectors are requested from the API with
+      `output_dimensionality`, queries are embedded once at full length and truncated per collection.
+    - `quantization`: form of the in-memory copy used for exact search of small documents. `int8`
+      keeps one byte per value and a scale per vector, `binary` one bit per value (the sign).
+    - `rescore_factor`: with quantization, `top_k * rescore_factor` candidates are re-scored
+      with the full-precision vectors from ChromaDB. 0 returns the quantized scores as they are.
+    """
+
+    def __init__(self, dimensions: int = FULL_DIMENSIONS, quantization: str = NONE, rescore_factor: int = 4):
+        """
+        Initializes the StorageMode.
+
+        Args:
+            dimensions: One of 768, 1536 or 3072.
+            quantization: One of `none`, `int8` or `binary`.
+            rescore_factor: Candidates re-scored at full precision per requested result.
+        """
+        if dimensions not in DIMENSIONS:
+            raise ValueError(f"Unsupported embedding dimensions {dimensions}, expected one of {DIMENSIONS}.")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}.")
+        self.dimensions = dimensions
+        self.quantization = quantization
+        self.rescore_factor = max(0, rescore_factor)
+
+    @property
+    def output_dimensionality(self) -> Optional[int]:
+        """
+        The `output_dimensionality` to request from the API, None for full-length vectors.
+        """
+        return None if self.dimensions == FULL_DIMENSIONS else self.dimensions
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {"embedding_dimensions": self.dimensions, "quantization": self.quantization}
+
+    @classmethod
+    def from_metadata(cls, metadata: Optional[Dict[str, Any]], default: "StorageMode") -> "StorageMode":
+        """
+        Reads the mode a collection was created with. Collections created before storage modes
+        existed hold full-length vectors.
+        """
+        metadata = metadata or {}
+        return cls(
+            dimensions=int(metadata.get("embedding_dimensions", FULL_DIMENSIONS)),
+            quantization=metadata.get("quantization", default.quantization),
+            rescore_factor=default.rescore_factor,
+        )
+
+    def prepare(self, embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+        """
+        Truncates embeddings to the collection's length and normalizes them to unit length.
+        """
+        return normalize(np.asarray(embeddings, dtype=np.float32)[:, :self.dimensions])
+
+    def __str__(self) -> str:
+        return f"{self.dimensions}d/{self.quantization}"
+
+
+class QuantizedVectors:
+    """
+    Unit-length vectors held in the form selected by a `StorageMode`.
+    Only the quantized codes are kept for `int8` and `binary`, the float vectors are dropped.
+    """
+    __slots__ = ("quantization", "dimensions", "vectors", "codes", "scales")
+
+    def __init__(self, vectors: np.ndarray, quantization: str = NONE):
+        """
+        Initializes the QuantizedVectors.
+
+        Args:
+            vectors: (count x dimensions) unit-length float32 vectors.
+            quantization: One of `none`, `int8` or `binary`.
+        """
+        self.quantization = quantization
+        self.dimensions = vectors.shape[1]
+        self.vectors: Optional[np.ndarray] = None
+        self.codes: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        if quantization == NONE:
+            self.vectors = vectors
+        elif quantization == INT8:
+            # Symmetric per-vector scale, the largest component maps to +-127
+            peaks = np.abs(vectors).max(axis=1, keepdims=True)
+            peaks[peaks == 0] = 1.0
+            self.codes = np.round(vectors / peaks * 127).astype(np.int8)
+            self.scales = (peaks[:, 0] / 127).astype(np.float32)
+        else:
+            self.codes = np.packbits(vectors > 0, axis=1)
+
+    def __len__(self) -> int:
+        return len(self.vectors if self.vectors is not None else self.codes)
+
+    @property
+    def exact(self) -> bool:
+        return self.vectors is not None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.vectors, self.codes, self.scales) if array is not None)
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Scores every vector against unit-length queries, higher is closer.
+        Exact cosine similarity without quantization; an int8 dot product, or `1 - 2 * hamming / dimensions`
+        for binary codes, otherwise.
+
+        :param queries: (queries x dimensions) unit-length float32 queries.
+        :return: A (vectors x queries) score matrix.
+        """
+        if self.vectors is not None:
+            return self.vectors @ queries.T
+
+        scores = np.empty((len(self), len(queries)), dtype=np.float32)
+        if self.quantization == INT8:
+            for start in range(0, len(self), _SCORE_BLOCK):
+                block = self.codes[start:start + _SCORE_BLOCK].astype(np.float32)
+                scores[start:start + _SCORE_BLOCK] = (block @ queries.T) * self.scales[start:start + _SCORE_BLOCK, None]
+            return scores
+
+        for column, bits in enumerate(np.packbits(queries > 0, axis=1)):
+            hamming = _POPCOUNT[np.bitwise_xor(self.codes, bits)].sum(axis=1, dtype=np.int32)
+            scores[:, column] = 1.0 - 2.0 * hamming / self.dimensions
+        return scores
+
+
+def top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Returns the indices of the `k` highest scores, best first.
+    argpartition is O(n), only the k best are sorted.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+def candidate_count(mode: StorageMode, top_k: int, available: int) -> int:
+    """
+    Number of candidates to take from the quantized scores before re-scoring.
+    """
+    if mode.quantization == NONE or mode.rescore_factor == 0:
+        return min(top_k, available)
+    return min(top_k * mode.rescore_factor, available)
+
+
+def normalize(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Returns float32 unit-length copies of vectors.
+    """
+    array = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(array, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return array / norms
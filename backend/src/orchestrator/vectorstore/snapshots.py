@@ -0,0 +1,181 @@
+from typing import Any, Dict, List, Optional
+from src.config.app_settings import DocumentRegistryParams, VectorStoreParams
+
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+
+from src.config.logging import logger
+
+MANIFEST_FILE = "manifest.json"
+CHROMA_DIR = "chroma"
+REGISTRY_FILE = "documents.db"
+SQLITE_SUFFIXES = (".sqlite3", ".db")
+# Written by SQLite next to a database in WAL mode, the backup API copies their content instead
+SQLITE_SIDE_FILES = ("-wal", "-shm", "-journal")
+
+
+def _backup_sqlite(source: str, target: str) -> None:
+    """
+    Copies a SQLite database with the online backup API, which gives a consistent copy
+    even while another connection writes to it.
+    """
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+
+
+def _copy_tree(source: str, target: str) -> int:
+    """
+    Copies a directory, SQLite files through the backup API. Returns the number of bytes copied.
+    """
+    copied = 0
+    for root, _, files in os.walk(source):
+        destination = os.path.join(target, os.path.relpath(root, source))
+        os.makedirs(destination, exist_ok=True)
+        for name in files:
+            if name.endswith(SQLITE_SIDE_FILES):
+                continue
+            path = os.path.join(root, name)
+            if name.endswith(SQLITE_SUFFIXES):
+                _backup_sqlite(path, os.path.join(destination, name))
+            else:
+                shutil.copy2(path, os.path.join(destination, name))
+            copied += os.path.getsize(os.path.join(destination, name))
+    return copied
+
+
+class VectorStoreSnapshots:
+    """
+    Snapshots of the persistent document index: the ChromaDB directory together with the document
+    registry. The two are copied one after the other, so they describe the same documents only
+    if nothing is ingested or deleted during the copy; the caller has to hold the writers
+    (`BuddyOrchestrator.snapshot_documents` pauses the ingestion workers).
+
+    A snapshot can be taken while the server runs. The SQLite files are copied with the backup
+    API; HNSW files of dedicated collections that were not flushed yet are expected to be rebuilt
+    by ChromaDB from its SQLite log when the snapshot is loaded, which depends on the ChromaDB
+    version. Check a snapshot by restoring it with `CHROMA_PATH` and `DOCUMENT_REGISTRY_PATH`
+    pointing to a scratch directory and querying it. Restoring replaces the files under a running
+    ChromaDB client, so it is only offered as an offline command (`python -m src.manage restore`).
+    """
+
+    def __init__(self, vector_params: Optional[VectorStoreParams] = None,
+                 registry_params: Optional[DocumentRegistryParams] = None):
+        """
+        Initializes the VectorStoreSnapshots.
+
+        Args:
+            vector_params: Location of the ChromaDB files and of the snapshots.
+            registry_params: Location of the document registry.
+        """
+        self.vector_params = vector_params or VectorStoreParams()
+        self.registry_params = registry_params or DocumentRegistryParams()
+        self.directory = self.vector_params.snapshot_dir
+
+    def _path(self, name: str) -> str:
+        if not re.fullmatch(r"[A-Za-z0-9._-]+", name) or name.startswith("."):
+            raise ValueError(f"Invalid snapshot name '{name}', use letters, digits, '.', '_' and '-'.")
+        return os.path.join(self.directory, name)
+
+    def create(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Copies the ChromaDB directory and the document registry into `<snapshot_dir>/<name>`.
+
+        :param name: Name of the snapshot, defaults to the current UTC time.
+        :return: The manifest of the snapshot.
+        """
+        name = name or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        path = self._path(name)
+        if os.path.exists(path):
+            raise FileExistsError(f"Snapshot '{name}' already exists.")
+
+        # Written to a temporary directory first, a snapshot that exists is complete
+        partial = f"{path}.partial"
+        shutil.rmtree(partial, ignore_errors=True)
+        os.makedirs(partial)
+        try:
+            started = time.perf_counter()
+            size = 0
+            if os.path.isdir(self.vector_params.path):
+                size += _copy_tree(self.vector_params.path, os.path.join(partial, CHROMA_DIR))
+            documents = 0
+            if os.path.exists(self.registry_params.path):
+                registry_copy = os.path.join(partial, REGISTRY_FILE)
+                _backup_sqlite(self.registry_params.path, registry_copy)
+                size += os.path.getsize(registry_copy)
+                with sqlite3.connect(registry_copy) as conn:
+                    documents = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            manifest = {
+                "name": name,
+                "created_at": time.time(),
+                "documents": documents,
+                "bytes": size,
+                "duration_seconds": round(time.perf_counter() - started, 3),
+            }
+            with open(os.path.join(partial, MANIFEST_FILE), "w", encoding="utf-8") as handle:
+                json.dump(manifest, handle, indent=2)
+            os.replace(partial, path)
+        except Exception:
+            shutil.rmtree(partial, ignore_errors=True)
+            raise
+        logger.info(f"Snapshot '{name}' created with {documents} documents ({size} bytes)")
+        return manifest
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        Returns the manifests of the complete snapshots, newest first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        manifests = []
+        for name in os.listdir(self.directory):
+            manifest_path = os.path.join(self.directory, name, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                with open(manifest_path, encoding="utf-8") as handle:
+                    manifests.append(json.load(handle))
+        return sorted(manifests, key=lambda manifest: manifest["created_at"], reverse=True)
+
+    def restore(self, name: str) -> Dict[str, Any]:
+        """
+        Replaces the ChromaDB directory and the document registry with a snapshot.
+        The server must be stopped. The replaced files are kept next to them with a
+        `.replaced-<time>` suffix until they are deleted by hand.
+
+        :param name: Name of the snapshot.
+        :return: The manifest of the restored snapshot.
+        """
+        path = self._path(name)
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Snapshot '{name}' does not exist.")
+        with open(manifest_path, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+
+        suffix = f".replaced-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}"
+        targets = ((self.vector_params.path, os.path.join(path, CHROMA_DIR)),
+                   (self.registry_params.path, os.path.join(path, REGISTRY_FILE)))
+        for target, source in targets:
+            if os.path.exists(target):
+                os.replace(target, target + suffix)
+                logger.info(f"Moved {target} to {target + suffix}")
+            for side in SQLITE_SIDE_FILES:
+                if os.path.exists(target + side):
+                    os.replace(target + side, target + suffix + side)
+            if os.path.isdir(source):
+                _copy_tree(source, target)
+            elif os.path.exists(source):
+                _backup_sqlite(source, target)
+        logger.info(f"Restored snapshot '{name}' with {manifest['documents']} documents")
+        return manifest
+
+    def delete(self, name: str) -> None:
+        """
+        Removes a snapshot.
+        """
+        path = self._path(name)
+        if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            raise FileNotFoundError(f"Snapshot '{name}' does not exist.")
+        shutil.rmtree(path)
@@ -0,0 +1,150 @@
+"""
+Startup profile of the backend. Run from the `backend` directory:
+
+    python -m src.startup_profile [--module src.main] [--top 25] [--json]
+
+Two parts are reported:
+
+- imports: `python -X importtime -c "import src.main"` in a fresh interpreter, summed per
+  top-level package (self time) and the slowest single modules (cumulative time, children included)
+- initialization: in this process, the time to import the module and then to create every
+  component that is loaded on first use (agents, Gemini clients, ChromaDB, ingestion pipeline)
+
+Components that cannot be created here (missing API key, dependency not installed) are reported
+with their error instead of a duration.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+import argparse
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def import_times(module: str = "src.main") -> List[Dict[str, Any]]:
+    """
+    Imports `module` in a fresh interpreter with `-X importtime`.
+
+    :param module: The module to import.
+    :return: One entry per imported module with its `self_ms`, `cumulative_ms` and nesting `depth`, in import order.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        # The traceback is printed after the importtime lines
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+    timings = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    return timings
+
+
+def by_package(timings: List[Dict[str, Any]]) -> List[Tuple[str, float]]:
+    """
+    Sums the self time of the imported modules per top-level package, slowest first.
+    The backend's own modules are kept apart per second-level package (`src.orchestrator`, ...).
+    """
+    totals: Dict[str, float] = {}
+    for timing in timings:
+        parts = timing["module"].split(".")
+        package = ".".join(parts[:2]) if parts[0] == "src" else parts[0]
+        totals[package] = totals.get(package, 0.0) + timing["self_ms"]
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def _init_steps() -> List[Tuple[str, Callable[[Any], Any]]]:
+    """
+    The components loaded on first use, in the order the server creates them.
+    """
+    def agents(_):
+        importlib.import_module("src.orchestrator.agents.agent")
+
+    return [
+        ("agents", agents),
+        ("embedding client", lambda main: main.buddy_orchestrator.aclient["gemini-embedding-001"]),
+        ("chat client", lambda main: main.buddy_orchestrator.aclient["gemini-1.5-flash"]),
+        ("vector store (chromadb)", lambda main: main.buddy_orchestrator.vector_store),
+        ("ingestion pipeline", lambda main: main.buddy_orchestrator.ingestion_pipeline),
+        ("genai client", lambda main: main.buddy_orchestrator.genai_client),
+        ("markitdown", lambda _: importlib.import_module("markitdown")),
+    ]
+
+
+def initialization_times(module: str = "src.main") -> List[Dict[str, Any]]:
+    """
+    Imports `module` in this process, then creates the lazily loaded components one by one.
+
+    :param module: The module to import, its `buddy_orchestrator` is used when it has one.
+    :return: One entry per step with its `ms`, or the `error` that stopped it.
+    """
+    steps = []
+    start = time.perf_counter()
+    loaded = importlib.import_module(module)
+    steps.append({"step": f"import {module}", "ms": (time.perf_counter() - start) * 1000, "error": None})
+    if not hasattr(loaded, "buddy_orchestrator"):
+        return steps
+    for name, step in _init_steps():
+        start = time.perf_counter()
+        try:
+            step(loaded)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        steps.append({"step": name, "ms": (time.perf_counter() - start) * 1000, "error": error})
+    return steps
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.startup_profile", description="Import and initialization time per module.")
+    parser.add_argument("--module", default="src.main", help="Module to profile, defaults to src.main.")
+    parser.add_argument("--top", type=int, default=25, help="Number of packages and modules listed.")
+    parser.add_argument("--json", action="store_true", help="Print the full profile as JSON.")
+    args = parser.parse_args(argv)
+
+    try:
+        timings = import_times(args.module)
+    except RuntimeError as e:
+        print(e)
+        return 1
+    steps = initialization_times(args.module)
+
+    if args.json:
+        print(json.dumps({"imports": timings, "packages": by_package(timings), "initialization": steps}, indent=2))
+        return 0
+
+    total = sum(timing["self_ms"] for timing in timings)
+    print(f"Import of {args.module}: {total:.0f} ms over {len(timings)} modules\n")
+    print(f"{'package':<40} {'self ms':>9}")
+    for package, ms in by_package(timings)[:args.top]:
+        print(f"{package:<40} {ms:>9.1f}")
+
+    print(f"\n{'module':<60} {'cumulative ms':>14}")
+    for timing in sorted(timings, key=lambda timing: timing["cumulative_ms"], reverse=True)[:args.top]:
+        print(f"{timing['module']:<60} {timing['cumulative_ms']:>14.1f}")
+
+    print(f"\n{'initialization':<40} {'ms':>9}")
+    for step in steps:
+        suffix = f"  ({step['error']})" if step["error"] else ""
+        print(f"{step['step']:<40} {step['ms']:>9.1f}{suffix}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,21 +1,63 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-
-class InputQuery(BaseModel):
-    """
-    Represents a query input with a question and optional chat history.
-    This model is used to structure the input for a query in the application.
-    
-    Attributes:
-        query (str): The query being asked.
-        chat_history (Optional[List[Dict[str, str]]]): Optional chat history to provide context for the question.
-    """
-    query: str = Field(..., description="The query being asked.")
-    chat_history: Optional[List[Dict[str,Any]]] = Field(
-        default=None, description="Optional chat history to provide context for the question."
-    )
-
-class ChatRequest(BaseModel):
-    document_id: str
-    query: str
-    top_k: int = 3
\ No newline at end of file
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+
+class InputQuery(BaseModel):
+    """
+    Represents a query input with a question and optional chat history.
+    This model is used to structure the input for a query in the application.
+    
+    Attributes:
+        query (str): The query being asked.
+        chat_history (Optional[List[Dict[str, str]]]): Optional chat history to provide context for the question.
+        user_id (str): The caller's user ID, sessions are kept per user.
+        session_id (Optional[str]): The conversation to continue. A new session is started when omitted.
+    """
+    query: str = Field(..., description="The query being asked.")
+    chat_history: Optional[List[Dict[str,Any]]] = Field(
+        default=None, description="Optional chat history to provide context for the question."
+    )
+    user_id: str = Field(default="anonymous", description="The caller's user ID, sessions are kept per user.")
+    session_id: Optional[str] = Field(
+        default=None, description="The conversation to continue. A new session is started when omitted."
+    )
+
+class ChatRequest(BaseModel):
+    document_id: str
+    query: str
+    top_k: int = 3
+    # Optional, charges the request to an agent session and its token budget
+    session_id: Optional[str] = None
+
+class ChatBatchRequest(BaseModel):
+    """
+    Represents several questions about the same document, answered in one pass.
+
+    Attributes:
+        document_id (str): The document to search within.
+        queries (List[str]): The questions, answered in order.
+        top_k (int): Number of relevant chunks to retrieve per question.
+        session_id (Optional[str]): Optional session the batch is charged to.
+    """
+    document_id: str = Field(..., description="The document to search within.")
+    queries: List[str] = Field(..., description="The questions, answered in order.")
+    top_k: int = Field(default=3, description="Number of relevant chunks to retrieve per question.")
+    session_id: Optional[str] = Field(default=None, description="Optional session the batch is charged to.")
+
+class ChatDocumentsRequest(BaseModel):
+    """
+    Represents a question asked across several documents.
+
+    Attributes:
+        query (str): The question.
+        document_ids (Optional[List[str]]): The documents to search within.
+        user_id (Optional[str]): Search all documents uploaded by this user when `document_ids` is omitted.
+        top_k (int): Number of chunks to use over all documents.
+        session_id (Optional[str]): Optional session the request is charged to.
+    """
+    query: str = Field(..., description="The question.")
+    document_ids: Optional[List[str]] = Field(default=None, description="The documents to search within.")
+    user_id: Optional[str] = Field(
+        default=None, description="Search all documents uploaded by this user when `document_ids` is omitted."
+    )
+    top_k: int = Field(default=5, description="Number of chunks to use over all documents.")
+    session_id: Optional[str] = Field(default=None, description="Optional session the request is charged to.")
\ No newline at end of file
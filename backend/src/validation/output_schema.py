@@ -1,27 +1,115 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
-
-class OutputQuery(BaseModel):
-    """
-    Represents a query output with a question and an answer.
-    This model is used to structure the output of a query in the application.
-    Attributes:
-        query (str): The query being asked.
-        answer (str): The answer to the query.
-    """
-    query: str = Field(..., description="The query being asked.")
-    answer: str = Field(..., description="The answer to the query.")
-
-class ChatResponse(BaseModel):
-    """
-    Represents a response from the chat system.
-    This model is used to structure the response returned by the chat system.
-
-    Attributes:
-        answer (str): The answer to the query.
-        cost (Optional[float]): The cost of processing the query, if applicable.
-        time_taken (Optional[float]): The time taken to process the query, if applicable.
-    """
-    answer: str = Field(..., description="The answer to the query.")
-    cost: Optional[float] = Field(None, description="The cost of the query, if applicable.")
-    time_taken: Optional[float] = Field(None, description="The time taken to process the query, if applicable.")
\ No newline at end of file
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+
+class OutputQuery(BaseModel):
+    """
+    Represents a query output with a question and an answer.
+    This model is used to structure the output of a query in the application.
+    Attributes:
+        query (str): The query being asked.
+        answer (str): The answer to the query.
+        user_id (Optional[str]): The user the session belongs to.
+        session_id (Optional[str]): The session the query ran in, pass it back to continue the conversation.
+        cached (bool): True if the answer was served from the semantic cache.
+        usage (Optional[Dict[str, Any]]): Tokens and cost of the request.
+        downgraded (bool): True if the session was over its token budget and a cheaper model answered.
+    """
+    query: str = Field(..., description="The query being asked.")
+    answer: str = Field(..., description="The answer to the query.")
+    user_id: Optional[str] = Field(None, description="The user the session belongs to.")
+    session_id: Optional[str] = Field(None, description="The session the query ran in, pass it back to continue the conversation.")
+    cached: bool = Field(False, description="True if the answer was served from the semantic cache.")
+    usage: Optional[Dict[str, Any]] = Field(None, description="Tokens and cost of the request.")
+    downgraded: bool = Field(False, description="True if the session was over its token budget and a cheaper model answered.")
+
+class ChatResponse(BaseModel):
+    """
+    Represents a response from the chat system.
+    This model is used to structure the response returned by the chat system.
+
+    Attributes:
+        answer (str): The answer to the query.
+        cost (Optional[float]): The cost of processing the query in USD, if applicable.
+        time_taken (Optional[float]): The time taken to process the query, if applicable.
+        model (Optional[str]): The model that answered.
+        prompt_tokens (int): Input tokens billed for the query.
+        completion_tokens (int): Output tokens billed for the answer.
+        total_tokens (int): Sum of input and output tokens.
+    """
+    answer: str = Field(..., description="The answer to the query.")
+    cost: Optional[float] = Field(None, description="The cost of the query in USD, if applicable.")
+    time_taken: Optional[float] = Field(None, description="The time taken to process the query, if applicable.")
+    model: Optional[str] = Field(None, description="The model that answered.")
+    prompt_tokens: int = Field(0, description="Input tokens billed for the query.")
+    completion_tokens: int = Field(0, description="Output tokens billed for the answer.")
+    total_tokens: int = Field(0, description="Sum of input and output tokens.")
+
+class IngestionJobStatus(BaseModel):
+    """
+    Represents the state of a background document ingestion job.
+    This model is returned by the upload endpoint and the job status endpoint.
+
+    Attributes:
+        job_id (str): The ID of the ingestion job.
+        document_id (str): The ID the document will be stored under.
+        filename (Optional[str]): Original name of the uploaded file.
+        user_id (str): The user who uploaded the document.
+        content_hash (Optional[str]): sha256 of the uploaded bytes.
+        duplicate (bool): True if the content was already indexed and no work was done.
+        status (str): One of queued, running, completed or failed.
+        stage (str): The pipeline stage the job is in.
+        chunks_embedded (int): Number of chunks embedded and stored so far.
+        chunks_total (Optional[int]): Total number of chunks, known once the text is split.
+        error (Optional[str]): Error message if the job failed.
+        created_at (float): Unix time the job was submitted.
+        started_at (Optional[float]): Unix time a worker picked the job up.
+        finished_at (Optional[float]): Unix time the job completed or failed.
+        stage_timings (Dict[str, float]): Seconds spent in each finished stage.
+        usage (Optional[Dict[str, Any]]): Embedding tokens and cost of the job.
+    """
+    job_id: str = Field(..., description="The ID of the ingestion job.")
+    document_id: str = Field(..., description="The ID the document will be stored under.")
+    filename: Optional[str] = Field(None, description="Original name of the uploaded file.")
+    user_id: str = Field("anonymous", description="The user who uploaded the document.")
+    content_hash: Optional[str] = Field(None, description="sha256 of the uploaded bytes.")
+    duplicate: bool = Field(False, description="True if the content was already indexed and no work was done.")
+    status: str = Field("queued", description="One of queued, running, completed or failed.")
+    stage: str = Field("queued", description="The pipeline stage the job is in.")
+    chunks_embedded: int = Field(0, description="Number of chunks embedded and stored so far.")
+    chunks_total: Optional[int] = Field(None, description="Total number of chunks, known once the text is split.")
+    error: Optional[str] = Field(None, description="Error message if the job failed.")
+    created_at: float = Field(..., description="Unix time the job was submitted.")
+    started_at: Optional[float] = Field(None, description="Unix time a worker picked the job up.")
+    finished_at: Optional[float] = Field(None, description="Unix time the job completed or failed.")
+    stage_timings: Dict[str, float] = Field(default_factory=dict, description="Seconds spent in each finished stage.")
+    usage: Optional[Dict[str, Any]] = Field(None, description="Embedding tokens and cost of the job.")
+
+class DocumentRecord(BaseModel):
+    """
+    Represents an ingested document in the document registry.
+    This model is returned by the document listing endpoints.
+
+    Attributes:
+        document_id (str): The ID the document's chunks are stored under.
+        filename (Optional[str]): Original name of the uploaded file.
+        content_hash (Optional[str]): sha256 of the uploaded bytes.
+        text_hash (Optional[str]): sha256 of the normalized extracted text.
+        chunk_count (int): Number of chunks stored for the document.
+        embedding_model (str): The model the chunks were embedded with.
+        embedding_dimensions (Optional[int]): Length of the stored vectors.
+        partition (str): `shared` for documents searched in memory, `dedicated` for documents with their own collection.
+        ingested_at (float): Unix time the document finished ingesting.
+        user_id (str): The user who uploaded the document.
+        chunk_stats (Optional[Dict[str, Any]]): How the document was chunked: strategy, chunk count, token fill and overlap.
+    """
+    document_id: str = Field(..., description="The ID the document's chunks are stored under.")
+    filename: Optional[str] = Field(None, description="Original name of the uploaded file.")
+    content_hash: Optional[str] = Field(None, description="sha256 of the uploaded bytes.")
+    text_hash: Optional[str] = Field(None, description="sha256 of the normalized extracted text.")
+    chunk_count: int = Field(0, description="Number of chunks stored for the document.")
+    embedding_model: str = Field(..., description="The model the chunks were embedded with.")
+    embedding_dimensions: Optional[int] = Field(None, description="Length of the stored vectors.")
+    partition: str = Field("shared", description="`shared` for documents searched in memory, `dedicated` for documents with their own collection.")
+    ingested_at: float = Field(..., description="Unix time the document finished ingesting.")
+    user_id: str = Field("anonymous", description="The user who uploaded the document.")
+    chunk_stats: Optional[Dict[str, Any]] = Field(None, description="How the document was chunked: strategy, chunk count, token fill and overlap.")
\ No newline at end of file
@@ -1,5 +1,8 @@
 const API_BASE_URL = 'http://127.0.0.1:8000';
 
+// Session returned by the backend, sent back so the agent keeps the conversation context
+let sessionId = null;
+
 /**
  * Check if the API is running
  * @returns {Promise<boolean>} True if API is running, false otherwise
@@ -32,7 +35,8 @@ export const sendMessage = async (message, chatHistory = []) => {
         chat_history: chatHistory.map(msg => ({
           role: msg.sender === 'user' ? 'user' : 'assistant',
           content: msg.text
-        }))
+        })),
+        session_id: sessionId
       }),
     });
 
@@ -40,7 +44,11 @@ export const sendMessage = async (message, chatHistory = []) => {
       throw new Error(`API request failed with status ${response.status}`);
     }
 
-    return await response.json();
+    const data = await response.json();
+    if (data.session_id) {
+      sessionId = data.session_id;
+    }
+    return data;
   } catch (error) {
     console.error('Error sending message:', error);
     throw error;